@@ -3,52 +3,76 @@
 import asyncio
 import logging
 
-from aiogram import Bot, Dispatcher
+from aiogram import Dispatcher
 from aiogram.fsm.storage.memory import MemoryStorage
 
 from infra.config import settings
 from infra.logging import setup_logging
-from app.utils.middleware import UserMiddleware
+from infra.metrics import start_metrics_server
+from infra.event_store import event_store
+from infra.tracing import setup_tracing, stop_tracing
+from app.utils.middleware import HandlerSpanMiddleware, MetricsMiddleware, TracingMiddleware, UserMiddleware
+from app.services.notifier import batch_notifier
+from app.services.telegram_session import create_bot, install_uvloop
+from app.utils.polling import run_polling
 from app.handlers import start, light, cargo, actions, admin, common
 
 
+def create_dispatcher(storage=None) -> Dispatcher:
+    """Create the dispatcher with middleware and all routers registered."""
+    logger = logging.getLogger(__name__)
+    logger.debug("Creating dispatcher")
+    dp = Dispatcher(storage=storage or MemoryStorage())
+
+    # One trace per update, spans for middleware, handler, SQL and Bot API calls
+    dp.update.outer_middleware(TracingMiddleware())
+
+    # Register middleware for both messages and callback queries; metrics
+    # first so they cover the user lookup and the commit
+    logger.debug("Registering MetricsMiddleware and UserMiddleware")
+    dp.message.middleware(MetricsMiddleware())
+    dp.callback_query.middleware(MetricsMiddleware())
+    dp.message.middleware(UserMiddleware())
+    dp.callback_query.middleware(UserMiddleware())
+    dp.message.middleware(HandlerSpanMiddleware())
+    dp.callback_query.middleware(HandlerSpanMiddleware())
+
+    # Register handlers
+    logger.debug("Registering handlers")
+    dp.include_router(start.router)
+    dp.include_router(light.router)
+    dp.include_router(cargo.router)
+    dp.include_router(actions.router)
+    dp.include_router(admin.router)
+    dp.include_router(common.router)
+    return dp
+
+
 async def main():
     """Main bot function."""
     # Setup logging
     setup_logging()
+    setup_tracing("ndstrbot-bot")
     logger = logging.getLogger(__name__)
     logger.info("Starting bot application")
     
     # Initialize bot variable
     bot = None
+    metrics_runner = None
     
     try:
         # Create bot and dispatcher
         logger.debug("Creating bot instance")
-        bot = Bot(token=settings.bot_token)
-        logger.debug("Creating memory storage")
-        storage = MemoryStorage()
-        logger.debug("Creating dispatcher")
-        dp = Dispatcher(storage=storage)
-        
-        # Register middleware for both messages and callback queries
-        logger.debug("Registering UserMiddleware")
-        dp.message.middleware(UserMiddleware())
-        dp.callback_query.middleware(UserMiddleware())
+        bot = create_bot()
+        dp = create_dispatcher()
         
-        # Register handlers
-        logger.debug("Registering handlers")
-        dp.include_router(start.router)
-        dp.include_router(light.router)
-        dp.include_router(cargo.router)
-        dp.include_router(actions.router)
-        dp.include_router(admin.router)
-        dp.include_router(common.router)
+        if settings.bot_metrics_port:
+            metrics_runner = await start_metrics_server(settings.bot_metrics_host, settings.bot_metrics_port)
         
         # Start polling
         logger.info("Starting bot polling...")
         try:
-            await dp.start_polling(bot)
+            await run_polling(dp, bot)
         except Exception as e:
             logger.error(f"Bot polling error: {e}", exc_info=True)
             raise
@@ -56,11 +80,17 @@ async def main():
         logger.error(f"Bot initialization error: {e}", exc_info=True)
         raise
     finally:
+        if metrics_runner:
+            await metrics_runner.cleanup()
         if bot:
+            await batch_notifier.close()
             logger.info("Closing bot session")
             await bot.session.close()
+        await event_store.close()
+        stop_tracing()
         logger.info("Bot application shutdown complete")
 
 
 if __name__ == "__main__":
+    install_uvloop()
     asyncio.run(main())
\ No newline at end of file
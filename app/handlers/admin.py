@@ -1,6 +1,7 @@
 """Admin handlers."""
 
 import logging
+from typing import List
 from aiogram import Router, F
 from aiogram.filters import Command
 from aiogram.types import Message, CallbackQuery
@@ -8,14 +9,21 @@ from sqlmodel import select
 from sqlalchemy.orm import selectinload
 
 from infra.config import settings
+from infra.search import search
 from domain.models import Request, User, Admin
-from app.utils.formatters import format_request_details
+from app.keyboards.inline import get_find_pagination
+from app.utils.formatters import format_request_details, format_search_results
+from app.services.admin_registry import admin_registry
+from app.services.moderation import set_requests_status, user_notifications
+from app.services.notifier import batch_notifier
 
 
 logger = logging.getLogger(__name__)
 
 router = Router()
 
+FIND_PAGE_SIZE = 10
+
 
 def is_admin(user_id: int) -> bool:
     """Check if user is admin (both from config and database)."""
@@ -57,9 +65,9 @@ async def admin_handler(message: Message, session):
         await message.answer(
             "🔐 Админ панель:\n"
             "📊 /stats - статистика заявок\n"
-            "🔍 /find <tg_id|req_id> - найти заявку\n"
-            "✅ /approve <req_id> - одобрить заявку\n"
-            "❌ /reject <req_id> - отклонить заявку\n"
+            "🔍 /find <tg_id|req_id|текст> - найти заявку, пользователя, макет\n"
+            "✅ /approve <req_id> [req_id ...] - одобрить заявки (all [категория] - все отправленные)\n"
+            "❌ /reject <req_id> [req_id ...] - отклонить заявки (all [категория] - все отправленные)\n"
             "➕ /addadmin <tg_id|username> - добавить админа\n"
             "➖ /deladmin <tg_id|username> - удалить админа\n"
             "📋 /listadmins - список админов"
@@ -115,8 +123,10 @@ async def add_admin_handler(message: Message, session):
         )
         
         session.add(new_admin)
+        # Commit before the registry grants the rights, so a failed commit grants nothing
         await session.commit()
-        await session.refresh(new_admin)
+        if new_admin.tg_id:
+            admin_registry.add(new_admin.tg_id)
         
         await message.answer(f"✅ Админ успешно добавлен (ID: {new_admin.id})")
         logger.info(f"Admin {message.from_user.id} added new admin: {identifier}")
@@ -161,7 +171,10 @@ async def del_admin_handler(message: Message, session):
             return
         
         await session.delete(admin)
+        # Commit before the registry drops the rights, so they match the database
         await session.commit()
+        if admin.tg_id:
+            admin_registry.discard(admin.tg_id)
         
         await message.answer(f"✅ Админ успешно удален")
         logger.info(f"Admin {message.from_user.id} deleted admin: {identifier}")
@@ -245,54 +258,166 @@ async def find_handler(message: Message, session):
         # Parse argument
         args = message.text.split()
         if len(args) < 2:
-            await message.answer("ℹ️ Использование: /find <tg_id|req_id>")
+            await message.answer("ℹ️ Использование: /find <tg_id|req_id|текст>")
             return
         
         identifier = args[1]
+        if len(args) > 2 or not identifier.isdigit():
+            # Not an ID: ranked full-text search
+            query = " ".join(args[1:])
+            text, markup = await _find_page(session, query, 1)
+            await message.answer(text, reply_markup=markup)
+            return
         
         # Try to find by request ID first
-        if identifier.isdigit():
-            req_id = int(identifier)
-            # Eagerly load files relationship to avoid lazy loading issues
-            statement = select(Request).where(Request.id == req_id).options(selectinload(Request.files))
-            result = await session.execute(statement)
-            request = result.scalar_one_or_none()
-            
-            if request:
-                text = format_request_details(request)
-                await message.answer(text)
-                return
+        req_id = int(identifier)
+        # Eagerly load files relationship to avoid lazy loading issues
+        statement = select(Request).where(Request.id == req_id).options(selectinload(Request.files))
+        result = await session.execute(statement)
+        request = result.scalar_one_or_none()
+        
+        if request:
+            text = format_request_details(request)
+            await message.answer(text)
+            return
         
         # Try to find by TG ID
-        if identifier.isdigit():
-            tg_id = int(identifier)
-            # Find user first
-            user_statement = select(User).where(User.tg_id == tg_id)
-            user_result = await session.execute(user_statement)
-            user = user_result.scalar_one_or_none()
+        tg_id = int(identifier)
+        # Find user first
+        user_statement = select(User).where(User.tg_id == tg_id)
+        user_result = await session.execute(user_statement)
+        user = user_result.scalar_one_or_none()
+        
+        if user:
+            # Get user's requests with eagerly loaded files
+            req_statement = select(Request).where(Request.user_id == user.id).options(selectinload(Request.files))
+            req_result = await session.execute(req_statement)
+            requests = req_result.scalars().all()
             
-            if user:
-                # Get user's requests with eagerly loaded files
-                req_statement = select(Request).where(Request.user_id == user.id).options(selectinload(Request.files))
-                req_result = await session.execute(req_statement)
-                requests = req_result.scalars().all()
-                
-                if requests:
-                    text = "📋 Заявки пользователя:\n\n"
-                    for req in requests:
-                        text += format_request_details(req) + "\n\n"
-                    await message.answer(text)
-                else:
-                    await message.answer("📭 У пользователя нет заявок")
+            if requests:
+                text = "📋 Заявки пользователя:\n\n"
+                for req in requests:
+                    text += format_request_details(req) + "\n\n"
+                await message.answer(text)
             else:
-                await message.answer("🔍 Пользователь не найден")
+                await message.answer("📭 У пользователя нет заявок")
         else:
-            await message.answer("⚠️ Неверный формат ID")
+            await message.answer("🔍 Пользователь не найден")
     except Exception as e:
         logger.error(f"Error in find handler: {e}", exc_info=True)
         await message.answer(f"❌ Ошибка: {e}")
 
 
+async def _find_page(session, query: str, page: int):
+    """Search results text and pagination keyboard for one /find page."""
+    results, has_more = await search(session, query, limit=FIND_PAGE_SIZE, offset=(page - 1) * FIND_PAGE_SIZE)
+    return format_search_results(query, results, page), get_find_pagination(query, page, has_more)
+
+
+@router.callback_query(F.data.startswith("find:"))
+async def find_page_callback(callback: CallbackQuery, session):
+    """Show another page of /find search results."""
+    if not await is_admin_combined(session, callback.from_user.id):
+        await callback.answer("🚫 Недостаточно прав")
+        return
+    
+    try:
+        _, page, query = callback.data.split(":", 2)
+        text, markup = await _find_page(session, query, int(page))
+        await callback.message.edit_text(text, reply_markup=markup)
+        await callback.answer()
+    except Exception as e:
+        logger.error(f"Error in find page callback: {e}", exc_info=True)
+        await callback.answer(f"❌ Ошибка: {e}")
+
+
+# Max request IDs in one /approve or /reject
+MAX_MODERATE_IDS = 100
+MODERATION_CATEGORIES = ("легковой", "грузовой")
+# Status -> (command reply prefix, callback answer, mark appended to the request card)
+MODERATION_TEXTS = {
+    "approved": ("✅ Одобрено заявок", "✅ Заявка одобрена", "✅ Одобрена"),
+    "rejected": ("❌ Отклонено заявок", "❌ Заявка отклонена", "❌ Отклонена"),
+}
+
+
+def parse_moderation_args(args: List[str]):
+    """
+    Parse ``/approve`` and ``/reject`` arguments.
+
+    ``12 13 14`` (or ``12,13,14``) moderates those requests, ``all`` every
+    submitted one and ``all <category>`` every submitted one of a category.
+
+    Args:
+        args: Words after the command
+
+    Returns:
+        Tuple[Optional[List[int]], Optional[str]]: Request IDs (None = all) and category
+
+    Raises:
+        ValueError: If the arguments are not IDs or ``all [category]``
+    """
+    if not args:
+        raise ValueError("no arguments")
+    if args[0].lower() == "all":
+        if len(args) > 2 or (len(args) == 2 and args[1].lower() not in MODERATION_CATEGORIES):
+            raise ValueError("bad filter")
+        return None, args[1].lower() if len(args) == 2 else None
+    tokens = [token for arg in args for token in arg.split(",") if token]
+    if not tokens or not all(token.isdigit() for token in tokens) or len(tokens) > MAX_MODERATE_IDS:
+        raise ValueError("bad ids")
+    return list(dict.fromkeys(int(token) for token in tokens)), None
+
+
+async def _moderate_command(message: Message, session, status: str):
+    """Run /approve or /reject for one or more requests."""
+    command = "approve" if status == "approved" else "reject"
+    try:
+        request_ids, category = parse_moderation_args(message.text.split()[1:])
+    except ValueError:
+        await message.answer(
+            f"ℹ️ Использование: /{command} <req_id> [req_id ...]\n"
+            f"или /{command} all [легковой|грузовой] — все отправленные заявки"
+        )
+        return
+
+    moderated = await set_requests_status(
+        session, status, request_ids=request_ids, category=category, admin_tg_id=message.from_user.id
+    )
+    # Users hear about the decision only once it is committed
+    await session.commit()
+    batch_notifier.enqueue(message.bot, user_notifications(status, moderated))
+
+    done = [item.id for item in moderated]
+    if not done:
+        await message.answer("🔍 Нет отправленных заявок для обработки")
+        return
+    text = f"{MODERATION_TEXTS[status][0]}: {len(done)} ({', '.join(f'#{req_id}' for req_id in done)})"
+    if request_ids is not None:
+        skipped = [req_id for req_id in request_ids if req_id not in done]
+        if skipped:
+            text += f"\n⏭ Пропущены (не найдены или уже обработаны): {', '.join(f'#{req_id}' for req_id in skipped)}"
+    await message.answer(text)
+
+
+async def _moderate_callback(callback: CallbackQuery, session, status: str):
+    """Approve or reject the request of an ``approve_``/``reject_`` button."""
+    req_id = int(callback.data.split("_")[1])
+    moderated = await set_requests_status(session, status, request_ids=[req_id], admin_tg_id=callback.from_user.id)
+    if not moderated:
+        await callback.answer("🔍 Заявка не найдена или уже обработана")
+        return
+    await session.commit()
+    batch_notifier.enqueue(callback.bot, user_notifications(status, moderated))
+
+    _, answer, mark = MODERATION_TEXTS[status]
+    await callback.answer(answer)
+    await callback.message.edit_text(
+        callback.message.text + f"\n\n{mark}",
+        reply_markup=None
+    )
+
+
 @router.message(Command("approve"))
 async def approve_handler(message: Message, session):
     """Handle /approve command."""
@@ -302,28 +427,7 @@ async def approve_handler(message: Message, session):
         
     logger.info(f"Approve handler called by user {message.from_user.id}")
     try:
-        # Parse argument
-        args = message.text.split()
-        if len(args) < 2:
-            await message.answer("ℹ️ Использование: /approve <req_id>")
-            return
-        
-        req_id = int(args[1])
-        
-        # Find request with eagerly loaded files
-        statement = select(Request).where(Request.id == req_id).options(selectinload(Request.files))
-        result = await session.execute(statement)
-        request = result.scalar_one_or_none()
-        
-        if not request:
-            await message.answer("🔍 Заявка не найдена")
-            return
-        
-        # Update status
-        request.status = "approved"
-        await session.commit()
-        
-        await message.answer(f"✅ Заявка #{req_id} одобрена")
+        await _moderate_command(message, session, "approved")
     except Exception as e:
         logger.error(f"Error in approve handler: {e}", exc_info=True)
         await message.answer(f"❌ Ошибка: {e}")
@@ -338,28 +442,7 @@ async def reject_handler(message: Message, session):
         
     logger.info(f"Reject handler called by user {message.from_user.id}")
     try:
-        # Parse argument
-        args = message.text.split()
-        if len(args) < 2:
-            await message.answer("ℹ️ Использование: /reject <req_id>")
-            return
-        
-        req_id = int(args[1])
-        
-        # Find request with eagerly loaded files
-        statement = select(Request).where(Request.id == req_id).options(selectinload(Request.files))
-        result = await session.execute(statement)
-        request = result.scalar_one_or_none()
-        
-        if not request:
-            await message.answer("🔍 Заявка не найдена")
-            return
-        
-        # Update status
-        request.status = "rejected"
-        await session.commit()
-        
-        await message.answer(f"❌ Заявка #{req_id} отклонена")
+        await _moderate_command(message, session, "rejected")
     except Exception as e:
         logger.error(f"Error in reject handler: {e}", exc_info=True)
         await message.answer(f"❌ Ошибка: {e}")
@@ -373,26 +456,7 @@ async def approve_callback(callback: CallbackQuery, session):
         return
     
     try:
-        req_id = int(callback.data.split("_")[1])
-        
-        # Find request with eagerly loaded files
-        statement = select(Request).where(Request.id == req_id).options(selectinload(Request.files))
-        result = await session.execute(statement)
-        request = result.scalar_one_or_none()
-        
-        if not request:
-            await callback.answer("🔍 Заявка не найдена")
-            return
-        
-        # Update status
-        request.status = "approved"
-        await session.commit()
-        
-        await callback.answer("✅ Заявка одобрена")
-        await callback.message.edit_text(
-            callback.message.text + "\n\n✅ Одобрена",
-            reply_markup=None
-        )
+        await _moderate_callback(callback, session, "approved")
     except Exception as e:
         logger.error(f"Error in approve callback: {e}", exc_info=True)
         await callback.answer(f"❌ Ошибка: {e}")
@@ -406,26 +470,7 @@ async def reject_callback(callback: CallbackQuery, session):
         return
     
     try:
-        req_id = int(callback.data.split("_")[1])
-        
-        # Find request with eagerly loaded files
-        statement = select(Request).where(Request.id == req_id).options(selectinload(Request.files))
-        result = await session.execute(statement)
-        request = result.scalar_one_or_none()
-        
-        if not request:
-            await callback.answer("🔍 Заявка не найдена")
-            return
-        
-        # Update status
-        request.status = "rejected"
-        await session.commit()
-        
-        await callback.answer("❌ Заявка отклонена")
-        await callback.message.edit_text(
-            callback.message.text + "\n\n❌ Отклонена",
-            reply_markup=None
-        )
+        await _moderate_callback(callback, session, "rejected")
     except Exception as e:
         logger.error(f"Error in reject callback: {e}", exc_info=True)
-        await callback.answer(f"❌ Ошибка: {e}")
\ No newline at end of file
+        await callback.answer(f"❌ Ошибка: {e}")
@@ -6,12 +6,15 @@ from datetime import datetime
 from aiogram import Router, F, Bot
 from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.context import FSMContext
-from sqlmodel import select
+from sqlalchemy import update
 
 from app.states.cargo import CargoVehicleStates
 from app.keyboards.inline import get_main_menu, get_cancel_menu
+from app.services.progress import progress_tracker
+from app.utils.outgoing import OutgoingCalls
 from domain.models import Request, File
 from infra.config import settings
+from infra.event_store import audit
 
 # Text constants
 CARGO_INTRO = """📋 Для согласования с Яндексом отправьте 4 фото чистого авто (с 4 сторон) и 2 фото СТС (с обеих сторон).
@@ -41,38 +44,45 @@ router = Router()
 @router.callback_query(F.data == "cargo_vehicle")
 async def start_cargo_vehicle(callback: CallbackQuery, state: FSMContext, session, user):
     """Start cargo vehicle registration process."""
-    logger.info(f"Cargo vehicle handler called with callback data: '{callback.data}'")
+    logger.info("Cargo vehicle handler called with callback data: '%s'", callback.data)
+    if callback.message:
+        progress_tracker.forget_chat(callback.message.chat.id)
     # Create request
     request = Request(
         user_id=user.id,
         category="грузовой"
     )
     session.add(request)
-    await session.commit()
-    await session.refresh(request)
+    await session.flush()
     
     # Save request ID in state
     await state.update_data(request_id=request.id)
     
     await state.set_state(CargoVehicleStates.sending_auto_photos)
-    if callback.message:
-        try:
-            await callback.message.edit_text(
-                CARGO_INTRO,
-                reply_markup=get_cancel_menu()
-            )
-            # Send a new message for photo progress and store its ID
-            sent_message = await callback.message.answer("📷 Ожидание фото авто 1/4", reply_markup=get_cancel_menu())
-            await state.update_data(auto_photo_progress_message_id=sent_message.message_id)
-        except Exception as e:
-            logger.error(f"Error editing message: {e}")
-            await callback.answer("Ошибка при обработке запроса")
-            return
-    await callback.answer()
+    async with OutgoingCalls(callback, "start_cargo_vehicle") as out:
+        out.answer()
+        if callback.message:
+            try:
+                # The intro edit and the progress message are independent
+                out.spawn(
+                    callback.message.edit_text(
+                        CARGO_INTRO,
+                        reply_markup=get_cancel_menu()
+                    ),
+                    "editMessageText",
+                )
+                # Send a new message for photo progress and store its ID
+                sent_message = await out.call(
+                    callback.message.answer("📷 Ожидание фото авто 1/4", reply_markup=get_cancel_menu()),
+                    "sendMessage",
+                )
+                await state.update_data(auto_photo_progress_message_id=sent_message.message_id)
+            except Exception as e:
+                logger.error(f"Error editing message: {e}")
 
 
 @router.message(CargoVehicleStates.sending_auto_photos, F.photo)
-async def handle_auto_photo(message: Message, state: FSMContext, session, user, bot: Bot):
+async def handle_auto_photo(message: Message, state: FSMContext, session, bot: Bot):
     """Handle auto photo uploads."""
     logger.info("Cargo auto photo handler called")
     # Get current state data
@@ -113,26 +123,33 @@ async def handle_auto_photo(message: Message, state: FSMContext, session, user,
                 path=f"uploads/{filename}"
             )
             session.add(file_record)
-            await session.commit()
         
-        logger.info(f"Auto photo saved: {filename}")
+        logger.info("Auto photo saved: %s", filename)
     except Exception as e:
         logger.error(f"Error saving auto photo: {e}")
     
     if auto_photo_count < 4:
-        # Send a new message for each photo progress instead of updating
-        await message.answer(f"📷 Получено фото авто {auto_photo_count}/4")
+        # Edit the progress message sent at the start of the flow
+        await progress_tracker.report(
+            bot,
+            message.chat.id,
+            f"📷 Получено фото авто {auto_photo_count}/4",
+            key="auto",
+            message_id=data.get("auto_photo_progress_message_id"),
+            reply_markup=get_cancel_menu()
+        )
     else:
         # All auto photos received
+        progress_tracker.finish(message.chat.id, key="auto")
         await state.set_state(CargoVehicleStates.sending_sts_photos)
         # Send the STS photo instruction message
         await message.answer(SEND2_STS, reply_markup=get_cancel_menu())
 
 
 @router.message(CargoVehicleStates.sending_auto_photos, F.media_group_id)
-async def handle_auto_photo_album(message: Message, state: FSMContext, session, user):
+async def handle_auto_photo_album(message: Message, state: FSMContext, bot: Bot):
     """Handle auto photo album uploads."""
-    logger.info(f"Auto photo album handler called with media_group_id: {message.media_group_id}")
+    logger.info("Auto photo album handler called with media_group_id: %s", message.media_group_id)
     
     # Get current state data
     data = await state.get_data()
@@ -147,17 +164,24 @@ async def handle_auto_photo_album(message: Message, state: FSMContext, session,
     # TODO: Implement actual file saving
     
     if new_photo_count < 4:
-        # Send a new message for progress instead of updating
-        await message.answer(f"📷 Получено фото авто {new_photo_count}/4")
+        await progress_tracker.report(
+            bot,
+            message.chat.id,
+            f"📷 Получено фото авто {new_photo_count}/4",
+            key="auto",
+            message_id=data.get("auto_photo_progress_message_id"),
+            reply_markup=get_cancel_menu()
+        )
     else:
         # All auto photos received (4/4)
+        progress_tracker.finish(message.chat.id, key="auto")
         await state.set_state(CargoVehicleStates.sending_sts_photos)
         # Send the STS photo instruction message
         await message.answer(SEND2_STS, reply_markup=get_cancel_menu())
 
 
 @router.message(CargoVehicleStates.sending_sts_photos, F.photo)
-async def handle_sts_photo(message: Message, state: FSMContext, session, user, bot: Bot):
+async def handle_sts_photo(message: Message, state: FSMContext, session, bot: Bot):
     """Handle STS photo uploads."""
     logger.info("Cargo STS photo handler called")
     # Get current state data
@@ -198,26 +222,32 @@ async def handle_sts_photo(message: Message, state: FSMContext, session, user, b
                 path=f"uploads/{filename}"
             )
             session.add(file_record)
-            await session.commit()
         
-        logger.info(f"STS photo saved: {filename}")
+        logger.info("STS photo saved: %s", filename)
     except Exception as e:
         logger.error(f"Error saving STS photo: {e}")
     
     if sts_photo_count < 2:
-        # Send a new message for each photo progress instead of updating
-        await message.answer(f"📷 Получено фото СТС {sts_photo_count}/2")
+        await progress_tracker.report(
+            bot,
+            message.chat.id,
+            f"📷 Получено фото СТС {sts_photo_count}/2",
+            key="sts",
+            reply_markup=get_cancel_menu()
+        )
     else:
+        progress_tracker.finish(message.chat.id, key="sts")
         # All photos received
         if request_id:
-            # Update request status
-            statement = select(Request).where(Request.id == request_id)
-            result = await session.execute(statement)
-            request = result.scalar_one_or_none()
-            if request:
-                request.status = "submitted"
-                request.submitted_at = datetime.utcnow()
-                await session.commit()
+            # Update request status in a single statement
+            await session.execute(
+                update(Request)
+                .where(Request.id == request_id)
+                .values(status="submitted", submitted_at=datetime.utcnow())
+            )
+            audit("request_submitted", request_id=request_id, category="грузовой")
+            # Committed before the user is told the request went through
+            await session.commit()
         
         # Send the final success message without buttons
         await message.answer(
@@ -227,9 +257,9 @@ async def handle_sts_photo(message: Message, state: FSMContext, session, user, b
 
 
 @router.message(CargoVehicleStates.sending_sts_photos, F.media_group_id)
-async def handle_sts_photo_album(message: Message, state: FSMContext, session, user):
+async def handle_sts_photo_album(message: Message, state: FSMContext, session, bot: Bot):
     """Handle STS photo album uploads."""
-    logger.info(f"STS photo album handler called with media_group_id: {message.media_group_id}")
+    logger.info("STS photo album handler called with media_group_id: %s", message.media_group_id)
     
     # Get current state data
     data = await state.get_data()
@@ -245,19 +275,26 @@ async def handle_sts_photo_album(message: Message, state: FSMContext, session, u
     # TODO: Implement actual file saving
     
     if new_photo_count < 2:
-        # Send a new message for progress instead of updating
-        await message.answer(f"📷 Получено фото СТС {new_photo_count}/2")
+        await progress_tracker.report(
+            bot,
+            message.chat.id,
+            f"📷 Получено фото СТС {new_photo_count}/2",
+            key="sts",
+            reply_markup=get_cancel_menu()
+        )
     else:
+        progress_tracker.finish(message.chat.id, key="sts")
         # All photos received (2/2)
         if request_id:
-            # Update request status
-            statement = select(Request).where(Request.id == request_id)
-            result = await session.execute(statement)
-            request = result.scalar_one_or_none()
-            if request:
-                request.status = "submitted"
-                request.submitted_at = datetime.utcnow()
-                await session.commit()
+            # Update request status in a single statement
+            await session.execute(
+                update(Request)
+                .where(Request.id == request_id)
+                .values(status="submitted", submitted_at=datetime.utcnow())
+            )
+            audit("request_submitted", request_id=request_id, category="грузовой")
+            # Committed before the user is told the request went through
+            await session.commit()
         
         # Send the final success message without buttons
         await message.answer(
@@ -267,18 +304,19 @@ async def handle_sts_photo_album(message: Message, state: FSMContext, session, u
 
 
 @router.callback_query(F.data == "cancel")
-async def cancel_handler(callback: CallbackQuery, state: FSMContext, session, user):
+async def cancel_handler(callback: CallbackQuery, state: FSMContext):
     """Handle cancellation."""
     logger.info("Cargo cancel handler called")
     await state.clear()
     if callback.message:
-        try:
-            await callback.message.edit_text(
-                CANCELLED,
-                reply_markup=get_main_menu()
-            )
-        except Exception as e:
-            logger.error(f"Error editing message: {e}")
-            await callback.answer("Ошибка при обработке запроса")
-            return
-    await callback.answer()
\ No newline at end of file
+        progress_tracker.forget_chat(callback.message.chat.id)
+    async with OutgoingCalls(callback, "cargo_cancel_handler") as out:
+        out.answer()
+        if callback.message:
+            out.spawn(
+                callback.message.edit_text(
+                    CANCELLED,
+                    reply_markup=get_main_menu()
+                ),
+                "editMessageText",
+            )
\ No newline at end of file
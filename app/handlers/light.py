@@ -6,6 +6,7 @@ from aiogram import Router, F
 from aiogram.filters import StateFilter
 from aiogram.types import Message, CallbackQuery, InputMediaPhoto
 from aiogram.fsm.context import FSMContext
+from sqlalchemy import update
 from sqlmodel import select
 
 from app.states.light import LightVehicleStates
@@ -19,8 +20,11 @@ from app.keyboards.inline import (
     get_license_yes_no_menu,
 )
 from app.services.validators import validate_year
+from app.services.progress import progress_tracker
+from app.utils.outgoing import OutgoingCalls
 from domain.models import Request, Template
 from infra.config import settings
+from infra.event_store import audit
 
 # Text constants
 BRAND_Q = "Есть ли сейчас у вас бренд?"
@@ -85,7 +89,13 @@ async def _create_request_record(
     auto_submit: bool = False,
     **extra_fields,
 ) -> Request:
-    """Persist a light-vehicle request and cache its id in state."""
+    """
+    Persist a light-vehicle request and cache its id in state.
+
+    A submitted request is committed right away: the callers confirm it to
+    the user next, which must not happen for a request that could still be
+    rolled back.
+    """
     data = await state.get_data()
     request = Request(
         user_id=user.id,
@@ -99,8 +109,10 @@ async def _create_request_record(
         request.status = "submitted"
         request.submitted_at = datetime.utcnow()
     session.add(request)
-    await session.commit()
-    await session.refresh(request)
+    await session.flush()
+    if auto_submit:
+        audit("request_submitted", request_id=request.id, category=request.category)
+        await session.commit()
     await state.update_data(request_id=request.id)
     return request
 
@@ -114,31 +126,75 @@ async def _finalize_request_without_photos(state: FSMContext, notify_func, reque
     await state.clear()
 
 
+async def _replace_template_message(
+    callback: CallbackQuery,
+    state: FSMContext,
+    template: Template,
+    index: int,
+    total: int,
+    handler_name: str,
+):
+    """Swap the template card: answer, delete the old card and send the new one concurrently."""
+    # Check if template has a Telegram file_id or a local path
+    if template.file_id:
+        # Use Telegram file ID
+        photo = template.file_id
+    else:
+        # Use local file path - extract filename from path
+        filename = template.path.split('/')[-1]
+        # Use the web app base URL from settings
+        photo = f"{settings.web_app_base_url}/uploads/{filename}"
+
+    try:
+        async with OutgoingCalls(callback, handler_name) as out:
+            out.answer()
+            if callback.message:
+                # The old card is deleted while the new one is being sent
+                out.spawn(callback.message.delete(), "deleteMessage")
+                sent_message = await out.call(
+                    callback.message.answer_photo(
+                        photo=photo,
+                        caption=f"Шаблон {template.name}\n\n{template.description or ''}",
+                        reply_markup=get_template_navigation(index, total)
+                    ),
+                    "sendPhoto",
+                )
+                # Update message ID in state
+                await state.update_data(template_message_id=sent_message.message_id)
+    except Exception as e:
+        # The callback is already answered; the user keeps the old card
+        logger.error(f"Error updating template: {e}")
+
+
 @router.callback_query(F.data == "light_vehicle")
-async def start_light_vehicle_callback(callback: CallbackQuery, state: FSMContext, session, user):
+async def start_light_vehicle_callback(callback: CallbackQuery, state: FSMContext):
     """Start light vehicle registration process via callback."""
-    logger.info(f"Light vehicle callback handler called with data: '{callback.data}'")
-    await state.set_state(LightVehicleStates.choosing_brand)
+    logger.info("Light vehicle callback handler called with data: '%s'", callback.data)
     if callback.message:
-        try:
-            await callback.message.edit_text(
-                BRAND_Q,
-                reply_markup=get_yes_no_menu()
-            )
-        except Exception as e:
-            logger.error(f"Error editing message: {e}")
-            # If we can't edit, send a new message
-            await callback.message.answer(
-                BRAND_Q,
-                reply_markup=get_yes_no_menu()
-            )
-    await callback.answer()
+        progress_tracker.forget_chat(callback.message.chat.id)
+    await state.set_state(LightVehicleStates.choosing_brand)
+    async with OutgoingCalls(callback, "start_light_vehicle_callback") as out:
+        out.answer()
+        if callback.message:
+            try:
+                await callback.message.edit_text(
+                    BRAND_Q,
+                    reply_markup=get_yes_no_menu()
+                )
+            except Exception as e:
+                logger.error(f"Error editing message: {e}")
+                # If we can't edit, send a new message
+                await callback.message.answer(
+                    BRAND_Q,
+                    reply_markup=get_yes_no_menu()
+                )
 
 
 @router.message(F.text == "Легковой")
 async def start_light_vehicle(message: Message, state: FSMContext):
     """Start light vehicle registration process."""
-    logger.info(f"Light vehicle handler called with text: '{message.text}'")
+    logger.info("Light vehicle handler called with text: '%s'", message.text)
+    progress_tracker.forget_chat(message.chat.id)
     await state.set_state(LightVehicleStates.choosing_brand)
     await message.answer(
         BRAND_Q,
@@ -150,6 +206,8 @@ async def start_light_vehicle(message: Message, state: FSMContext):
 async def brand_yes_callback(callback: CallbackQuery, state: FSMContext, session, user):
     """Handle 'Yes' to brand question via callback."""
     logger.info("Brand yes callback handler called")
+    if callback.message:
+        progress_tracker.forget_chat(callback.message.chat.id)
     # Save user choice
     await state.update_data(has_brand=True)
     
@@ -160,28 +218,28 @@ async def brand_yes_callback(callback: CallbackQuery, state: FSMContext, session
         has_brand=True
     )
     session.add(request)
-    await session.commit()
-    await session.refresh(request)
+    await session.flush()
     
     # Save request ID in state
     await state.update_data(request_id=request.id)
     
     # Move to photo sending state
     await state.set_state(LightVehicleStates.sending_photos)
-    if callback.message:
-        try:
-            await callback.message.edit_text(
-                SEND4_AUTO,
-                reply_markup=get_cancel_menu()
-            )
-        except Exception as e:
-            logger.error(f"Error editing message: {e}")
-            # If we can't edit, send a new message
-            await callback.message.answer(
-                SEND4_AUTO,
-                reply_markup=get_cancel_menu()
-            )
-    await callback.answer()
+    async with OutgoingCalls(callback, "brand_yes_callback") as out:
+        out.answer()
+        if callback.message:
+            try:
+                await callback.message.edit_text(
+                    SEND4_AUTO,
+                    reply_markup=get_cancel_menu()
+                )
+            except Exception as e:
+                logger.error(f"Error editing message: {e}")
+                # If we can't edit, send a new message
+                await callback.message.answer(
+                    SEND4_AUTO,
+                    reply_markup=get_cancel_menu()
+                )
 
 
 @router.callback_query(F.data == "no")
@@ -190,20 +248,21 @@ async def brand_no_callback(callback: CallbackQuery, state: FSMContext):
     logger.info("Brand no callback handler called")
     await state.update_data(has_brand=False)
     await state.set_state(LightVehicleStates.entering_year)
-    if callback.message:
-        try:
-            await callback.message.edit_text(
-                YEAR_Q.format(current_year=2025),  # TODO: Use actual current year
-                reply_markup=get_cancel_menu()
-            )
-        except Exception as e:
-            logger.error(f"Error editing message: {e}")
-            # If we can't edit, send a new message
-            await callback.message.answer(
-                YEAR_Q.format(current_year=2025),  # TODO: Use actual current year
-                reply_markup=get_cancel_menu()
-            )
-    await callback.answer()
+    async with OutgoingCalls(callback, "brand_no_callback") as out:
+        out.answer()
+        if callback.message:
+            try:
+                await callback.message.edit_text(
+                    YEAR_Q.format(current_year=2025),  # TODO: Use actual current year
+                    reply_markup=get_cancel_menu()
+                )
+            except Exception as e:
+                logger.error(f"Error editing message: {e}")
+                # If we can't edit, send a new message
+                await callback.message.answer(
+                    YEAR_Q.format(current_year=2025),  # TODO: Use actual current year
+                    reply_markup=get_cancel_menu()
+                )
 
 
 @router.message(LightVehicleStates.entering_year)
@@ -245,18 +304,20 @@ async def license_no(message: Message, state: FSMContext):
 async def license_yes_callback(callback: CallbackQuery, state: FSMContext):
     """Handle inline 'Yes' selection for license question."""
     logger.info("License yes callback handler called")
-    if callback.message:
-        await _show_license_options(state, callback.message.edit_text)
-    await callback.answer()
+    async with OutgoingCalls(callback, "license_yes_callback") as out:
+        out.answer()
+        if callback.message:
+            await _show_license_options(state, callback.message.edit_text)
 
 
 @router.callback_query(StateFilter(LightVehicleStates.choosing_license), F.data == "license_no")
 async def license_no_callback(callback: CallbackQuery, state: FSMContext):
     """Handle inline 'No' selection for license question."""
     logger.info("License no callback handler called")
-    if callback.message:
-        await _prompt_no_license_options(state, callback.message.edit_text)
-    await callback.answer()
+    async with OutgoingCalls(callback, "license_no_callback") as out:
+        out.answer()
+        if callback.message:
+            await _prompt_no_license_options(state, callback.message.edit_text)
 
 
 @router.callback_query(
@@ -265,7 +326,7 @@ async def license_no_callback(callback: CallbackQuery, state: FSMContext):
 )
 async def other_license_options_selected(callback: CallbackQuery, state: FSMContext, session, user):
     """Handle other license option selections."""
-    logger.info(f"License option selected: {callback.data}")
+    logger.info("License option selected: %s", callback.data)
     option_code = callback.data or ""
     option_text = LICENSE_OPTION_LABELS.get(option_code, option_code)
     await state.update_data(license_option=option_code)
@@ -303,7 +364,7 @@ async def other_license_options_selected(callback: CallbackQuery, state: FSMCont
 )
 async def no_license_option_selected(callback: CallbackQuery, state: FSMContext, session, user):
     """Handle wrap choices for drivers who don't yet have a license."""
-    logger.info(f"No-license option selected: {callback.data}")
+    logger.info("No-license option selected: %s", callback.data)
     option_code = callback.data or ""
     option_text = NO_LICENSE_OPTION_LABELS.get(option_code, option_code)
     await state.update_data(no_license_option=option_code)
@@ -334,7 +395,7 @@ async def no_license_option_selected(callback: CallbackQuery, state: FSMContext,
 
 
 @router.callback_query(F.data == "re_wrap")
-async def re_wrap_selected(callback: CallbackQuery, state: FSMContext, session, user, bot):
+async def re_wrap_selected(callback: CallbackQuery, state: FSMContext, session, user):
     """Handle re-wrap option selection - show template selection."""
     logger.info("Re-wrap option selected")
     
@@ -393,26 +454,27 @@ async def re_wrap_selected(callback: CallbackQuery, state: FSMContext, session,
             # Use the web app base URL from settings
             photo = f"{settings.web_app_base_url}/uploads/{filename}"
         
-        if callback.message:
-            sent_message = await callback.message.answer_photo(
-                photo=photo,
-                caption=f"Шаблон {template.name}\n\n{template.description or ''}",
-                reply_markup=get_template_navigation(0, len(templates))
-            )
-            # Store message ID for later updates
-            await state.update_data(template_message_id=sent_message.message_id)
+        async with OutgoingCalls(callback, "re_wrap_selected") as out:
+            out.answer()
+            if callback.message:
+                sent_message = await out.call(
+                    callback.message.answer_photo(
+                        photo=photo,
+                        caption=f"Шаблон {template.name}\n\n{template.description or ''}",
+                        reply_markup=get_template_navigation(0, len(templates))
+                    ),
+                    "sendPhoto",
+                )
+                # Store message ID for later updates
+                await state.update_data(template_message_id=sent_message.message_id)
     except Exception as e:
         logger.error(f"Error sending template: {e}")
-        await callback.answer("Ошибка при отправке шаблона")
-        return
-    
-    await callback.answer()
 
 
 @router.callback_query(F.data.startswith("template_prev_"))
-async def template_prev(callback: CallbackQuery, state: FSMContext, session, user, bot):
+async def template_prev(callback: CallbackQuery, state: FSMContext, session):
     """Handle template previous navigation."""
-    logger.info(f"Template previous: {callback.data}")
+    logger.info("Template previous: %s", callback.data)
     
     # Get current state data
     data = await state.get_data()
@@ -442,44 +504,13 @@ async def template_prev(callback: CallbackQuery, state: FSMContext, session, use
     await state.update_data(current_template_index=new_index)
     
     # Update message with new template
-    try:
-        # Check if template has a Telegram file_id or a local path
-        if template.file_id:
-            # Use Telegram file ID
-            photo = template.file_id
-        else:
-            # Use local file path - extract filename from path
-            filename = template.path.split('/')[-1]
-            # Use the web app base URL from settings
-            photo = f"{settings.web_app_base_url}/uploads/{filename}"
-        
-        if callback.message:
-            # Delete the previous message and send a new one with the updated template
-            try:
-                await callback.message.delete()
-            except Exception as e:
-                logger.warning(f"Could not delete template message: {e}")
-            
-            # Send new template message
-            sent_message = await callback.message.answer_photo(
-                photo=photo,
-                caption=f"Шаблон {template.name}\n\n{template.description or ''}",
-                reply_markup=get_template_navigation(new_index, len(templates))
-            )
-            # Update message ID in state
-            await state.update_data(template_message_id=sent_message.message_id)
-    except Exception as e:
-        logger.error(f"Error updating template: {e}")
-        await callback.answer("Ошибка при обновлении шаблона")
-        return
-    
-    await callback.answer()
+    await _replace_template_message(callback, state, template, new_index, len(templates), "template_prev")
 
 
 @router.callback_query(F.data.startswith("template_next_"))
-async def template_next(callback: CallbackQuery, state: FSMContext, session, user, bot):
+async def template_next(callback: CallbackQuery, state: FSMContext, session):
     """Handle template next navigation."""
-    logger.info(f"Template next: {callback.data}")
+    logger.info("Template next: %s", callback.data)
     
     # Get current state data
     data = await state.get_data()
@@ -509,44 +540,13 @@ async def template_next(callback: CallbackQuery, state: FSMContext, session, use
     await state.update_data(current_template_index=new_index)
     
     # Update message with new template
-    try:
-        # Check if template has a Telegram file_id or a local path
-        if template.file_id:
-            # Use Telegram file ID
-            photo = template.file_id
-        else:
-            # Use local file path - extract filename from path
-            filename = template.path.split('/')[-1]
-            # Use the web app base URL from settings
-            photo = f"{settings.web_app_base_url}/uploads/{filename}"
-        
-        if callback.message:
-            # Delete the previous message and send a new one with the updated template
-            try:
-                await callback.message.delete()
-            except Exception as e:
-                logger.warning(f"Could not delete template message: {e}")
-            
-            # Send new template message
-            sent_message = await callback.message.answer_photo(
-                photo=photo,
-                caption=f"Шаблон {template.name}\n\n{template.description or ''}",
-                reply_markup=get_template_navigation(new_index, len(templates))
-            )
-            # Update message ID in state
-            await state.update_data(template_message_id=sent_message.message_id)
-    except Exception as e:
-        logger.error(f"Error updating template: {e}")
-        await callback.answer("Ошибка при обновлении шаблона")
-        return
-    
-    await callback.answer()
+    await _replace_template_message(callback, state, template, new_index, len(templates), "template_next")
 
 
 @router.callback_query(F.data.startswith("template_select_"))
-async def template_select(callback: CallbackQuery, state: FSMContext, session, user, bot):
+async def template_select(callback: CallbackQuery, state: FSMContext, session, user):
     """Handle template selection."""
-    logger.info(f"Template selected: {callback.data}")
+    logger.info("Template selected: %s", callback.data)
     
     # Get current state data
     data = await state.get_data()
@@ -602,8 +602,9 @@ async def template_select(callback: CallbackQuery, state: FSMContext, session, u
         request.selected_template_id = template_id
         request.status = "submitted"
         request.submitted_at = datetime.utcnow()
+        audit("request_submitted", request_id=request.id, category=request.category)
+        # Committed before the user is told the request went through
         await session.commit()
-        await session.refresh(request)
     await state.update_data(
         request_id=request.id,
         selected_template_id=template_id,
@@ -612,30 +613,29 @@ async def template_select(callback: CallbackQuery, state: FSMContext, session, u
     logger.info("template_select saved", extra={"request_id": request.id, "template_id": template_id})
     
     try:
-        if callback.message:
-            try:
-                await callback.message.edit_caption(
-                    caption=f"Шаблон {template.name}\n\n✅ Этот макет выбран",
-                    reply_markup=None
+        async with OutgoingCalls(callback, "template_select") as out:
+            out.answer("Макет сохранен ✅", show_alert=False)
+            if callback.message:
+                # The caption edit doesn't affect the order of the chat messages below
+                out.spawn(
+                    callback.message.edit_caption(
+                        caption=f"Шаблон {template.name}\n\n✅ Этот макет выбран",
+                        reply_markup=None
+                    ),
+                    "editMessageCaption",
                 )
-            except Exception as e:
-                logger.debug(f"Could not edit template caption: {e}")
-            await callback.message.answer(f"✅ Выбран шаблон: {template_name}")
-        await _finalize_request_without_photos(
-            state,
-            callback.message.answer if callback.message else None,
-            request
-        )
+                await out.call(callback.message.answer(f"✅ Выбран шаблон: {template_name}"), "sendMessage")
+            await _finalize_request_without_photos(
+                state,
+                callback.message.answer if callback.message else None,
+                request
+            )
     except Exception as e:
         logger.error(f"Error editing message: {e}")
-        await callback.answer("Ошибка при обработке запроса")
-        return
-    
-    await callback.answer("Макет сохранен ✅", show_alert=False)
 
 
 @router.message(LightVehicleStates.sending_photos, F.photo)
-async def handle_photo(message: Message, state: FSMContext, session):
+async def handle_photo(message: Message, state: FSMContext, session, bot):
     """Handle photo uploads."""
     logger.info("Photo handler called")
     # Get current state data
@@ -651,18 +651,26 @@ async def handle_photo(message: Message, state: FSMContext, session):
     # TODO: Implement actual file saving
     
     if photo_count < 4:
-        await message.answer(f"Получено фото {photo_count}/4")
+        # One progress message per chat, edited in place
+        await progress_tracker.report(
+            bot,
+            message.chat.id,
+            f"Получено фото {photo_count}/4",
+            reply_markup=get_cancel_menu()
+        )
     else:
+        progress_tracker.finish(message.chat.id)
         # All photos received
         if request_id:
-            # Update request status
-            statement = select(Request).where(Request.id == request_id)
-            result = await session.execute(statement)
-            request = result.scalar_one_or_none()
-            if request:
-                request.status = "submitted"
-                request.submitted_at = datetime.utcnow()
-                await session.commit()
+            # Update request status in a single statement
+            await session.execute(
+                update(Request)
+                .where(Request.id == request_id)
+                .values(status="submitted", submitted_at=datetime.utcnow())
+            )
+            audit("request_submitted", request_id=request_id, category="легковой")
+            # Committed before the user is told the request went through
+            await session.commit()
         
         await message.answer(
             THANKS + f"\n\nВаша заявка: #REQ-{request_id}",
@@ -677,19 +685,22 @@ async def cancel_callback(callback: CallbackQuery, state: FSMContext):
     logger.info("Cancel callback handler called")
     await state.clear()
     if callback.message:
-        try:
-            await callback.message.edit_text(
-                CANCELLED,
-                reply_markup=get_main_menu()
-            )
-        except Exception as e:
-            logger.error(f"Error editing message: {e}")
-            # If we can't edit, send a new message
-            await callback.message.answer(
-                CANCELLED,
-                reply_markup=get_main_menu()
-            )
-    await callback.answer()
+        progress_tracker.forget_chat(callback.message.chat.id)
+    async with OutgoingCalls(callback, "cancel_callback") as out:
+        out.answer()
+        if callback.message:
+            try:
+                await callback.message.edit_text(
+                    CANCELLED,
+                    reply_markup=get_main_menu()
+                )
+            except Exception as e:
+                logger.error(f"Error editing message: {e}")
+                # If we can't edit, send a new message
+                await callback.message.answer(
+                    CANCELLED,
+                    reply_markup=get_main_menu()
+                )
 
 
 @router.message(F.text == "Отмена")
@@ -697,6 +708,7 @@ async def cancel_handler(message: Message, state: FSMContext):
     """Handle cancellation."""
     logger.info("Cancel handler called")
     await state.clear()
+    progress_tracker.forget_chat(message.chat.id)
     await message.answer(
         CANCELLED,
         reply_markup=get_main_menu()
@@ -709,62 +721,63 @@ async def back_callback(callback: CallbackQuery, state: FSMContext):
     logger.info("Back callback handler called")
     current_state = await state.get_state()
     
-    if callback.message:
-        try:
-            if current_state == LightVehicleStates.choosing_license_option:
-                await state.set_state(LightVehicleStates.choosing_license)
-                await callback.message.edit_text(
-                    BACK_TEXT,
-                    reply_markup=get_license_yes_no_menu()
-                )
-            elif current_state == LightVehicleStates.choosing_no_license_option:
-                await state.set_state(LightVehicleStates.choosing_license)
-                await callback.message.edit_text(
-                    BACK_TEXT,
-                    reply_markup=get_license_yes_no_menu()
-                )
-            elif current_state == LightVehicleStates.entering_year:
-                await state.set_state(LightVehicleStates.choosing_brand)
-                await callback.message.edit_text(
-                    BACK_TEXT,
-                    reply_markup=get_yes_no_menu()
-                )
-            # For other states, just go back to main menu
-            else:
-                await state.clear()
-                await callback.message.edit_text(
-                    "Возвращаемся к началу...",
-                    reply_markup=get_main_menu()
-                )
-        except Exception as e:
-            logger.error(f"Error editing message: {e}")
-            # If we can't edit, send a new message
-            if current_state == LightVehicleStates.choosing_license_option:
-                await state.set_state(LightVehicleStates.choosing_license)
-                await callback.message.answer(
-                    BACK_TEXT,
-                    reply_markup=get_license_yes_no_menu()
-                )
-            elif current_state == LightVehicleStates.choosing_no_license_option:
-                await state.set_state(LightVehicleStates.choosing_license)
-                await callback.message.answer(
-                    BACK_TEXT,
-                    reply_markup=get_license_yes_no_menu()
-                )
-            elif current_state == LightVehicleStates.entering_year:
-                await state.set_state(LightVehicleStates.choosing_brand)
-                await callback.message.answer(
-                    BACK_TEXT,
-                    reply_markup=get_yes_no_menu()
-                )
-            # For other states, just go back to main menu
-            else:
-                await state.clear()
-                await callback.message.answer(
-                    "Возвращаемся к началу...",
-                    reply_markup=get_main_menu()
-                )
-    await callback.answer()
+    async with OutgoingCalls(callback, "back_callback") as out:
+        out.answer()
+        if callback.message:
+            try:
+                if current_state == LightVehicleStates.choosing_license_option:
+                    await state.set_state(LightVehicleStates.choosing_license)
+                    await callback.message.edit_text(
+                        BACK_TEXT,
+                        reply_markup=get_license_yes_no_menu()
+                    )
+                elif current_state == LightVehicleStates.choosing_no_license_option:
+                    await state.set_state(LightVehicleStates.choosing_license)
+                    await callback.message.edit_text(
+                        BACK_TEXT,
+                        reply_markup=get_license_yes_no_menu()
+                    )
+                elif current_state == LightVehicleStates.entering_year:
+                    await state.set_state(LightVehicleStates.choosing_brand)
+                    await callback.message.edit_text(
+                        BACK_TEXT,
+                        reply_markup=get_yes_no_menu()
+                    )
+                # For other states, just go back to main menu
+                else:
+                    await state.clear()
+                    await callback.message.edit_text(
+                        "Возвращаемся к началу...",
+                        reply_markup=get_main_menu()
+                    )
+            except Exception as e:
+                logger.error(f"Error editing message: {e}")
+                # If we can't edit, send a new message
+                if current_state == LightVehicleStates.choosing_license_option:
+                    await state.set_state(LightVehicleStates.choosing_license)
+                    await callback.message.answer(
+                        BACK_TEXT,
+                        reply_markup=get_license_yes_no_menu()
+                    )
+                elif current_state == LightVehicleStates.choosing_no_license_option:
+                    await state.set_state(LightVehicleStates.choosing_license)
+                    await callback.message.answer(
+                        BACK_TEXT,
+                        reply_markup=get_license_yes_no_menu()
+                    )
+                elif current_state == LightVehicleStates.entering_year:
+                    await state.set_state(LightVehicleStates.choosing_brand)
+                    await callback.message.answer(
+                        BACK_TEXT,
+                        reply_markup=get_yes_no_menu()
+                    )
+                # For other states, just go back to main menu
+                else:
+                    await state.clear()
+                    await callback.message.answer(
+                        "Возвращаемся к началу...",
+                        reply_markup=get_main_menu()
+                    )
 
 
 @router.message(F.text == "Назад")
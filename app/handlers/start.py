@@ -6,6 +6,7 @@ from aiogram.filters import Command
 from aiogram.types import Message
 
 from app.keyboards.inline import get_main_menu
+from app.services.progress import progress_tracker
 from domain.models import User
 
 
@@ -17,7 +18,8 @@ router = Router()
 @router.message(Command("start"))
 async def start_handler(message: Message, user: User):
     """Handle /start command."""
-    logger.info(f"Start handler called for user {user.tg_id}")
+    logger.info("Start handler called for user %s", user.tg_id)
+    progress_tracker.forget_chat(message.chat.id)
     try:
         await message.answer(
             f"👋 Привет, {user.first_name}!\n"
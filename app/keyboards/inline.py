@@ -1,111 +1,135 @@
-"""Inline keyboards for the bot."""
+"""Inline keyboards for the bot.
+
+Static keyboards are built once at import and registered in the keyboard
+registry, so every getter returns the same pre-serialized object. They are
+shared between updates and must not be mutated by handlers.
+"""
+
+from typing import Optional
 
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
+from app.keyboards.registry import registry
+
+
+MAIN_MENU = registry.register(InlineKeyboardMarkup(
+    inline_keyboard=[
+        [
+            InlineKeyboardButton(text="Легковой", callback_data="light_vehicle"),
+            InlineKeyboardButton(text="Грузовой", callback_data="cargo_vehicle")
+        ],
+        [
+            InlineKeyboardButton(text="Акции", callback_data="promotions"),
+        ]
+    ]
+))
+
+LICENSE_OPTIONS_LIGHT = registry.register(InlineKeyboardMarkup(
+    inline_keyboard=[
+        [
+            InlineKeyboardButton(text="Бесплатная оклейка", callback_data="wrap"),
+            InlineKeyboardButton(text="Платная оклейка", callback_data="paid_wrap")
+        ],
+        [
+            InlineKeyboardButton(text="Переклейка устаревшего бренда", callback_data="re_wrap")
+        ],
+        [
+            InlineKeyboardButton(text="Назад", callback_data="back"),
+            InlineKeyboardButton(text="Отмена", callback_data="cancel")
+        ]
+    ]
+))
+
+NO_LICENSE_OPTIONS = registry.register(InlineKeyboardMarkup(
+    inline_keyboard=[
+        [
+            InlineKeyboardButton(text="4 000 руб. — Светоотражающие полосы + шашечный пояс", callback_data="reflective_strips")
+        ],
+        [
+            InlineKeyboardButton(text="От 25 000 руб. — Полная оклейка по ГОСТ СПб", callback_data="full_wrap_gost")
+        ],
+        [
+            InlineKeyboardButton(text="Назад", callback_data="back"),
+            InlineKeyboardButton(text="Отмена", callback_data="cancel")
+        ]
+    ]
+))
+
+YES_NO_MENU = registry.register(InlineKeyboardMarkup(
+    inline_keyboard=[
+        [
+            InlineKeyboardButton(text="Да", callback_data="yes"),
+            InlineKeyboardButton(text="Нет", callback_data="no")
+        ],
+        [
+            InlineKeyboardButton(text="Отмена", callback_data="cancel")
+        ]
+    ]
+))
+
+LICENSE_YES_NO_MENU = registry.register(InlineKeyboardMarkup(
+    inline_keyboard=[
+        [
+            InlineKeyboardButton(text="Да", callback_data="license_yes"),
+            InlineKeyboardButton(text="Нет", callback_data="license_no")
+        ],
+        [
+            InlineKeyboardButton(text="Отмена", callback_data="cancel")
+        ]
+    ]
+))
+
+CANCEL_MENU = registry.register(InlineKeyboardMarkup(
+    inline_keyboard=[
+        [
+            InlineKeyboardButton(text="Отмена", callback_data="cancel")
+        ]
+    ]
+))
+
+BACK_CANCEL_MENU = registry.register(InlineKeyboardMarkup(
+    inline_keyboard=[
+        [
+            InlineKeyboardButton(text="Назад", callback_data="back"),
+            InlineKeyboardButton(text="Отмена", callback_data="cancel")
+        ]
+    ]
+))
+
 
 def get_main_menu() -> InlineKeyboardMarkup:
     """Main menu inline keyboard."""
-    return InlineKeyboardMarkup(
-        inline_keyboard=[
-            [
-                InlineKeyboardButton(text="Легковой", callback_data="light_vehicle"),
-                InlineKeyboardButton(text="Грузовой", callback_data="cargo_vehicle")
-            ],
-            [
-                InlineKeyboardButton(text="Акции", callback_data="promotions"),
-            ]
-        ]
-    )
+    return MAIN_MENU
 
 
 def get_license_options_light() -> InlineKeyboardMarkup:
     """License options inline keyboard for light vehicles."""
-    return InlineKeyboardMarkup(
-        inline_keyboard=[
-            [
-                InlineKeyboardButton(text="Бесплатная оклейка", callback_data="wrap"),
-                InlineKeyboardButton(text="Платная оклейка", callback_data="paid_wrap")
-            ],
-            [
-                InlineKeyboardButton(text="Переклейка устаревшего бренда", callback_data="re_wrap")
-            ],
-            [
-                InlineKeyboardButton(text="Назад", callback_data="back"),
-                InlineKeyboardButton(text="Отмена", callback_data="cancel")
-            ]
-        ]
-    )
+    return LICENSE_OPTIONS_LIGHT
 
 
 def get_no_license_options() -> InlineKeyboardMarkup:
     """No license options inline keyboard for light vehicles."""
-    return InlineKeyboardMarkup(
-        inline_keyboard=[
-            [
-                InlineKeyboardButton(text="4 000 руб. — Светоотражающие полосы + шашечный пояс", callback_data="reflective_strips")
-            ],
-            [
-                InlineKeyboardButton(text="От 25 000 руб. — Полная оклейка по ГОСТ СПб", callback_data="full_wrap_gost")
-            ],
-            [
-                InlineKeyboardButton(text="Назад", callback_data="back"),
-                InlineKeyboardButton(text="Отмена", callback_data="cancel")
-            ]
-        ]
-    )
+    return NO_LICENSE_OPTIONS
 
 
 def get_yes_no_menu() -> InlineKeyboardMarkup:
     """Yes/No inline keyboard."""
-    return InlineKeyboardMarkup(
-        inline_keyboard=[
-            [
-                InlineKeyboardButton(text="Да", callback_data="yes"),
-                InlineKeyboardButton(text="Нет", callback_data="no")
-            ],
-            [
-                InlineKeyboardButton(text="Отмена", callback_data="cancel")
-            ]
-        ]
-    )
+    return YES_NO_MENU
 
 
 def get_license_yes_no_menu() -> InlineKeyboardMarkup:
     """Specialized yes/no keyboard for the license question."""
-    return InlineKeyboardMarkup(
-        inline_keyboard=[
-            [
-                InlineKeyboardButton(text="Да", callback_data="license_yes"),
-                InlineKeyboardButton(text="Нет", callback_data="license_no")
-            ],
-            [
-                InlineKeyboardButton(text="Отмена", callback_data="cancel")
-            ]
-        ]
-    )
+    return LICENSE_YES_NO_MENU
 
 
 def get_cancel_menu() -> InlineKeyboardMarkup:
     """Cancel inline keyboard."""
-    return InlineKeyboardMarkup(
-        inline_keyboard=[
-            [
-                InlineKeyboardButton(text="Отмена", callback_data="cancel")
-            ]
-        ]
-    )
+    return CANCEL_MENU
 
 
 def get_back_cancel_menu() -> InlineKeyboardMarkup:
     """Back/Cancel inline keyboard."""
-    return InlineKeyboardMarkup(
-        inline_keyboard=[
-            [
-                InlineKeyboardButton(text="Назад", callback_data="back"),
-                InlineKeyboardButton(text="Отмена", callback_data="cancel")
-            ]
-        ]
-    )
+    return BACK_CANCEL_MENU
 
 
 def get_admin_request_actions(request_id: int) -> InlineKeyboardMarkup:
@@ -120,28 +144,48 @@ def get_admin_request_actions(request_id: int) -> InlineKeyboardMarkup:
     )
 
 
+@registry.memoize(maxsize=256)
 def get_template_navigation(current_index: int, total_templates: int) -> InlineKeyboardMarkup:
-    """Template navigation keyboard."""
+    """Template navigation keyboard (memoized by index and total)."""
     buttons = []
-    
+
     # Navigation buttons
     nav_row = []
     if current_index > 0:
         nav_row.append(InlineKeyboardButton(text="⬅️ Назад", callback_data=f"template_prev_{current_index}"))
-    
+
     nav_row.append(InlineKeyboardButton(text=f"{current_index + 1}/{total_templates}", callback_data="template_current"))
-    
+
     if current_index < total_templates - 1:
         nav_row.append(InlineKeyboardButton(text="Вперед ➡️", callback_data=f"template_next_{current_index}"))
-    
+
     if nav_row:
         buttons.append(nav_row)
-    
+
     # Action buttons
     action_row = [
         InlineKeyboardButton(text="Мой вариант", callback_data=f"template_select_{current_index}"),
         InlineKeyboardButton(text="Отмена", callback_data="cancel")
     ]
     buttons.append(action_row)
-    
+
     return InlineKeyboardMarkup(inline_keyboard=buttons)
+
+
+def get_find_pagination(query: str, page: int, has_more: bool) -> Optional[InlineKeyboardMarkup]:
+    """
+    Previous/next page buttons for /find search results.
+    
+    The query travels in the callback data; queries too long for the 64-byte
+    limit get no buttons.
+    """
+    row = []
+    if page > 1:
+        row.append(("⬅️ Назад", f"find:{page - 1}:{query}"))
+    if has_more:
+        row.append(("Вперед ➡️", f"find:{page + 1}:{query}"))
+    if not row or any(len(data.encode("utf-8")) > 64 for _, data in row):
+        return None
+    return InlineKeyboardMarkup(
+        inline_keyboard=[[InlineKeyboardButton(text=text, callback_data=data) for text, data in row]]
+    )
@@ -0,0 +1,83 @@
+"""Registry of prebuilt inline keyboards and their serialized form."""
+
+import json
+from collections import OrderedDict
+from functools import wraps
+from typing import Callable, Dict, Optional, Tuple
+
+from aiogram.types import InlineKeyboardMarkup
+
+
+def dump_markup(markup: InlineKeyboardMarkup) -> str:
+    """Serialize a markup the same way the Bot API session would."""
+    return json.dumps(markup.model_dump(exclude_none=True), ensure_ascii=False)
+
+
+class KeyboardRegistry:
+    """
+    Keeps keyboards that are built once and reused across updates.
+
+    Registered markups are shared objects: handlers must never mutate them.
+    The registry holds a strong reference to every registered markup, so the
+    ``id()`` used as lookup key can't be recycled while the entry is alive.
+    """
+
+    def __init__(self):
+        self._serialized: Dict[int, Tuple[InlineKeyboardMarkup, str]] = {}
+
+    def register(self, markup: InlineKeyboardMarkup) -> InlineKeyboardMarkup:
+        """Pre-serialize a markup and return it unchanged."""
+        self._serialized[id(markup)] = (markup, dump_markup(markup))
+        return markup
+
+    def serialized(self, markup: Optional[InlineKeyboardMarkup]) -> Optional[str]:
+        """Return cached JSON for a registered markup, None otherwise."""
+        if markup is None:
+            return None
+        entry = self._serialized.get(id(markup))
+        if entry is None or entry[0] is not markup:
+            return None
+        return entry[1]
+
+    def memoize(self, maxsize: int = 256):
+        """
+        Cache a parameterized keyboard builder by its positional arguments.
+
+        Args:
+            maxsize: Maximum number of distinct keyboards kept alive
+
+        Returns:
+            Decorator for keyboard builder functions
+        """
+        def decorator(builder: Callable[..., InlineKeyboardMarkup]):
+            cache: "OrderedDict[tuple, InlineKeyboardMarkup]" = OrderedDict()
+
+            @wraps(builder)
+            def wrapper(*args) -> InlineKeyboardMarkup:
+                markup = cache.get(args)
+                if markup is not None:
+                    cache.move_to_end(args)
+                    return markup
+                markup = self.register(builder(*args))
+                cache[args] = markup
+                if len(cache) > maxsize:
+                    _, evicted = cache.popitem(last=False)
+                    self._serialized.pop(id(evicted), None)
+                return markup
+
+            def cache_clear():
+                for markup in cache.values():
+                    self._serialized.pop(id(markup), None)
+                cache.clear()
+
+            wrapper.cache_clear = cache_clear
+            return wrapper
+
+        return decorator
+
+    def __len__(self) -> int:
+        return len(self._serialized)
+
+
+# Global registry instance
+registry = KeyboardRegistry()
@@ -0,0 +1,63 @@
+"""Cached registry of admin Telegram IDs."""
+
+import logging
+import time
+from typing import Set
+
+from sqlmodel import select
+
+from domain.models import Admin
+from infra.config import settings
+from infra.db import get_session
+
+
+logger = logging.getLogger(__name__)
+
+
+class AdminRegistry:
+    """
+    Admin IDs from ``settings.admin_ids`` and the ``Admin`` table.
+
+    The DB part is reloaded at most every ``ttl`` seconds so lookups on the
+    hot path (update classification) stay in memory.
+    """
+
+    def __init__(self, ttl: float = 60.0):
+        self.ttl = ttl
+        self._db_ids: Set[int] = set()
+        self._loaded_at = 0.0
+
+    def is_admin(self, tg_id: int) -> bool:
+        """Check whether the Telegram ID belongs to an admin (no I/O)."""
+        return tg_id in settings.admin_ids or tg_id in self._db_ids
+
+    def add(self, tg_id: int):
+        """Register an admin added at runtime."""
+        self._db_ids.add(tg_id)
+
+    def discard(self, tg_id: int):
+        """Forget an admin removed at runtime."""
+        self._db_ids.discard(tg_id)
+
+    async def refresh(self):
+        """Reload admin IDs from the database."""
+        async with get_session() as session:
+            result = await session.execute(select(Admin.tg_id).where(Admin.tg_id.is_not(None)))
+            self._db_ids = set(result.scalars().all())
+        self._loaded_at = time.monotonic()
+        logger.debug(f"Admin registry refreshed: {len(self._db_ids)} DB admins")
+
+    async def refresh_if_stale(self):
+        """Reload admin IDs when the cache is older than ``ttl``."""
+        if time.monotonic() - self._loaded_at < self.ttl:
+            return
+        try:
+            await self.refresh()
+        except Exception as e:
+            # Keep serving the previous snapshot; retry after the next ttl
+            self._loaded_at = time.monotonic()
+            logger.error(f"Error refreshing admin registry: {e}")
+
+
+# Global registry instance
+admin_registry = AdminRegistry()
@@ -0,0 +1,97 @@
+"""Request moderation: approve or reject submitted requests in bulk."""
+
+import logging
+from datetime import datetime
+from typing import List, NamedTuple, Optional, Sequence
+
+from sqlalchemy import select, update
+
+from domain.models import Request, User
+from infra.event_store import audit
+
+
+logger = logging.getLogger(__name__)
+
+# Target status -> audit event
+MODERATION_EVENTS = {
+    "approved": "request_approved",
+    "rejected": "request_rejected",
+}
+
+# Message sent to the user whose request was moderated
+USER_MESSAGES = {
+    "approved": "✅ Ваша заявка #{request_id} одобрена",
+    "rejected": "❌ Ваша заявка #{request_id} отклонена",
+}
+
+
+class ModeratedRequest(NamedTuple):
+    """A request whose status was changed, with its owner's Telegram ID."""
+
+    id: int
+    tg_id: Optional[int]
+
+
+async def set_requests_status(
+    session,
+    status: str,
+    request_ids: Optional[Sequence[int]] = None,
+    category: Optional[str] = None,
+    submitted_before: Optional[datetime] = None,
+    admin_tg_id: Optional[int] = None,
+) -> List[ModeratedRequest]:
+    """
+    Move submitted requests to ``status`` with one UPDATE ... RETURNING.
+
+    Only requests still in ``submitted`` are changed, so a request approved
+    by another admin in the meantime is skipped rather than overwritten.
+    Without ``request_ids`` every submitted request matching the filters is
+    moderated. The caller commits.
+
+    Args:
+        session: Database session
+        status: ``approved`` or ``rejected``
+        request_ids: Requests to moderate; None = all matching the filters
+        category: Only requests of this category
+        submitted_before: Only requests submitted before this time
+        admin_tg_id: Admin recorded in the audit events
+
+    Returns:
+        List[ModeratedRequest]: Changed requests in id order
+    """
+    if status not in MODERATION_EVENTS:
+        raise ValueError(f"Unknown moderation status: {status}")
+    if request_ids is not None and not request_ids:
+        return []
+
+    request = Request.__table__
+    user = User.__table__
+    statement = update(request).where(request.c.status == "submitted").values(status=status)
+    if request_ids is not None:
+        statement = statement.where(request.c.id.in_(set(request_ids)))
+    if category is not None:
+        statement = statement.where(request.c.category == category)
+    if submitted_before is not None:
+        statement = statement.where(request.c.submitted_at < submitted_before)
+    # SQLite's RETURNING can't name joined tables, a scalar subquery works on both
+    # dialects. SQLite renders it unqualified ("WHERE id = user_id"), which still
+    # resolves to user.id and request.user_id by scope.
+    owner_tg_id = select(user.c.tg_id).where(user.c.id == request.c.user_id).scalar_subquery()
+    result = await session.execute(statement.returning(request.c.id, owner_tg_id))
+    moderated = sorted(ModeratedRequest(*row) for row in result)
+
+    event = MODERATION_EVENTS[status]
+    for item in moderated:
+        audit(event, request_id=item.id, admin_tg_id=admin_tg_id)
+    logger.info(f"Set status {status} on {len(moderated)} requests (admin {admin_tg_id})")
+    return moderated
+
+
+def user_notifications(status: str, moderated: Sequence[ModeratedRequest]) -> List[tuple]:
+    """``(chat_id, text)`` pairs telling owners about their moderated requests."""
+    template = USER_MESSAGES[status]
+    return [
+        (item.tg_id, template.format(request_id=item.id))
+        for item in moderated
+        if item.tg_id is not None
+    ]
@@ -1,11 +1,21 @@
 """Notification service."""
 
-from typing import List
+import asyncio
+import contextvars
+import logging
+from typing import Iterable, Optional, Set, Tuple
 from aiogram import Bot
+from aiogram.exceptions import TelegramForbiddenError, TelegramRetryAfter
 
 from infra.config import settings
 
 
+logger = logging.getLogger(__name__)
+
+# Messages a BatchNotifier has in flight at once
+MAX_CONCURRENT_SENDS = 8
+
+
 async def notify_admins(bot: Bot, text: str, reply_markup=None):
     """
     Notify all admins.
@@ -38,4 +48,96 @@ async def notify_user(bot: Bot, user_id: int, text: str):
     try:
         await bot.send_message(chat_id=user_id, text=text)
     except Exception as e:
-        print(f"Error notifying user {user_id}: {e}")
\ No newline at end of file
+        print(f"Error notifying user {user_id}: {e}")
+
+
+class BatchNotifier:
+    """
+    Background sender for many user notifications at once.
+
+    Messages are queued and sent at most ``rate`` per second (Telegram allows
+    about 30 per second per bot), a few at a time, so approving a hundred
+    requests neither blocks the admin's reply nor runs into flood limits.
+    A ``RetryAfter`` pauses the whole queue and retries the message; users
+    who blocked the bot are skipped. The sending task is started on the
+    first enqueue and stops when the queue is empty.
+    """
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        self._sending: Set[asyncio.Task] = set()
+        self._slots = asyncio.Semaphore(MAX_CONCURRENT_SENDS)
+        self._next_at = 0.0
+
+    def enqueue(self, bot: Bot, messages: Iterable[Tuple[int, str]]) -> int:
+        """
+        Queue messages for sending.
+
+        Args:
+            bot: Telegram bot instance
+            messages: ``(chat_id, text)`` pairs
+
+        Returns:
+            int: Number of queued messages
+        """
+        count = 0
+        for chat_id, text in messages:
+            self._queue.put_nowait((bot, chat_id, text))
+            count += 1
+        if count and (self._task is None or self._task.done()):
+            # Fresh context: the sender outlives the update or request that started it
+            self._task = asyncio.create_task(self._run(), context=contextvars.Context())
+        return count
+
+    async def drain(self):
+        """Wait until every queued message has been sent or given up on."""
+        await self._queue.join()
+
+    async def close(self, timeout: float = 10.0):
+        """Send what is queued for up to ``timeout`` seconds, then stop."""
+        try:
+            await asyncio.wait_for(self.drain(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Dropping {self._queue.qsize()} unsent notifications on shutdown")
+        for task in [self._task, *self._sending]:
+            if task is not None:
+                task.cancel()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        interval = 1.0 / self.rate if self.rate > 0 else 0.0
+        while not self._queue.empty():
+            bot, chat_id, text = self._queue.get_nowait()
+            delay = self._next_at - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_at = max(self._next_at, loop.time()) + interval
+            await self._slots.acquire()
+            task = asyncio.create_task(self._send(bot, chat_id, text))
+            self._sending.add(task)
+            task.add_done_callback(self._sending.discard)
+            # Let sends that are about to finish release their slot (and maybe requeue)
+            await asyncio.sleep(0)
+            if self._queue.empty() and self._sending:
+                await asyncio.wait(set(self._sending))
+
+    async def _send(self, bot: Bot, chat_id: int, text: str):
+        try:
+            await bot.send_message(chat_id=chat_id, text=text)
+        except TelegramRetryAfter as e:
+            logger.warning(f"Flood limit hit, pausing notifications for {e.retry_after}s")
+            self._next_at = max(self._next_at, asyncio.get_running_loop().time() + e.retry_after)
+            self._queue.put_nowait((bot, chat_id, text))
+        except TelegramForbiddenError:
+            logger.info(f"User {chat_id} blocked the bot, notification skipped")
+        except Exception as e:
+            logger.error(f"Error notifying user {chat_id}: {e}")
+        finally:
+            self._slots.release()
+            self._queue.task_done()
+
+
+# Global notifier for bulk moderation results
+batch_notifier = BatchNotifier(settings.notify_rate)
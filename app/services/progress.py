@@ -0,0 +1,138 @@
+"""Coalesced progress messages for photo uploads."""
+
+import asyncio
+import logging
+import time
+from typing import Dict, Optional, Set, Tuple
+
+from aiogram import Bot
+
+from infra.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class _Progress:
+    """Progress message state for one chat and flow step."""
+
+    def __init__(self, message_id: Optional[int]):
+        self.message_id = message_id
+        self.text: Optional[str] = None
+        self.pending: Optional[str] = None
+        self.reply_markup = None
+        self.bot: Optional[Bot] = None
+        self.sent_at = 0.0
+        self.flush_task: Optional[asyncio.Task] = None
+        self.lock = asyncio.Lock()
+
+
+class ProgressTracker:
+    """
+    Keeps a single progress message per chat and edits it in place.
+
+    The first report sends the message (unless the flow already sent one and
+    passes its ``message_id``; a different ``message_id`` starts over).
+    Later reports edit it at most once per ``interval`` seconds: reports
+    arriving inside the window are coalesced and only the latest text is
+    written when the window closes, or right away when the step finishes.
+    Flows call :meth:`forget_chat` when they start, so a flow abandoned
+    halfway doesn't leave its message to the next one.
+    """
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self._entries: Dict[Tuple[int, str], _Progress] = {}
+        self._final_flushes: Set[asyncio.Task] = set()
+
+    async def report(
+        self,
+        bot: Bot,
+        chat_id: int,
+        text: str,
+        *,
+        key: str = "photos",
+        message_id: Optional[int] = None,
+        reply_markup=None,
+    ):
+        """
+        Show progress text in the chat's progress message.
+
+        Args:
+            bot: Telegram bot instance
+            chat_id: Chat to report to
+            text: Latest progress text
+            key: Progress message name within the chat
+            message_id: Existing message to edit instead of sending a new one
+            reply_markup: Keyboard kept on the progress message
+        """
+        entry = self._entries.get((chat_id, key))
+        if entry is not None and message_id is not None and entry.message_id != message_id:
+            # A new flow sent its own progress message; the old one is stale
+            self.finish(chat_id, key)
+            entry = None
+        if entry is None:
+            entry = self._entries[(chat_id, key)] = _Progress(message_id)
+
+        entry.pending = text
+        entry.reply_markup = reply_markup
+        entry.bot = bot
+        async with entry.lock:
+            if entry.message_id is None:
+                sent = await bot.send_message(chat_id=chat_id, text=text, reply_markup=reply_markup)
+                entry.message_id = sent.message_id
+                entry.text = text
+                entry.sent_at = time.monotonic()
+                if entry.pending == text:
+                    entry.pending = None
+                    return
+
+        if entry.flush_task is not None:
+            # An edit is already scheduled and will pick up the latest text
+            return
+        wait = self.interval - (time.monotonic() - entry.sent_at)
+        if wait <= 0:
+            await self._flush(bot, chat_id, entry)
+        else:
+            entry.flush_task = asyncio.create_task(self._flush_later(bot, chat_id, entry, wait))
+
+    def finish(self, chat_id: int, key: str = "photos"):
+        """Forget the progress message once its flow step is complete."""
+        entry = self._entries.pop((chat_id, key), None)
+        if entry and entry.flush_task:
+            entry.flush_task.cancel()
+            entry.flush_task = None
+            # The last report is still waiting for its window; write it now
+            task = asyncio.create_task(self._flush(entry.bot, chat_id, entry))
+            self._final_flushes.add(task)
+            task.add_done_callback(self._final_flushes.discard)
+
+    def forget_chat(self, chat_id: int):
+        """Drop all progress messages of a chat (e.g. on cancel)."""
+        for chat_key in [k for k in self._entries if k[0] == chat_id]:
+            self.finish(*chat_key)
+
+    async def _flush_later(self, bot: Bot, chat_id: int, entry: _Progress, wait: float):
+        await asyncio.sleep(wait)
+        entry.flush_task = None
+        await self._flush(bot, chat_id, entry)
+
+    async def _flush(self, bot: Bot, chat_id: int, entry: _Progress):
+        text, entry.pending = entry.pending, None
+        if text is None or text == entry.text:
+            return
+        entry.sent_at = time.monotonic()
+        try:
+            await bot.edit_message_text(
+                chat_id=chat_id,
+                message_id=entry.message_id,
+                text=text,
+                reply_markup=entry.reply_markup,
+            )
+            entry.text = text
+        except Exception as e:
+            logger.warning(f"Could not update progress message in chat {chat_id}: {e}")
+
+
+# Global tracker instance
+progress_tracker = ProgressTracker(interval=settings.progress_edit_interval)
@@ -0,0 +1,212 @@
+"""Bot API session helpers."""
+
+import asyncio
+import json
+import logging
+import ssl
+import time
+from typing import Any, AsyncGenerator, Optional
+
+import certifi
+from aiogram import Bot, __version__ as aiogram_version
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.client.telegram import PRODUCTION, TelegramAPIServer
+from aiogram.methods import TelegramMethod
+from aiohttp import ClientSession, FormData, TCPConnector
+from aiohttp.hdrs import USER_AGENT
+from aiohttp.http import SERVER_SOFTWARE
+
+from app.keyboards.registry import registry
+from infra.config import settings
+from infra.metrics import TELEGRAM_API_ERRORS, TELEGRAM_API_SECONDS
+from infra.tracing import span, start_span
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speedup
+    orjson = None
+
+
+logger = logging.getLogger(__name__)
+
+
+def json_loads(data: Any) -> Any:
+    """Decode a Bot API response (orjson when installed)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj: Any) -> str:
+    """Encode request values (orjson when installed)."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, ensure_ascii=False)
+
+
+class BotSession(AiohttpSession):
+    """
+    Aiohttp session that reuses pre-serialized keyboards from the registry.
+
+    It builds its own pooled connector from the constructor arguments
+    instead of aiogram's, so DNS caching and keep-alive are set through
+    public aiohttp parameters. Proxies are not supported.
+
+    Args:
+        limit: Max simultaneous connections to the Bot API
+        dns_cache_ttl: Seconds to cache DNS answers
+        keepalive_timeout: Seconds to keep an idle connection open
+        **kwargs: Passed to ``BaseSession`` (api, json_loads, timeout, ...)
+    """
+
+    def __init__(self, limit: int = 100, dns_cache_ttl: int = 3600, keepalive_timeout: float = 15.0, **kwargs: Any):
+        super().__init__(limit=limit, **kwargs)
+        self.limit = limit
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self._client: Optional[ClientSession] = None
+
+    async def create_session(self) -> ClientSession:
+        """Return the pooled HTTP session, creating it on first use or after close."""
+        if self._client is None or self._client.closed:
+            connector = TCPConnector(
+                ssl=ssl.create_default_context(cafile=certifi.where()),
+                limit=self.limit,
+                ttl_dns_cache=self.dns_cache_ttl,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self._client = ClientSession(
+                connector=connector,
+                headers={USER_AGENT: f"{SERVER_SOFTWARE} aiogram/{aiogram_version}"},
+            )
+        return self._client
+
+    async def close(self) -> None:
+        """Close the HTTP session and its pooled connections."""
+        if self._client is not None and not self._client.closed:
+            await self._client.close()
+            # Give the SSL connections a moment to close, as aiogram does
+            await asyncio.sleep(0.25)
+        await super().close()
+
+    def build_form_data(self, bot: Bot, method: TelegramMethod) -> FormData:
+        """Build request form, skipping the dump of registered keyboards."""
+        prepared = registry.serialized(getattr(method, "reply_markup", None))
+        if prepared is None:
+            return super().build_form_data(bot, method)
+
+        form = super().build_form_data(
+            bot, method.model_copy(update={"reply_markup": None})
+        )
+        form.add_field("reply_markup", prepared)
+        return form
+
+    async def stream_content(self, url: str, *args: Any, **kwargs: Any) -> AsyncGenerator[bytes, None]:
+        """Stream a file download, traced as one span (used by ``bot.download_file``)."""
+        download_span = start_span("telegram.download")
+        size = 0
+        error = None
+        try:
+            async for chunk in super().stream_content(url, *args, **kwargs):
+                size += len(chunk)
+                yield chunk
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            if download_span is not None:
+                download_span.set_attribute("bytes", size)
+                download_span.finish(error)
+
+
+class RequestMetricsMiddleware(BaseRequestMiddleware):
+    """Records Bot API call latency and errors by method."""
+
+    async def __call__(self, make_request: NextRequestMiddlewareType, bot: Bot, method: TelegramMethod):
+        name = getattr(method, "__api_method__", type(method).__name__)
+        started = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        except Exception as e:
+            TELEGRAM_API_ERRORS.inc(name, type(e).__name__)
+            raise
+        finally:
+            TELEGRAM_API_SECONDS.observe(time.perf_counter() - started, name)
+
+
+class RequestTracingMiddleware(BaseRequestMiddleware):
+    """Wraps each Bot API call in a span of the current update's trace."""
+
+    async def __call__(self, make_request: NextRequestMiddlewareType, bot: Bot, method: TelegramMethod):
+        with span(f"telegram.{getattr(method, '__api_method__', type(method).__name__)}"):
+            return await make_request(bot, method)
+
+
+def create_bot_session() -> BotSession:
+    """
+    Create a Bot API session configured from settings.
+
+    Connections to the Bot API are pooled (``telegram_connection_limit``) and
+    kept alive between calls, DNS answers are cached, and responses are
+    decoded with orjson when it is installed. Call latency is recorded per
+    Bot API method, and calls made while handling a traced update get spans.
+
+    Returns:
+        BotSession: New session; the caller owns it and must close it
+    """
+    api = PRODUCTION
+    if settings.telegram_api_base:
+        api = TelegramAPIServer.from_base(settings.telegram_api_base)
+    session = BotSession(
+        api=api,
+        limit=settings.telegram_connection_limit,
+        dns_cache_ttl=settings.telegram_dns_cache_ttl,
+        keepalive_timeout=settings.telegram_keepalive_timeout,
+        json_loads=json_loads,
+        json_dumps=json_dumps,
+        timeout=settings.telegram_request_timeout,
+    )
+    session.middleware(RequestMetricsMiddleware())
+    session.middleware(RequestTracingMiddleware())
+    return session
+
+
+def create_bot() -> Bot:
+    """Create a Bot using the configured session."""
+    return Bot(token=settings.bot_token, session=create_bot_session())
+
+
+_shared_bot: Optional[Bot] = None
+
+
+def get_shared_bot() -> Bot:
+    """Return the process-wide Bot (and its connection pool), creating it on first use."""
+    global _shared_bot
+    if _shared_bot is None:
+        _shared_bot = create_bot()
+    return _shared_bot
+
+
+async def close_shared_bot():
+    """Close the process-wide Bot session, if one was created."""
+    global _shared_bot
+    if _shared_bot is not None:
+        await _shared_bot.session.close()
+        _shared_bot = None
+
+
+def install_uvloop() -> bool:
+    """
+    Use uvloop as the asyncio event loop policy when it is installed.
+
+    Returns:
+        bool: True if uvloop is active for new event loops
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    logger.debug("Using uvloop event loop policy")
+    return True
@@ -0,0 +1,250 @@
+"""Process supervisor for running the bot and the web app side by side."""
+
+import logging
+import os
+import random
+import signal
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from infra.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUN_SCRIPT = os.path.join(PROJECT_ROOT, "run.py")
+
+# Restart delays: 1s, 2s, 4s ... up to a minute. The supervisor doesn't use
+# aiogram's Backoff to keep the parent process free of aiogram imports.
+RESTART_MIN_DELAY = 1.0
+RESTART_MAX_DELAY = 60.0
+# A child that stayed up this long is considered healthy again
+STABLE_AFTER = 30.0
+FORWARDED_SIGNALS = (signal.SIGINT, signal.SIGTERM, signal.SIGHUP)
+
+try:
+    CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+    PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):  # pragma: no cover - non-POSIX
+    CLOCK_TICKS = PAGE_SIZE = 0
+
+
+def process_tree(pid: int) -> List[int]:
+    """Return ``pid`` and all its descendants (Linux /proc; just ``pid`` elsewhere)."""
+    pids = [pid]
+    for current in pids:
+        try:
+            tids = os.listdir(f"/proc/{current}/task")
+        except OSError:
+            continue
+        for tid in tids:
+            try:
+                with open(f"/proc/{current}/task/{tid}/children") as f:
+                    pids.extend(int(child) for child in f.read().split())
+            except OSError:
+                continue
+    return pids
+
+
+def read_usage(pid: int) -> Optional[Tuple[int, float]]:
+    """
+    Read resident memory and CPU time of a process tree from /proc.
+
+    Args:
+        pid: Root process ID
+
+    Returns:
+        (rss_bytes, cpu_seconds) summed over the tree, or None if unavailable
+    """
+    if not CLOCK_TICKS:
+        return None
+    rss = 0
+    ticks = 0
+    found = False
+    for member in process_tree(pid):
+        try:
+            with open(f"/proc/{member}/stat") as f:
+                # Fields after the parenthesized command name
+                fields = f.read().rsplit(")", 1)[1].split()
+        except (OSError, IndexError):
+            continue
+        found = True
+        ticks += int(fields[11]) + int(fields[12])  # utime + stime
+        rss += int(fields[21]) * PAGE_SIZE  # rss in pages
+    if not found:
+        return None
+    return rss, ticks / CLOCK_TICKS
+
+
+def restart_delay(failures: int) -> float:
+    """Exponential restart delay with 10% jitter."""
+    delay = min(RESTART_MIN_DELAY * 2 ** failures, RESTART_MAX_DELAY)
+    return delay * random.uniform(0.9, 1.1)
+
+
+class Child:
+    """One supervised child process and its restart state."""
+
+    def __init__(self, name: str, argv: Sequence[str]):
+        self.name = name
+        self.argv = list(argv)
+        self.process: Optional[subprocess.Popen] = None
+        self.restarts = 0
+        self.started_at = 0.0
+        self.restart_at: Optional[float] = None
+        self.failures = 0
+        self._usage: Optional[Tuple[float, float]] = None  # (monotonic, cpu_seconds)
+
+    @property
+    def running(self) -> bool:
+        """Whether the child process is alive."""
+        return self.process is not None and self.process.poll() is None
+
+    def start(self):
+        """Start the child in its own session so terminal signals reach it only via us."""
+        self.process = subprocess.Popen(self.argv, cwd=PROJECT_ROOT, start_new_session=True)
+        self.started_at = time.monotonic()
+        self.restart_at = None
+        self._usage = None
+        logger.info(f"Started {self.name} (pid {self.process.pid})")
+
+    def send_signal(self, signum: int):
+        """Forward a signal to the child if it is running."""
+        if self.running:
+            try:
+                self.process.send_signal(signum)
+            except ProcessLookupError:
+                pass
+
+    def format_stats(self) -> str:
+        """One-line RSS/CPU summary for the periodic stats log."""
+        if not self.running:
+            return f"child={self.name} state=down restarts={self.restarts}"
+        text = f"child={self.name} pid={self.process.pid} restarts={self.restarts}"
+        usage = read_usage(self.process.pid)
+        if usage is None:
+            return text
+        rss, cpu = usage
+        now = time.monotonic()
+        text += f" rss={rss / (1024 * 1024):.1f}MB"
+        if self._usage is not None:
+            previous_at, previous_cpu = self._usage
+            text += f" cpu={(cpu - previous_cpu) / max(now - previous_at, 1e-6) * 100:.1f}%"
+        self._usage = (now, cpu)
+        return text
+
+
+class Supervisor:
+    """
+    Runs children as separate processes and keeps them up.
+
+    Termination signals are forwarded to every child and end supervision;
+    SIGHUP is only forwarded. A child that exits on its own is restarted
+    after an exponential backoff, which resets once the child has stayed up
+    for ``STABLE_AFTER`` seconds. Every ``stats_interval`` seconds the RSS
+    and CPU usage of each child (including its own worker processes) is
+    logged.
+    """
+
+    def __init__(self, children: Sequence[Child], stats_interval: int = 60, stop_timeout: float = 40.0):
+        self.children = list(children)
+        self.stats_interval = stats_interval
+        self.stop_timeout = stop_timeout
+        self.stopping = False
+        self._stats_at = 0.0
+
+    def handle_signal(self, signum, frame=None):
+        """Forward a signal to the children; stop supervising on SIGINT/SIGTERM."""
+        if signum != signal.SIGHUP:
+            self.stopping = True
+        logger.info(f"Received {signal.Signals(signum).name}, forwarding to children")
+        for child in self.children:
+            child.send_signal(signum)
+
+    def step(self):
+        """Check children once: schedule and perform restarts, log stats."""
+        now = time.monotonic()
+        for child in self.children:
+            if child.process is None:
+                child.start()
+                continue
+            if child.running:
+                continue
+            if child.restart_at is None:
+                if now - child.started_at >= STABLE_AFTER:
+                    child.failures = 0
+                delay = restart_delay(child.failures)
+                child.failures += 1
+                child.restart_at = now + delay
+                logger.error(
+                    f"{child.name} exited with code {child.process.returncode}, "
+                    f"restarting in {delay:.1f}s"
+                )
+            elif now >= child.restart_at:
+                child.restarts += 1
+                child.start()
+
+        if self.stats_interval and now - self._stats_at >= self.stats_interval:
+            self._stats_at = now
+            for child in self.children:
+                logger.info(f"Supervisor stats: {child.format_stats()}")
+
+    def run(self, poll_interval: float = 0.5) -> int:
+        """Supervise until a termination signal arrives, then stop the children."""
+        for signum in FORWARDED_SIGNALS:
+            signal.signal(signum, self.handle_signal)
+        self._stats_at = time.monotonic()
+        logger.info(f"Supervising: {', '.join(child.name for child in self.children)}")
+        try:
+            while not self.stopping:
+                self.step()
+                time.sleep(poll_interval)
+        except BaseException:
+            # Supervisor failure: children must not be orphaned
+            for child in self.children:
+                child.send_signal(signal.SIGTERM)
+            raise
+        finally:
+            self.shutdown()
+        return 0
+
+    def shutdown(self):
+        """Wait for children to exit after the forwarded signal, kill stragglers."""
+        deadline = time.monotonic() + self.stop_timeout
+        for child in self.children:
+            if child.process is None:
+                continue
+            try:
+                child.process.wait(timeout=max(0.0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                logger.warning(f"{child.name} did not stop in {self.stop_timeout:.0f}s, killing it")
+                child.process.kill()
+                child.process.wait()
+        logger.info("All children stopped")
+
+
+def default_children(extra: Sequence[str] = ()) -> List[Child]:
+    """
+    Children for ``run.py both``: the bot and the web app.
+
+    Args:
+        extra: Additional ``run.py`` modes to supervise (background workers)
+
+    Returns:
+        List[Child]: Children running ``run.py <mode>`` with this interpreter
+    """
+    modes: Dict[str, None] = dict.fromkeys(["bot", "web", *extra])
+    return [Child(mode, [sys.executable, RUN_SCRIPT, mode]) for mode in modes]
+
+
+def main(extra: Sequence[str] = ()) -> int:
+    """Run the bot and the web app (plus ``extra`` modes) under supervision."""
+    supervisor = Supervisor(
+        default_children(extra),
+        stats_interval=settings.supervisor_stats_interval,
+        stop_timeout=settings.web_graceful_timeout + 10,
+    )
+    return supervisor.run()
@@ -1,6 +1,7 @@
 """Formatting utilities."""
 
 import logging
+from typing import Any, Dict, List
 from domain.models import Request
 
 
@@ -85,4 +86,37 @@ def format_request_details(req: Request) -> str:
         for file in req.files:
             text += f"- {file.kind}: {file.file_id}\n"
     
-    return text
\ No newline at end of file
+    return text
+
+
+def format_search_results(query: str, results: List[Dict[str, Any]], page: int) -> str:
+    """
+    Format a page of full-text search results.
+    
+    Args:
+        query: Search text
+        results: Results from :func:`infra.search.search`
+        page: Page number, starting at 1
+        
+    Returns:
+        Formatted results text
+    """
+    if not results:
+        return f"🔍 По запросу «{query}» ничего не найдено"
+    
+    kind_emoji = {
+        "user": "👤",
+        "request": "📋",
+        "template": "🖼",
+        "audit": "🧾"
+    }
+    
+    text = f"🔍 «{query}», стр. {page}:\n\n"
+    for result in results:
+        snippet = result["snippet"] or ""
+        if len(snippet) > 80:
+            snippet = snippet[:80] + "…"
+        text += f"{kind_emoji.get(result['kind'], '•')} {result['title']}"
+        text += f" — {snippet}\n" if snippet else "\n"
+    
+    return text
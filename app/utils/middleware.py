@@ -1,13 +1,16 @@
 """Bot middleware."""
 
 import logging
-from typing import Any, Awaitable, Callable, Dict
-from datetime import datetime
+import time
+from typing import Any, Awaitable, Callable, Dict, Tuple
 from aiogram import BaseMiddleware
 from aiogram.types import TelegramObject, Message, CallbackQuery
-from sqlalchemy.ext.asyncio import AsyncSession
 
-from infra.db import get_session
+from infra.db import LazySession, track_queries
+from infra.event_store import AuditUnit
+from infra.logging import chat_id_var, update_id_var
+from infra.metrics import FSM_TRANSITIONS, HANDLER_SECONDS, UPDATE_DB_QUERIES, UPDATE_DB_SECONDS
+from infra.tracing import span, tracer
 from domain.models import User
 from sqlmodel import select
 
@@ -15,9 +18,65 @@ from sqlmodel import select
 logger = logging.getLogger(__name__)
 
 
+def handler_accepts(data: Dict[str, Any], name: str) -> bool:
+    """Check whether the resolved handler takes the given keyword argument."""
+    handler_obj = data.get("handler")
+    if handler_obj is None:
+        return True
+    return handler_obj.varkw or name in handler_obj.params
+
+
+def handler_labels(data: Dict[str, Any]) -> Tuple[str, str]:
+    """Return (router, handler) names for metrics, e.g. ("light", "template_next")."""
+    handler_obj = data.get("handler")
+    if handler_obj is None:
+        return "unknown", "unknown"
+    callback = handler_obj.callback
+    module = getattr(callback, "__module__", None) or "unknown"
+    return module.rsplit(".", 1)[-1], getattr(callback, "__name__", type(callback).__name__)
+
+
+async def load_user(session, user_obj, event_date) -> User:
+    """Get or create the DB user for a Telegram user and bump last_seen."""
+    tg_id = user_obj.id
+    logger.debug("Fetching user with tg_id: %s", tg_id)
+    statement = select(User).where(User.tg_id == tg_id)
+    result = await session.execute(statement)
+    user = result.scalar_one_or_none()
+
+    if not user:
+        logger.info("Creating new user with tg_id: %s", tg_id)
+        user = User(
+            tg_id=tg_id,
+            username=user_obj.username,
+            first_name=user_obj.first_name,
+            last_name=user_obj.last_name
+        )
+        session.add(user)
+        # Flush only: the id comes back via INSERT ... RETURNING and the
+        # update's unit of work is committed by the middleware
+        await session.flush()
+        logger.debug("New user created with id: %s", user.id)
+    elif event_date:
+        logger.debug("Updating last_seen for user id: %s", user.id)
+        user.last_seen = event_date
+    return user
+
+
 class UserMiddleware(BaseMiddleware):
-    """Middleware for user management."""
-    
+    """
+    Middleware for user management.
+
+    Injects a lazy ``session`` and resolves ``user`` only for handlers that
+    declare them, so DB-free handlers (cancel, back, year input, ...) run
+    without checking out a pooled connection. The session is one unit of work
+    per update: it is committed once after the handler returns and rolled
+    back (by closing it) if the handler raises.
+
+    It also sets the update_id/chat_id logging context for everything
+    logged while the update is handled.
+    """
+
     async def __call__(
         self,
         handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
@@ -25,65 +84,134 @@ class UserMiddleware(BaseMiddleware):
         data: Dict[str, Any]
     ) -> Any:
         """Process incoming events."""
+        event_update = data.get("event_update")
+        event_chat = data.get("event_chat")
+        update_token = update_id_var.set(event_update.update_id if event_update else None)
+        chat_token = chat_id_var.set(event_chat.id if event_chat else None)
+        try:
+            with span("middleware.user"):
+                return await self._process(handler, event, data)
+        finally:
+            update_id_var.reset(update_token)
+            chat_id_var.reset(chat_token)
+
+    async def _process(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
         # Handle both Message and CallbackQuery events
         user_obj = None
         event_date = None
         if isinstance(event, Message):
             user_obj = event.from_user
             event_date = event.date
-            logger.info("Starting UserMiddleware processing for message")
+            logger.debug("Starting UserMiddleware processing for message")
         elif isinstance(event, CallbackQuery):
             user_obj = event.from_user
             event_date = event.message.date if event.message else None
-            logger.info("Starting UserMiddleware processing for callback query")
-        
-        if user_obj:
-            try:
-                # Create a new session for this request using context manager
-                logger.debug("Creating database session")
-                async with get_session() as session:
-                    logger.debug("Database session created successfully")
-                    data["session"] = session
-                    
-                    # Get or create user
-                    tg_id = user_obj.id
-                    logger.debug(f"Fetching user with tg_id: {tg_id}")
-                    statement = select(User).where(User.tg_id == tg_id)
-                    result = await session.execute(statement)
-                    user = result.scalar_one_or_none()
-                    
-                    if not user:
-                        logger.info(f"Creating new user with tg_id: {tg_id}")
-                        user = User(
-                            tg_id=tg_id,
-                            username=user_obj.username,
-                            first_name=user_obj.first_name,
-                            last_name=user_obj.last_name
-                        )
-                        session.add(user)
-                        await session.commit()
-                        await session.refresh(user)
-                        logger.debug(f"New user created with id: {user.id}")
-                    else:
-                        # Update last seen and explicitly load all attributes to avoid lazy loading issues
-                        logger.debug(f"Updating last_seen for user id: {user.id}")
-                        if event_date:
-                            user.last_seen = event_date
-                            await session.commit()
-                        
-                        # Explicitly refresh the user object to load all attributes
-                        await session.refresh(user)
-                    
-                    data["user"] = user
-                    
-                    # Call handler and store the result
-                    logger.debug("Calling handler")
-                    result = await handler(event, data)
-                    logger.debug("Handler completed successfully")
-                    return result
-            except Exception as e:
-                logger.error(f"Error in UserMiddleware: {e}", exc_info=True)
-                raise
-        else:
+            logger.debug("Starting UserMiddleware processing for callback query")
+
+        if not user_obj:
             # For other types of events, just call the handler
-            return await handler(event, data)
\ No newline at end of file
+            return await handler(event, data)
+
+        session = LazySession()
+        try:
+            data["session"] = session
+            # Audit events are written only once the update's writes commit
+            with AuditUnit():
+                if handler_accepts(data, "user"):
+                    data["user"] = await load_user(session, user_obj, event_date)
+
+                # Call handler and store the result
+                logger.debug("Calling handler")
+                result = await handler(event, data)
+                logger.debug("Handler completed successfully")
+
+                # One commit per update for everything the handler wrote
+                await session.commit_if_opened()
+            return result
+        except Exception as e:
+            logger.error(f"Error in UserMiddleware: {e}", exc_info=True)
+            raise
+        finally:
+            await session.close()
+
+
+class MetricsMiddleware(BaseMiddleware):
+    """
+    Records handler latency, SQL statements per update and FSM transitions.
+
+    The update is also the unit for the likely-N+1 check in
+    :func:`infra.db.track_queries`.
+
+    Registered before ``UserMiddleware`` so the measured time and queries
+    include the user lookup and the unit-of-work commit.
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        """Process incoming events."""
+        state = data.get("state")
+        state_before = await state.get_state() if state else None
+        labels = handler_labels(data)
+        started = time.perf_counter()
+        with span("middleware.metrics"), track_queries(".".join(labels)) as queries:
+            try:
+                return await handler(event, data)
+            finally:
+                HANDLER_SECONDS.observe(time.perf_counter() - started, *labels)
+                UPDATE_DB_QUERIES.observe(queries.count)
+                UPDATE_DB_SECONDS.observe(queries.seconds)
+                if state:
+                    state_after = await state.get_state()
+                    if state_after != state_before:
+                        FSM_TRANSITIONS.inc(state_before or "none", state_after or "none")
+
+
+class TracingMiddleware(BaseMiddleware):
+    """
+    Starts a trace per update (outer ``update`` middleware).
+
+    Whether the update is recorded is up to the global tracer's sampling;
+    spans opened while handling an unrecorded update are no-ops.
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        """Process incoming updates."""
+        if not tracer.enabled:
+            return await handler(event, data)
+        event_chat = data.get("event_chat")
+        with tracer.start_trace(
+            "update",
+            update_id=getattr(event, "update_id", None),
+            type=getattr(event, "event_type", "unknown"),
+            chat_id=event_chat.id if event_chat else None,
+        ):
+            return await handler(event, data)
+
+
+class HandlerSpanMiddleware(BaseMiddleware):
+    """Wraps the handler itself in a span; registered as the innermost middleware."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        """Process incoming events."""
+        router, name = handler_labels(data)
+        with span(f"handler {router}.{name}"):
+            return await handler(event, data)
@@ -0,0 +1,120 @@
+"""Per-update helper for outgoing Telegram calls."""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Dict, List, Optional, Tuple
+
+from aiogram.types import CallbackQuery
+
+
+logger = logging.getLogger(__name__)
+
+
+class OutgoingStats:
+    """Accumulated call timings of one handler."""
+
+    def __init__(self):
+        self.runs = 0
+        self.calls = 0
+        self.serial = 0.0  # handler path plus spawned calls: time if awaited one by one
+        self.critical_path = 0.0  # wall time actually spent in the block
+
+    def as_dict(self) -> Dict[str, float]:
+        runs = self.runs or 1
+        return {
+            "runs": self.runs,
+            "calls_per_run": self.calls / runs,
+            "serial_ms": self.serial / runs * 1000,
+            "critical_path_ms": self.critical_path / runs * 1000,
+        }
+
+
+# Timings per handler name, read by benchmarks and debug tooling
+outgoing_stats: Dict[str, OutgoingStats] = {}
+
+
+class OutgoingCalls:
+    """
+    Runs a handler's independent Telegram calls concurrently.
+
+    ``answer()`` answers the callback query first so the client spinner stops
+    immediately. ``spawn()`` starts calls whose result nobody waits for
+    (deletes, caption edits), ``call()`` awaits calls whose result or order
+    matters. Leaving the block waits for everything spawned and records
+    serial vs. critical-path time for the handler: serial is the awaited
+    path of the block plus the duration of every spawned call, i.e. what the
+    handler took when everything was awaited in turn.
+
+    Example::
+
+        async with OutgoingCalls(callback, "template_next") as out:
+            out.answer()
+            out.spawn(callback.message.delete(), "deleteMessage")
+            sent = await out.call(callback.message.answer_photo(...), "sendPhoto")
+    """
+
+    def __init__(self, callback: Optional[CallbackQuery] = None, name: str = "handler"):
+        self.callback = callback
+        self.name = name
+        self.answered = False
+        self._tasks: List[asyncio.Task] = []
+        self._spawned: List[Tuple[str, float]] = []
+        self._calls = 0
+        self._started = 0.0
+
+    async def __aenter__(self) -> "OutgoingCalls":
+        self._started = time.perf_counter()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        awaited_path = time.perf_counter() - self._started
+        if self._tasks:
+            await asyncio.gather(*self._tasks)
+        self._record(awaited_path, time.perf_counter() - self._started)
+        return False
+
+    def answer(self, text: Optional[str] = None, **kwargs: Any):
+        """Answer the callback query in the background (only once)."""
+        if self.callback is None or self.answered:
+            return
+        self.answered = True
+        self.spawn(self.callback.answer(text, **kwargs), "answerCallbackQuery")
+
+    def spawn(self, call: Awaitable[Any], name: str) -> asyncio.Task:
+        """Start a call concurrently; failures are logged, not raised."""
+        task = asyncio.create_task(self._timed(call, name, spawned=True))
+        self._tasks.append(task)
+        return task
+
+    async def call(self, call: Awaitable[Any], name: str) -> Any:
+        """Await a call whose result or ordering matters."""
+        return await self._timed(call, name, spawned=False)
+
+    async def _timed(self, call: Awaitable[Any], name: str, spawned: bool) -> Any:
+        self._calls += 1
+        started = time.perf_counter()
+        try:
+            return await call
+        except Exception as e:
+            if not spawned:
+                raise
+            logger.warning(f"{self.name}: {name} failed: {e}")
+            return None
+        finally:
+            if spawned:
+                self._spawned.append((name, time.perf_counter() - started))
+
+    def _record(self, awaited_path: float, wall: float):
+        serial = awaited_path + sum(duration for _, duration in self._spawned)
+        stats = outgoing_stats.setdefault(self.name, OutgoingStats())
+        stats.runs += 1
+        stats.calls += self._calls
+        stats.serial += serial
+        stats.critical_path += wall
+        if logger.isEnabledFor(logging.DEBUG):
+            spawned = ", ".join(f"{name}={duration * 1000:.0f}ms" for name, duration in self._spawned)
+            logger.debug(
+                f"{self.name}: serial {serial * 1000:.0f}ms, critical path {wall * 1000:.0f}ms "
+                f"(concurrent: {spawned or 'none'})"
+            )
@@ -0,0 +1,369 @@
+"""Long polling with bounded, prioritized handler concurrency."""
+
+import asyncio
+import json
+import logging
+import os
+import signal
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update
+from aiogram.utils.backoff import Backoff, BackoffConfig
+
+from app.services.admin_registry import admin_registry
+from infra.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+BACKOFF_CONFIG = BackoffConfig(min_delay=1.0, max_delay=5.0, factor=1.3, jitter=0.1)
+
+ADMIN_LANE = "admin"
+USER_LANE = "user"
+
+
+def update_sender_id(update: Update) -> Optional[int]:
+    """Return the Telegram ID of the user who caused the update."""
+    try:
+        event = update.event
+    except Exception:
+        return None
+    from_user = getattr(event, "from_user", None)
+    return from_user.id if from_user else None
+
+
+class Lane:
+    """Update queue, concurrency budget and latency samples for one class of updates."""
+
+    def __init__(self, name: str, concurrency: int, queue_size: int = 1000, samples: int = 2048):
+        self.name = name
+        self.concurrency = concurrency
+        self.handled = 0
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._slots = asyncio.Semaphore(concurrency)
+        self._tasks: Set[asyncio.Task] = set()
+        self._latencies: deque = deque(maxlen=samples)
+
+    @property
+    def inflight(self) -> int:
+        """Number of updates currently being handled in this lane."""
+        return len(self._tasks)
+
+    @property
+    def queued(self) -> int:
+        """Number of fetched updates waiting for a free slot."""
+        return self._queue.qsize()
+
+    def observe(self, seconds: float):
+        """Record the fetch-to-done latency of one update."""
+        self.handled += 1
+        self._latencies.append(seconds)
+
+    def percentiles(self) -> Dict[str, float]:
+        """Return p50/p95/p99 latency in seconds over recent updates."""
+        if not self._latencies:
+            return {}
+        ordered = sorted(self._latencies)
+        last = len(ordered) - 1
+        return {
+            name: ordered[min(last, int(round(q * last)))]
+            for name, q in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99))
+        }
+
+    def format_stats(self) -> str:
+        """One-line summary for the periodic stats log."""
+        text = (
+            f"lane={self.name} in_flight={self.inflight}/{self.concurrency} "
+            f"queued={self.queued} handled={self.handled}"
+        )
+        for name, value in self.percentiles().items():
+            text += f" {name}={value * 1000:.0f}ms"
+        return text
+
+
+class UpdatePoller:
+    """
+    Fetches updates with getUpdates and feeds them to the dispatcher.
+
+    Updates are split into lanes: those sent by admins run in the ``admin``
+    lane, everything else in the ``user`` lane. Fetched updates go into a
+    bounded queue per lane, and a worker per lane starts them as slots free
+    up, so a saturated user lane doesn't stop fetching and admin updates of
+    later batches still start right away. Fetching pauses only when a lane's
+    queue is full, which bounds memory under a sustained flood.
+
+    Telegram considers an update delivered once the next getUpdates passes a
+    higher offset, i.e. when it is fetched, not when it is handled. Updates
+    still queued when a shutdown runs out of ``drain_timeout`` are therefore
+    saved to ``pending_file`` and handled first on the next start; updates
+    whose handler was already running are cancelled.
+    """
+
+    def __init__(
+        self,
+        dp: Dispatcher,
+        bot: Bot,
+        *,
+        timeout: int,
+        limit: int,
+        max_inflight: int,
+        stats_interval: int,
+        admin_inflight: int = 8,
+        queue_size: int = 1000,
+        drain_timeout: float = 30.0,
+        pending_file: Optional[str] = None,
+        is_admin: Optional[Callable[[int], bool]] = None,
+        before_batch: Optional[Callable[[], Any]] = None,
+        allowed_updates: Optional[List[str]] = None,
+        **kwargs: Any,
+    ):
+        self.dp = dp
+        self.bot = bot
+        self.timeout = timeout
+        self.limit = limit
+        self.stats_interval = stats_interval
+        self.drain_timeout = drain_timeout
+        self.pending_file = pending_file
+        self.allowed_updates = allowed_updates
+        self.is_admin = is_admin or (lambda tg_id: False)
+        self.before_batch = before_batch
+        self.kwargs = kwargs
+
+        self.lanes: Dict[str, Lane] = {
+            ADMIN_LANE: Lane(ADMIN_LANE, admin_inflight, queue_size),
+            USER_LANE: Lane(USER_LANE, max_inflight, queue_size),
+        }
+        self._poll_task: Optional[asyncio.Task] = None
+        self._workers: List[asyncio.Task] = []
+        # Fetched updates not yet in a lane queue: (lane, update, received_at)
+        self._backlog: deque = deque()
+
+    @property
+    def inflight(self) -> int:
+        """Number of updates currently being handled."""
+        return sum(lane.inflight for lane in self.lanes.values())
+
+    @property
+    def queued(self) -> int:
+        """Number of fetched updates waiting for a free slot."""
+        return len(self._backlog) + sum(lane.queued for lane in self.lanes.values())
+
+    def classify(self, update: Update) -> Lane:
+        """Pick the lane for an update by its sender."""
+        sender_id = update_sender_id(update)
+        if sender_id is not None and self.is_admin(sender_id):
+            return self.lanes[ADMIN_LANE]
+        return self.lanes[USER_LANE]
+
+    async def run(self):
+        """Poll until stopped, then handle queued updates and wait for in-flight ones."""
+        lanes = ", ".join(f"{name}={lane.concurrency}" for name, lane in self.lanes.items())
+        logger.info(
+            f"Polling started: timeout={self.timeout}s limit={self.limit} "
+            f"lanes=({lanes}) allowed_updates={self.allowed_updates}"
+        )
+        self._load_pending()
+        stats_task = asyncio.create_task(self._report_stats())
+        self._workers = [asyncio.create_task(self._work(lane)) for lane in self.lanes.values()]
+        self._poll_task = asyncio.create_task(self._poll())
+        try:
+            await self._poll_task
+        except asyncio.CancelledError:
+            logger.info("Polling stopped")
+        finally:
+            stats_task.cancel()
+            await self.drain()
+
+    def stop(self):
+        """Stop fetching new updates."""
+        if self._poll_task and not self._poll_task.done():
+            self._poll_task.cancel()
+
+    async def drain(self, timeout: Optional[float] = None):
+        """
+        Handle already fetched updates and wait for in-flight handlers to complete.
+
+        Args:
+            timeout: Seconds to wait (defaults to ``drain_timeout``); updates
+                still queued then are saved to ``pending_file``
+        """
+        timeout = self.drain_timeout if timeout is None else timeout
+        if self.inflight or self.queued:
+            logger.info(f"Waiting for {self.inflight} in-flight and {self.queued} queued updates")
+            try:
+                await asyncio.wait_for(self._finish(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Drain timed out after {timeout}s with {self.inflight} updates in flight")
+        for task in self._workers:
+            task.cancel()
+        for lane in self.lanes.values():
+            for task in list(lane._tasks):
+                task.cancel()
+        self._save_pending()
+
+    async def _finish(self):
+        await self._queue_backlog()
+        await asyncio.gather(*(lane._queue.join() for lane in self.lanes.values()))
+        tasks = set()
+        for lane in self.lanes.values():
+            tasks |= lane._tasks
+        if tasks:
+            await asyncio.wait(tasks)
+
+    def _save_pending(self):
+        """Save updates that were fetched but never started, so they aren't lost."""
+        updates = [update for _, update, _ in self._backlog]
+        self._backlog.clear()
+        for lane in self.lanes.values():
+            while not lane._queue.empty():
+                updates.append(lane._queue.get_nowait()[0])
+                lane._queue.task_done()
+        if not updates:
+            return
+        if not self.pending_file:
+            logger.error(f"Dropping {len(updates)} unhandled updates, no pending file configured")
+            return
+        updates.sort(key=lambda update: update.update_id)
+        data = [update.model_dump(mode="json", by_alias=True, exclude_none=True) for update in updates]
+        try:
+            os.makedirs(os.path.dirname(self.pending_file) or ".", exist_ok=True)
+            with open(self.pending_file, "w") as file:
+                json.dump(data, file)
+        except OSError as e:
+            logger.error(f"Dropping {len(updates)} unhandled updates, can't save them: {e}")
+            return
+        logger.warning(f"Saved {len(updates)} unhandled updates to {self.pending_file}")
+
+    def _load_pending(self):
+        """Put updates saved by the previous shutdown in front of the first fetch."""
+        if not self.pending_file or not os.path.exists(self.pending_file):
+            return
+        try:
+            with open(self.pending_file) as file:
+                data = json.load(file)
+            os.remove(self.pending_file)
+        except (OSError, ValueError) as e:
+            logger.error(f"Can't load unhandled updates from {self.pending_file}: {e}")
+            return
+        received_at = time.monotonic()
+        for item in data:
+            update = Update.model_validate(item, context={"bot": self.bot})
+            self._backlog.append((self.classify(update), update, received_at))
+        logger.info(f"Loaded {len(data)} unhandled updates from the last shutdown")
+
+    async def _queue_backlog(self):
+        while self._backlog:
+            lane, update, received_at = self._backlog[0]
+            await self.dispatch(lane, update, received_at)
+            self._backlog.popleft()
+
+    async def _poll(self):
+        backoff = Backoff(config=BACKOFF_CONFIG)
+        offset = None
+        await self._queue_backlog()
+        while True:
+            if self.before_batch:
+                await self.before_batch()
+            try:
+                updates = await self.bot.get_updates(
+                    offset=offset,
+                    timeout=self.timeout,
+                    limit=self.limit,
+                    allowed_updates=self.allowed_updates,
+                    request_timeout=self.timeout + 10,
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Failed to fetch updates: {type(e).__name__}: {e}")
+                await backoff.asleep()
+                continue
+            backoff.reset()
+            if not updates:
+                continue
+
+            received_at = time.monotonic()
+            offset = updates[-1].update_id + 1
+            batch = [(self.classify(update), update, received_at) for update in updates]
+            # Admin updates first, so a full user queue can't hold them back
+            batch.sort(key=lambda item: item[0].name != ADMIN_LANE)
+            self._backlog.extend(batch)
+            await self._queue_backlog()
+
+    async def dispatch(self, lane: Lane, update: Update, received_at: float):
+        """Queue an update in its lane, waiting only if the lane's queue is full."""
+        await lane._queue.put((update, received_at))
+
+    async def _work(self, lane: Lane):
+        while True:
+            await lane._slots.acquire()
+            try:
+                update, received_at = await lane._queue.get()
+            except BaseException:
+                lane._slots.release()
+                raise
+            task = asyncio.create_task(self._handle(lane, update, received_at))
+            lane._tasks.add(task)
+            task.add_done_callback(lane._tasks.discard)
+            lane._queue.task_done()
+
+    async def _handle(self, lane: Lane, update: Update, received_at: float):
+        try:
+            await self.dp.feed_update(self.bot, update, **self.kwargs)
+        except Exception as e:
+            logger.error(f"Error handling update {update.update_id}: {e}", exc_info=True)
+        finally:
+            lane.observe(time.monotonic() - received_at)
+            lane._slots.release()
+
+    async def _report_stats(self):
+        while True:
+            await asyncio.sleep(self.stats_interval)
+            for lane in self.lanes.values():
+                logger.info(f"Polling stats: {lane.format_stats()} in last {self.stats_interval}s")
+                lane.handled = 0
+
+
+async def run_polling(dp: Dispatcher, bot: Bot, **kwargs: Any):
+    """
+    Run the dispatcher with the bounded poller configured from settings.
+
+    Args:
+        dp: Dispatcher with all routers included
+        bot: Bot instance
+        **kwargs: Extra data passed to handlers
+    """
+    allowed_updates = dp.resolve_used_update_types()
+    poller = UpdatePoller(
+        dp,
+        bot,
+        timeout=settings.polling_timeout,
+        limit=settings.polling_limit,
+        max_inflight=settings.max_inflight_updates,
+        admin_inflight=settings.admin_inflight_updates,
+        queue_size=settings.polling_queue_size,
+        drain_timeout=settings.polling_drain_timeout,
+        pending_file=os.path.join(settings.base_dir, settings.polling_pending_file),
+        stats_interval=settings.polling_stats_interval,
+        is_admin=admin_registry.is_admin,
+        before_batch=admin_registry.refresh_if_stale,
+        allowed_updates=allowed_updates,
+        **kwargs,
+    )
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, poller.stop)
+        except (NotImplementedError, RuntimeError):
+            pass
+
+    workflow_data = {"dispatcher": dp, "bots": [bot], **dp.workflow_data, **kwargs}
+    await dp.emit_startup(bot=bot, **workflow_data)
+    try:
+        await poller.run()
+    finally:
+        await dp.emit_shutdown(bot=bot, **workflow_data)
@@ -0,0 +1,175 @@
+"""Response compression for the web app."""
+
+import asyncio
+import zlib
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional, gzip is always available
+    brotli = None
+
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+# A Server-Sent Events stream must reach the client event by event
+UNCOMPRESSED_TYPES = ("text/event-stream",)
+BROTLI_QUALITY = 4
+# Bodies larger than this are compressed off the event loop
+THREAD_MIN_SIZE = 256 * 1024
+
+
+def accepted_encoding(accept_encoding: str) -> str:
+    """
+    Pick the response encoding for an ``Accept-Encoding`` header.
+
+    Args:
+        accept_encoding: Header value, e.g. ``gzip, deflate, br``
+
+    Returns:
+        str: ``br``, ``gzip`` or an empty string for an uncompressed response
+    """
+    accepted = set()
+    for item in accept_encoding.lower().split(","):
+        coding, _, params = item.partition(";")
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip())
+    if brotli is not None and ("br" in accepted or "*" in accepted):
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return ""
+
+
+def _compressible(content_type: str) -> bool:
+    content_type = content_type.split(";")[0].strip().lower()
+    if content_type in UNCOMPRESSED_TYPES:
+        return False
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class _Compressor:
+    """Incremental br/gzip compressor; ``flush`` makes every chunk decodable on arrival."""
+
+    def __init__(self, encoding: str, level: int):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=BROTLI_QUALITY)
+            self._zlib = None
+        else:
+            self._brotli = None
+            self._zlib = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, flush: bool = False) -> bytes:
+        if self._brotli is not None:
+            out = self._brotli.process(data)
+            return out + self._brotli.flush() if flush else out
+        out = self._zlib.compress(data)
+        return out + self._zlib.flush(zlib.Z_SYNC_FLUSH) if flush else out
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self._brotli is not None:
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush()
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing text and JSON responses with brotli or gzip.
+
+    Brotli is used when the client accepts it and the ``brotli`` package is
+    installed, gzip otherwise. Responses smaller than ``minimum_size``,
+    already encoded responses, binary files (photos, templates) and the
+    ``/events`` stream are passed through untouched. Streaming bodies are
+    compressed chunk by chunk, flushing after each one.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, level: int = 6):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.minimum_size <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = accepted_encoding(accept_encoding)
+        if not encoding:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        compressor = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                headers = {name.lower(): value for name, value in message.get("headers", [])}
+                content_type = headers.get(b"content-type", b"").decode("latin-1")
+                passthrough = b"content-encoding" in headers or not _compressible(content_type)
+                if passthrough:
+                    await send(message)
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                if not more_body and len(body) < self.minimum_size:
+                    # Too small to be worth it; still varies by Accept-Encoding
+                    start["headers"] = _with_vary(start.get("headers", []))
+                    await send(start)
+                    await send(message)
+                    return
+                compressor = _Compressor(encoding, self.level)
+                headers = [
+                    (name, value) for name, value in start.get("headers", [])
+                    if name.lower() != b"content-length"
+                ]
+                headers.append((b"content-encoding", encoding.encode("latin-1")))
+                if not more_body:
+                    if len(body) >= THREAD_MIN_SIZE:
+                        body = await asyncio.to_thread(compressor.finish, body)
+                    else:
+                        body = compressor.finish(body)
+                    headers.append((b"content-length", str(len(body)).encode("latin-1")))
+                    start["headers"] = _with_vary(headers)
+                    await send(start)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                start["headers"] = _with_vary(headers)
+                await send(start)
+
+            body = compressor.compress(body, flush=True) if more_body else compressor.finish(body)
+            await send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
+
+
+def _with_vary(headers):
+    for index, (name, value) in enumerate(headers):
+        if name.lower() == b"vary":
+            if b"accept-encoding" not in value.lower():
+                headers = list(headers)
+                headers[index] = (name, value + b", Accept-Encoding")
+            return headers
+    return list(headers) + [(b"vary", b"Accept-Encoding")]
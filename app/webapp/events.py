@@ -0,0 +1,210 @@
+"""Live request feed for the admin panel, served as Server-Sent Events."""
+
+import asyncio
+import contextvars
+import json
+import logging
+from contextlib import suppress
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from domain.models import Request, User
+from domain.schemas import RequestResponse
+from infra.config import settings
+from infra.db import engine
+from infra.request_feed import CHANNEL
+
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_SECONDS = 15  # comment line keeping proxies from closing idle streams
+RETRY_SECONDS = 5  # client reconnect delay, and feed restart delay after an error
+BATCH_LIMIT = 500  # changes per load; a larger burst (bulk load) resets clients instead
+NOTIFY_COALESCE_SECONDS = 0.1
+
+RESET = "event: reset\ndata: {}\n\n"
+
+
+def format_event(event: str, data: Dict) -> str:
+    """Encode one SSE message."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+class RequestFeed:
+    """
+    Fan-out of request changes (see :mod:`infra.request_feed`) to SSE clients.
+
+    One task per web worker follows the changes: it LISTENs on PostgreSQL and
+    polls ``request_change`` every ``poll_interval`` seconds on SQLite. It
+    loads each batch of changed requests once and pushes the same encoded
+    events to every client, and it only runs while a client is connected.
+
+    Events are ``request_created`` and ``request_status_changed`` with the
+    request as returned by ``/requests``, and ``reset`` when changes may have
+    been missed (bulk load, reconnect, slow client): the client should then
+    reload ``/requests``.
+    """
+
+    def __init__(self, engine: AsyncEngine, poll_interval: float = 1.0, queue_size: int = 100):
+        self.engine = engine
+        self.poll_interval = poll_interval
+        self.queue_size = queue_size
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self) -> asyncio.Queue:
+        """Queue receiving encoded events (``None`` when the feed closes)."""
+        queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        self._subscribers.add(queue)
+        if self._task is None:
+            # Own context, so the feed's queries aren't counted against the
+            # HTTP request that happened to start it
+            self._task = asyncio.get_running_loop().create_task(self._run(), context=contextvars.Context())
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        """Stop delivering to ``queue``; the last client stops the feed task."""
+        self._subscribers.discard(queue)
+        if not self._subscribers and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def publish(self, message: str):
+        """Deliver an encoded event to every client."""
+        for queue in self._subscribers:
+            if queue.full():
+                # The client isn't reading: drop its backlog, it reloads instead
+                while not queue.empty():
+                    queue.get_nowait()
+                message_for_queue = RESET
+            else:
+                message_for_queue = message
+            queue.put_nowait(message_for_queue)
+
+    async def stream(self) -> AsyncIterator[str]:
+        """SSE body for one client; unsubscribes when the client disconnects."""
+        queue = self.subscribe()
+        try:
+            yield f"retry: {RETRY_SECONDS * 1000}\n\n"
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                if message is None:
+                    return
+                yield message
+        finally:
+            self.unsubscribe(queue)
+
+    async def close(self):
+        """End every stream and stop the feed task."""
+        for queue in self._subscribers:
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(None)
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+
+    async def _run(self):
+        resync = False
+        while True:
+            try:
+                if self.engine.dialect.name == "postgresql":
+                    await self._listen(resync)
+                else:
+                    await self._poll(resync)
+            except Exception as e:
+                logger.error(f"Request feed failed, restarting in {RETRY_SECONDS}s: {e}")
+            resync = True
+            await asyncio.sleep(RETRY_SECONDS)
+
+    async def _poll(self, resync: bool):
+        async with self.engine.connect() as conn:
+            cursor = await self._last_seq(conn)
+        if resync:
+            self.publish(RESET)
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            async with self.engine.connect() as conn:
+                result = await conn.execute(
+                    text(
+                        "SELECT seq, request_id, kind FROM request_change "
+                        "WHERE seq > :cursor ORDER BY seq LIMIT :limit"
+                    ),
+                    {"cursor": cursor, "limit": BATCH_LIMIT + 1},
+                )
+                rows = result.all()
+                if not rows:
+                    continue
+                # seq has no gaps, so a jump means rows were pruned before we saw them
+                if len(rows) > BATCH_LIMIT or rows[0].seq != cursor + 1:
+                    cursor = await self._last_seq(conn)
+                    self.publish(RESET)
+                    continue
+            cursor = rows[-1].seq
+            await self._publish_changes([(row.request_id, row.kind) for row in rows])
+
+    @staticmethod
+    async def _last_seq(conn) -> int:
+        result = await conn.execute(text("SELECT coalesce(max(seq), 0) FROM request_change"))
+        return result.scalar_one()
+
+    async def _listen(self, resync: bool):
+        notifications: asyncio.Queue = asyncio.Queue()
+
+        def on_notify(connection, pid, channel, payload):
+            notifications.put_nowait(payload)
+
+        async with self.engine.connect() as conn:
+            raw = await conn.get_raw_connection()
+            connection = raw.driver_connection  # asyncpg
+            connection.add_termination_listener(lambda _: notifications.put_nowait(None))
+            await connection.add_listener(CHANNEL, on_notify)
+            try:
+                if resync:
+                    self.publish(RESET)
+                while True:
+                    payloads = [await notifications.get()]
+                    await asyncio.sleep(NOTIFY_COALESCE_SECONDS)
+                    while not notifications.empty():
+                        payloads.append(notifications.get_nowait())
+                    if None in payloads:
+                        raise ConnectionError("LISTEN connection closed")
+                    if len(payloads) > BATCH_LIMIT:
+                        self.publish(RESET)
+                        continue
+                    changes = [payload.split(":") for payload in payloads]
+                    await self._publish_changes([(int(request_id), kind) for request_id, kind in changes])
+            finally:
+                with suppress(Exception):
+                    await connection.remove_listener(CHANNEL, on_notify)
+
+    async def _publish_changes(self, changes: List[Tuple[int, str]]):
+        kinds: Dict[int, str] = {}
+        for request_id, kind in changes:
+            # A request created and moderated within one batch is announced as created
+            if kinds.get(request_id) != "created":
+                kinds[request_id] = kind
+        statement = (
+            select(Request.__table__, User.username)
+            .join(User, Request.user_id == User.id, isouter=True)
+            .where(Request.id.in_(kinds))
+            .order_by(Request.id)
+        )
+        async with self.engine.connect() as conn:
+            result = await conn.execute(statement)
+            rows = result.mappings().all()
+        for row in rows:
+            data = RequestResponse.model_validate(dict(row)).model_dump(mode="json")
+            self.publish(format_event(f"request_{kinds[row['id']]}", data))
+
+
+# Global feed instance, one per web worker
+request_feed = RequestFeed(engine, settings.request_feed_poll_interval)
@@ -1,35 +1,100 @@
 """Main web application module for displaying database content."""
 
+import asyncio
+import itertools
 import logging
 import os
 import hashlib
 import hmac
 from datetime import datetime
-from typing import List, Optional, Dict
-from fastapi import FastAPI, HTTPException, Depends, Cookie, Body, UploadFile, File as FastAPIFile, Form
-from fastapi.responses import HTMLResponse, FileResponse, JSONResponse, StreamingResponse
+from contextlib import asynccontextmanager
+from typing import List, Literal, Optional, Dict
+from fastapi import FastAPI, HTTPException, Request as HTTPRequest, Depends, Cookie, Body, Header, Query, UploadFile, File as FastAPIFile, Form
+from fastapi.responses import HTMLResponse, FileResponse, JSONResponse, StreamingResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import select
+from sqlalchemy import select, text
+from sqlalchemy.orm import joinedload, selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 
-from infra.db import get_session
+from infra.audit_archive import read_archive
+from infra.event_store import AuditUnit, audit, event_store, publish_pending_audit
+from infra.search import SEARCH_KINDS, search
+from infra.table_version import table_versions
+from infra.db import engine, get_session
 from domain.models import User, Admin, Request, File, Audit, Template
-from domain.schemas import RequestResponse
+from domain.schemas import RequestFullResponse, RequestResponse, UserResponse
 from infra.config import settings
+from infra.logging import setup_logging
 from app.webapp.templates import generate_table_html, format_datetime
+from app.webapp.events import request_feed
+from app.webapp.compression import CompressionMiddleware
+from app.webapp.responses import FastJSONResponse, etag_matches, not_modified, row_dicts, versioned_json, weak_etag
+from app.services.moderation import set_requests_status, user_notifications
+from app.services.notifier import batch_notifier
+from app.services.telegram_session import close_shared_bot, get_shared_bot
+from app.webapp.metrics import RequestMetricsMiddleware, write_metrics_snapshots
+from infra.metrics import CONTENT_TYPE, metrics
 import httpx
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Most requests /requests/batch returns at once
+MAX_BATCH_IDS = 100
+
+# Most requests moderated by one /requests/bulk-status call with ids
+MAX_BULK_STATUS_IDS = 500
+
+# Deepest /search page; ranking reads every result up to the page, so deep pages are full scans
+MAX_SEARCH_PAGE = 50
+
+# /requests list: exactly the RequestResponse fields, username from the user.
+# Table columns, not ORM attributes, so rows skip the ORM loading path.
+REQUEST_LIST_COLUMNS = [
+    User.__table__.c.username if name == "username" else Request.__table__.c[name]
+    for name in RequestResponse.model_fields
+]
+
+
+async def list_etag(session, *tables: str) -> str:
+    """Weak ETag of a list endpoint reading ``tables``; call before selecting the rows."""
+    versions = await table_versions(session, tables)
+    return weak_etag(*(f"{table}-{versions.get(table, 0)}" for table in tables))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm up the worker before it accepts requests and release pools on exit."""
+    # Worker processes start from a fresh interpreter; log through the queue
+    # handler like the bot, to the console only (workers can't share a log file)
+    setup_logging(files=False)
+    # Open the first pooled DB connection (and run dialect setup) now rather
+    # than on the first admin request
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+    os.makedirs(os.path.join(settings.base_dir, "storage", "uploads"), exist_ok=True)
+    snapshots = None
+    if settings.web_metrics_dir:
+        snapshots = asyncio.create_task(write_metrics_snapshots(settings.web_metrics_dir))
+    logger.info(f"Web worker {os.getpid()} ready")
+    yield
+    if snapshots is not None:
+        snapshots.cancel()
+    await request_feed.close()
+    await batch_notifier.close()
+    await close_shared_bot()
+    await event_store.close()
+    await engine.dispose()
+    logger.info(f"Web worker {os.getpid()} stopped")
+
+
 # Create FastAPI app
 app = FastAPI(
     title="Yandex GO Car Registration Bot - Admin Panel",
     description="Web interface for viewing database content",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan,
 )
 
 # Add CORS middleware
@@ -41,6 +106,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# gzip/brotli for JSON and HTML bodies above WEB_COMPRESS_MIN_SIZE
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.web_compress_min_size,
+    level=settings.web_compress_level,
+)
+
+# Latency/status/SQL metrics per route, served at /metrics
+app.add_middleware(RequestMetricsMiddleware)
+
+
 # Pydantic models for auth
 class TelegramAuthData(BaseModel):
     id: int
@@ -58,6 +134,15 @@ class AdminCreate(BaseModel):
     first_name: Optional[str] = None
     last_name: Optional[str] = None
 
+class RequestFilter(BaseModel):
+    category: Optional[str] = None
+    submitted_before: Optional[datetime] = None
+
+class BulkStatusUpdate(BaseModel):
+    status: Literal["approved", "rejected"]
+    ids: Optional[List[int]] = None
+    filter: Optional[RequestFilter] = None
+
 
 def verify_telegram_auth(auth_data: dict, bot_token: str) -> bool:
     """Verify Telegram auth data using bot token."""
@@ -167,6 +252,7 @@ async def telegram_auth(auth_data: TelegramAuthData):
                 "photo_url": auth_data.photo_url
             }
         })
+        audit("admin_login", admin_tg_id=auth_data.id)
         
         # Set cookie with user ID
         response.set_cookie(
@@ -236,6 +322,34 @@ async def logout():
     return response
 
 
+# Clients allowed to read /metrics without WEB_METRICS_TOKEN
+LOOPBACK_HOSTS = ("127.0.0.1", "::1", "localhost")
+
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics(http_request: HTTPRequest, authorization: Optional[str] = Header(None)):
+    """
+    Prometheus metrics of the web app.
+
+    With several workers (``WEB_METRICS_DIR`` set) the numbers of all
+    workers are summed, whichever worker answers. With
+    ``WEB_METRICS_TOKEN`` set the scraper must send it as a bearer token;
+    without it only loopback clients are served, so the endpoint isn't
+    public through the frontend's /api/ proxy.
+    """
+    if settings.web_metrics_token:
+        expected = f"Bearer {settings.web_metrics_token}"
+        if not hmac.compare_digest((authorization or "").encode(), expected.encode()):
+            raise HTTPException(status_code=401, detail="Metrics token required")
+    elif http_request.client is None or http_request.client.host not in LOOPBACK_HOSTS:
+        raise HTTPException(status_code=403, detail="Metrics are only served to local clients")
+    if settings.web_metrics_dir:
+        content = await asyncio.to_thread(metrics.render_directory, settings.web_metrics_dir)
+    else:
+        content = metrics.render()
+    return Response(content=content, media_type=CONTENT_TYPE)
+
+
 @app.get("/config")
 async def get_config():
     """Get public configuration."""
@@ -258,16 +372,17 @@ async def read_root():
         }
     }
 
-@app.get("/users", response_model=List[User])
-@app.get("/users/json", response_model=List[User])
-async def get_users_json():
+@app.get("/users", response_model=List[User], response_class=FastJSONResponse)
+@app.get("/users/json", response_model=List[User], response_class=FastJSONResponse)
+async def get_users_json(if_none_match: Optional[str] = Header(None)):
     """Get all users from the database (JSON format)."""
     try:
         async with get_session() as session:
-            statement = select(User)
-            result = await session.execute(statement)
-            users = result.scalars().all()
-            return users
+            etag = await list_etag(session, "user")
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+            result = await session.execute(select(User.__table__))
+            return versioned_json(row_dicts(result), etag)
     except Exception as e:
         logger.error(f"Error fetching users: {e}")
         raise HTTPException(status_code=500, detail="Error fetching users")
@@ -351,19 +466,21 @@ async def create_admin(payload: AdminCreate, tg_user_id: Optional[str] = Cookie(
         )
         session.add(new_admin)
         await session.commit()
+        audit("admin_added", admin_tg_id=user_tg_id, added_by=requester_tg_id)
         return {"success": True}
 
 
-@app.get("/admins", response_model=List[Admin])
-@app.get("/admins/json", response_model=List[Admin])
-async def get_admins_json():
+@app.get("/admins", response_model=List[Admin], response_class=FastJSONResponse)
+@app.get("/admins/json", response_model=List[Admin], response_class=FastJSONResponse)
+async def get_admins_json(if_none_match: Optional[str] = Header(None)):
     """Get all admins from the database (JSON format)."""
     try:
         async with get_session() as session:
-            statement = select(Admin)
-            result = await session.execute(statement)
-            admins = result.scalars().all()
-            return admins
+            etag = await list_etag(session, "admin")
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+            result = await session.execute(select(Admin.__table__))
+            return versioned_json(row_dicts(result), etag)
     except Exception as e:
         logger.error(f"Error fetching admins: {e}")
         raise HTTPException(status_code=500, detail="Error fetching admins")
@@ -397,21 +514,20 @@ async def get_admins_html():
         logger.error(f"Error fetching admins: {e}")
         return HTMLResponse(content=f"<h1>Error fetching admins: {e}</h1>", status_code=500)
 
-@app.get("/requests", response_model=List[RequestResponse])
-@app.get("/requests/json", response_model=List[RequestResponse])
-async def get_requests_json():
+@app.get("/requests", response_model=List[RequestResponse], response_class=FastJSONResponse)
+@app.get("/requests/json", response_model=List[RequestResponse], response_class=FastJSONResponse)
+async def get_requests_json(if_none_match: Optional[str] = Header(None)):
     """Get all requests from the database (JSON format)."""
     try:
         async with get_session() as session:
-            statement = select(Request, User.username).join(User, Request.user_id == User.id, isouter=True)
+            etag = await list_etag(session, "request", "user")
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+            statement = select(*REQUEST_LIST_COLUMNS).join(
+                User.__table__, Request.__table__.c.user_id == User.__table__.c.id, isouter=True
+            )
             result = await session.execute(statement)
-            rows = result.all()
-            responses = []
-            for request, username in rows:
-                data = RequestResponse.model_validate(request).model_dump()
-                data["username"] = username
-                responses.append(data)
-            return responses
+            return versioned_json(row_dicts(result), etag)
     except Exception as e:
         logger.error(f"Error fetching requests: {e}")
         raise HTTPException(status_code=500, detail="Error fetching requests")
@@ -447,6 +563,128 @@ async def get_requests_html():
         logger.error(f"Error fetching requests: {e}")
         return HTMLResponse(content=f"<h1>Error fetching requests: {e}</h1>", status_code=500)
 
+@app.get("/events")
+async def request_events():
+    """
+    Live request feed (Server-Sent Events).
+
+    Pushes ``request_created`` and ``request_status_changed`` with the
+    request as in ``/requests``, and ``reset`` when the client should reload
+    ``/requests``.
+    """
+    return StreamingResponse(
+        request_feed.stream(),
+        media_type="text/event-stream",
+        # X-Accel-Buffering: nginx would otherwise hold events back
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+def upload_url(path: Optional[str]) -> Optional[str]:
+    """URL of a stored upload, served by ``/uploads/{filename}``."""
+    return f"/uploads/{os.path.basename(path)}" if path else None
+
+
+def request_full_statement():
+    """Requests with user and template joined; files come in one extra SELECT for all rows."""
+    return select(Request).options(
+        joinedload(Request.user),
+        joinedload(Request.selected_template),
+        selectinload(Request.files),
+    )
+
+
+def request_full_response(request: Request) -> dict:
+    """Serialize a request loaded by :func:`request_full_statement`."""
+    data = RequestResponse.model_validate(request).model_dump()
+    data["username"] = request.user.username if request.user else None
+    data["user"] = UserResponse.model_validate(request.user).model_dump() if request.user else None
+    data["files"] = [
+        {"id": file.id, "kind": file.kind, "created_at": file.created_at, "url": upload_url(file.path)}
+        for file in request.files
+    ]
+    template = request.selected_template
+    data["selected_template"] = {
+        "id": template.id,
+        "name": template.name,
+        "description": template.description,
+        "preview_url": f"/templates/{template.id}/preview",
+    } if template else None
+    return data
+
+
+# Declared before /requests/{request_id}, which would otherwise match "batch"
+@app.get("/requests/batch", response_model=List[RequestFullResponse])
+async def get_requests_batch(ids: str):
+    """
+    Get several requests with user, files and template (list prefetching).
+
+    ``ids`` is a comma-separated list of at most ``MAX_BATCH_IDS`` request
+    IDs; results follow its order and unknown IDs are skipped.
+    """
+    try:
+        request_ids = list(dict.fromkeys(int(value) for value in ids.split(",") if value.strip()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+    if len(request_ids) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_IDS} ids per batch")
+    if not request_ids:
+        return []
+    try:
+        async with get_session() as session:
+            result = await session.execute(request_full_statement().where(Request.id.in_(request_ids)))
+            requests = {request.id: request for request in result.unique().scalars()}
+            return [request_full_response(requests[request_id]) for request_id in request_ids if request_id in requests]
+    except Exception as e:
+        logger.error(f"Error fetching request batch {ids}: {e}")
+        raise HTTPException(status_code=500, detail="Error fetching requests")
+
+@app.post("/requests/bulk-status")
+async def bulk_update_request_status(update: BulkStatusUpdate, tg_user_id: Optional[str] = Cookie(None)):
+    """
+    Approve or reject submitted requests (only for admins).
+
+    Pass either ``ids`` or a ``filter`` (``{}`` = every submitted request).
+    All matching requests change in one UPDATE; requests that are no longer
+    submitted are skipped. Their owners are notified in the background.
+    """
+    if not tg_user_id:
+        raise HTTPException(status_code=401, detail="Не авторизован")
+    try:
+        requester_tg_id = int(tg_user_id)
+    except ValueError:
+        raise HTTPException(status_code=401, detail="Неверная авторизация")
+    if not await check_admin_access(requester_tg_id):
+        raise HTTPException(status_code=403, detail="Доступ запрещен")
+    if (update.ids is None) == (update.filter is None):
+        raise HTTPException(status_code=400, detail="Pass either ids or filter")
+    if update.ids is not None and len(update.ids) > MAX_BULK_STATUS_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_STATUS_IDS} ids per call")
+    request_filter = update.filter or RequestFilter()
+    try:
+        with AuditUnit():
+            async with get_session() as session:
+                moderated = await set_requests_status(
+                    session,
+                    update.status,
+                    request_ids=update.ids,
+                    category=request_filter.category,
+                    submitted_before=request_filter.submitted_before,
+                    admin_tg_id=requester_tg_id,
+                )
+                await session.commit()
+            publish_pending_audit()
+    except Exception as e:
+        logger.error(f"Error setting status {update.status} on requests: {e}")
+        raise HTTPException(status_code=500, detail="Error updating requests")
+
+    notifications = user_notifications(update.status, moderated)
+    if notifications:
+        batch_notifier.enqueue(get_shared_bot(), notifications)
+    updated = [item.id for item in moderated]
+    done = set(updated)
+    skipped = [request_id for request_id in dict.fromkeys(update.ids or []) if request_id not in done]
+    return {"status": update.status, "updated": updated, "skipped": skipped}
+
 @app.get("/requests/{request_id}", response_model=RequestResponse)
 async def get_request_by_id(request_id: int):
     """Get a single request by ID (JSON format)."""
@@ -468,6 +706,22 @@ async def get_request_by_id(request_id: int):
         logger.error(f"Error fetching request {request_id}: {e}")
         raise HTTPException(status_code=500, detail="Error fetching request")
 
+@app.get("/requests/{request_id}/full", response_model=RequestFullResponse)
+async def get_request_full(request_id: int):
+    """Get a request with its user, files and selected template in one response."""
+    try:
+        async with get_session() as session:
+            result = await session.execute(request_full_statement().where(Request.id == request_id))
+            request = result.unique().scalar_one_or_none()
+            if not request:
+                raise HTTPException(status_code=404, detail="Request not found")
+            return request_full_response(request)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching request {request_id}: {e}")
+        raise HTTPException(status_code=500, detail="Error fetching request")
+
 @app.get("/requests/{request_id}/files", response_model=List[File])
 async def get_files_by_request_id(request_id: int):
     """Get all files for a specific request (JSON format)."""
@@ -543,16 +797,17 @@ async def get_template_preview(template_id: int):
         logger.error(f"Error serving template preview {template_id}: {e}")
         raise HTTPException(status_code=500, detail="Error serving template preview")
 
-@app.get("/files", response_model=List[File])
-@app.get("/files/json", response_model=List[File])
-async def get_files_json():
+@app.get("/files", response_model=List[File], response_class=FastJSONResponse)
+@app.get("/files/json", response_model=List[File], response_class=FastJSONResponse)
+async def get_files_json(if_none_match: Optional[str] = Header(None)):
     """Get all files from the database (JSON format)."""
     try:
         async with get_session() as session:
-            statement = select(File)
-            result = await session.execute(statement)
-            files = result.scalars().all()
-            return files
+            etag = await list_etag(session, "file")
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+            result = await session.execute(select(File.__table__))
+            return versioned_json(row_dicts(result), etag)
     except Exception as e:
         logger.error(f"Error fetching files: {e}")
         raise HTTPException(status_code=500, detail="Error fetching files")
@@ -584,57 +839,108 @@ async def get_files_html():
         logger.error(f"Error fetching files: {e}")
         return HTMLResponse(content=f"<h1>Error fetching files: {e}</h1>", status_code=500)
 
-@app.get("/audit", response_model=List[Audit])
-@app.get("/audit/json", response_model=List[Audit])
-async def get_audit_logs_json():
-    """Get all audit logs from the database (JSON format)."""
+@app.get("/audit", response_model=List[Audit], response_class=FastJSONResponse)
+@app.get("/audit/json", response_model=List[Audit], response_class=FastJSONResponse)
+async def get_audit_logs_json(if_none_match: Optional[str] = Header(None)):
+    """Get all audit logs from the event store (JSON format)."""
     try:
-        async with get_session() as session:
-            statement = select(Audit)
-            result = await session.execute(statement)
-            audit_logs = result.scalars().all()
-            return audit_logs
+        etag = weak_etag(f"audit-{await event_store.version()}")
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        events = await event_store.query()
+        return versioned_json([event._asdict() for event in events], etag)
     except Exception as e:
         logger.error(f"Error fetching audit logs: {e}")
         raise HTTPException(status_code=500, detail="Error fetching audit logs")
 
 @app.get("/audit/html", response_class=HTMLResponse)
 async def get_audit_logs_html():
-    """Get all audit logs from the database (HTML format)."""
+    """Get all audit logs from the event store (HTML format)."""
     try:
-        async with get_session() as session:
-            statement = select(Audit)
-            result = await session.execute(statement)
-            audit_logs = result.scalars().all()
-            
-            headers = ["ID", "Event", "Payload", "Created At"]
-            rows = []
-            for log in audit_logs:
-                # Truncate payload for display
-                payload = log.payload[:100] + "..." if len(log.payload) > 100 else log.payload
-                rows.append([
-                    log.id,
-                    log.event,
-                    payload,
-                    format_datetime(log.created_at)
-                ])
-            
-            html = generate_table_html("Audit Logs", headers, rows)
-            return HTMLResponse(content=html, status_code=200)
+        audit_logs = await event_store.query()
+        
+        headers = ["ID", "Event", "Payload", "Created At"]
+        rows = []
+        for log in audit_logs:
+            # Truncate payload for display
+            payload = log.payload[:100] + "..." if len(log.payload) > 100 else log.payload
+            rows.append([
+                log.id,
+                log.event,
+                payload,
+                format_datetime(log.created_at)
+            ])
+        
+        html = generate_table_html("Audit Logs", headers, rows)
+        return HTMLResponse(content=html, status_code=200)
     except Exception as e:
         logger.error(f"Error fetching audit logs: {e}")
         return HTMLResponse(content=f"<h1>Error fetching audit logs: {e}</h1>", status_code=500)
 
-@app.get("/templates", response_model=List[Template])
-@app.get("/templates/json", response_model=List[Template])
-async def get_templates_json():
+@app.get("/audit/archive")
+async def get_audit_archive(
+    event: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(1000, ge=1, le=10000),
+    tg_user_id: Optional[str] = Cookie(None),
+):
+    """Query audit records moved to the archive by retention, by event and time range (only for admins)."""
+    if not tg_user_id:
+        raise HTTPException(status_code=401, detail="Не авторизован")
+    try:
+        requester_tg_id = int(tg_user_id)
+    except ValueError:
+        raise HTTPException(status_code=401, detail="Неверная авторизация")
+    if not await check_admin_access(requester_tg_id):
+        raise HTTPException(status_code=403, detail="Доступ запрещен")
+
+    def collect():
+        return list(itertools.islice(read_archive(event, since, until), limit))
+
+    try:
+        return await asyncio.to_thread(collect)
+    except Exception as e:
+        logger.error(f"Error reading audit archive: {e}")
+        raise HTTPException(status_code=500, detail="Error reading audit archive")
+
+@app.get("/search")
+async def search_endpoint(
+    q: str,
+    kind: Optional[str] = None,
+    page: int = Query(1, ge=1, le=MAX_SEARCH_PAGE),
+    per_page: int = 20,
+):
+    """
+    Ranked full-text search over users, requests, templates and audit events.
+
+    ``kind`` restricts the search to comma-separated kinds (user, request,
+    template, audit). Pages go up to ``MAX_SEARCH_PAGE``; refine the query
+    to get further.
+    """
+    kinds = [value.strip() for value in kind.split(",") if value.strip()] if kind else None
+    if kinds and not set(kinds) <= set(SEARCH_KINDS):
+        raise HTTPException(status_code=400, detail=f"kind must be one of: {', '.join(SEARCH_KINDS)}")
+    per_page = min(max(per_page, 1), 100)
+    try:
+        async with get_session() as session:
+            results, has_more = await search(session, q, kinds, limit=per_page, offset=(page - 1) * per_page)
+        return {"query": q, "page": page, "per_page": per_page, "results": results, "has_more": has_more}
+    except Exception as e:
+        logger.error(f"Error searching for {q!r}: {e}")
+        raise HTTPException(status_code=500, detail="Error searching")
+
+@app.get("/templates", response_model=List[Template], response_class=FastJSONResponse)
+@app.get("/templates/json", response_model=List[Template], response_class=FastJSONResponse)
+async def get_templates_json(if_none_match: Optional[str] = Header(None)):
     """Get all templates from the database (JSON format)."""
     try:
         async with get_session() as session:
-            statement = select(Template)
-            result = await session.execute(statement)
-            templates = result.scalars().all()
-            return templates
+            etag = await list_etag(session, "template")
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+            result = await session.execute(select(Template.__table__))
+            return versioned_json(row_dicts(result), etag)
     except Exception as e:
         logger.error(f"Error fetching templates: {e}")
         raise HTTPException(status_code=500, detail="Error fetching templates")
@@ -737,17 +1043,15 @@ async def upload_template(
     file_id = ""
     try:
         # Try to import aiogram - it might not be available in web app
-        from aiogram import Bot
         from aiogram.types import FSInputFile
         
-        bot = Bot(token=settings.bot_token)
+        # Shared bot: reuses pooled Bot API connections across uploads
+        bot = get_shared_bot()
         
         # Upload file to Telegram
         photo = FSInputFile(file_path)
         sent_message = await bot.send_photo(chat_id=requester_tg_id, photo=photo)
         file_id = sent_message.photo[-1].file_id  # Get the largest photo size file_id
-            
-        await bot.session.close()
     except ImportError:
         logger.info("aiogram not available in web app, skipping Telegram upload")
     except Exception as e:
@@ -766,6 +1070,7 @@ async def upload_template(
         session.add(template)
         await session.commit()
         await session.refresh(template)
+        audit("template_uploaded", template_id=template.id, admin_tg_id=requester_tg_id)
         return template
 
 
@@ -878,6 +1183,7 @@ async def create_template(payload: dict, tg_user_id: Optional[str] = Cookie(None
         session.add(template)
         await session.commit()
         await session.refresh(template)
+        audit("template_uploaded", template_id=template.id, admin_tg_id=requester_tg_id)
         return template
 
 
@@ -899,8 +1205,7 @@ async def dashboard():
             files_count = await session.execute(select(File))
             files_count = len(files_count.scalars().all())
             
-            audit_count = await session.execute(select(Audit))
-            audit_count = len(audit_count.scalars().all())
+            audit_count = await event_store.count()
 
             templates_count = await session.execute(select(Template))
             templates_count = len(templates_count.scalars().all())
@@ -0,0 +1,76 @@
+"""Request metrics for the web app."""
+
+import asyncio
+import logging
+import time
+
+from infra.db import track_queries
+from infra.metrics import WEB_REQUEST_DB_QUERIES, WEB_REQUEST_SECONDS, WEB_REQUESTS, metrics
+
+
+logger = logging.getLogger(__name__)
+
+# Seconds between snapshots of a worker's metrics in WEB_METRICS_DIR
+SNAPSHOT_INTERVAL = 5.0
+
+
+async def write_metrics_snapshots(directory: str, interval: float = SNAPSHOT_INTERVAL):
+    """
+    Keep this worker's snapshot in ``directory`` fresh until cancelled.
+
+    Whichever worker answers a scrape sums all snapshots, so the other
+    workers' numbers are at most ``interval`` seconds old. The last snapshot
+    is written on cancellation, when the worker shuts down.
+    """
+    try:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(metrics.write_snapshot, directory)
+            except OSError as e:
+                logger.warning(f"Failed to write metrics snapshot: {e}")
+    finally:
+        try:
+            metrics.write_snapshot(directory)
+        except OSError as e:
+            logger.warning(f"Failed to write metrics snapshot: {e}")
+
+
+class RequestMetricsMiddleware:
+    """
+    ASGI middleware recording latency, status and SQL statements per request.
+
+    Requests are labelled by route template (``/requests/{request_id}``),
+    not by raw path, so the number of series stays bounded. Written as plain
+    ASGI rather than ``@app.middleware("http")`` to avoid the extra task and
+    response wrapping per request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        with track_queries() as queries:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = scope.get("route")
+                path = getattr(route, "path", None) or "unmatched"
+                method = scope["method"]
+                queries.name = f"{method} {path}"
+                WEB_REQUEST_SECONDS.observe(time.perf_counter() - started, method, path)
+                WEB_REQUESTS.inc(method, path, str(status))
+                WEB_REQUEST_DB_QUERIES.observe(queries.count)
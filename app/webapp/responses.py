@@ -0,0 +1,78 @@
+"""JSON responses and conditional GETs for the web app's list endpoints."""
+
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional
+
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speedup
+    orjson = None
+
+
+# Browsers may keep list responses but must revalidate them on every use
+CACHE_CONTROL = "private, no-cache"
+
+
+def _default(value: Any) -> str:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response encoded with orjson (stdlib json when it isn't installed).
+
+    Meant for rows an endpoint already selected as plain dicts: returning
+    this response skips FastAPI's ``response_model`` validation and
+    ``jsonable_encoder`` pass, so each row is only encoded once. Datetimes
+    are written in ISO 8601 like pydantic does.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content)
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+def row_dicts(result) -> List[dict]:
+    """Rows of a Core result as dicts keyed by column name."""
+    keys = list(result.keys())
+    return [dict(zip(keys, row)) for row in result]
+
+
+def weak_etag(*parts) -> str:
+    """Weak ETag built from table versions, e.g. ``W/"request-42.user-7"``."""
+    return 'W/"' + ".".join(str(part) for part in parts) + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Whether an ``If-None-Match`` header covers ``etag`` (weak comparison).
+
+    Args:
+        if_none_match: Header value, possibly a list or ``*``
+        etag: Current ETag of the resource
+
+    Returns:
+        bool: True if the client's copy is current
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    current = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == current for tag in if_none_match.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    """Empty 304 response for a client whose copy is current."""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+
+def versioned_json(rows: Any, etag: str) -> FastJSONResponse:
+    """List response carrying its ETag, revalidated by the browser on every use."""
+    return FastJSONResponse(rows, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
@@ -4,26 +4,82 @@ import uvicorn
 import logging
 import os
 import sys
+import tempfile
+from typing import Optional
 
 # Add the project root to the path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from app.webapp.main import app
+from infra.config import settings
+from infra.logging import setup_logging
+from infra.metrics import clear_snapshots
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def main():
-    """Run the web application."""
-    logger.info("Starting web application")
+
+def resolve_workers(workers: int) -> int:
+    """Return the number of worker processes (0 means one per CPU core)."""
+    if workers > 0:
+        return workers
+    return os.cpu_count() or 1
+
+
+def prepare_metrics_dir(workers: int) -> str:
+    """
+    Give the workers a shared directory to sum their /metrics through.
+
+    One worker answers each scrape, so without it every scrape would show a
+    random worker's numbers. Uses ``WEB_METRICS_DIR`` or a new temporary
+    directory, exported so the worker processes pick it up, and removes
+    snapshots of a previous run.
+
+    Returns:
+        str: The directory, or an empty string for a single worker
+    """
+    if workers <= 1 and not settings.web_metrics_dir:
+        return ""
+    directory = settings.web_metrics_dir or tempfile.mkdtemp(prefix="webapp-metrics-")
+    clear_snapshots(directory)
+    os.environ["WEB_METRICS_DIR"] = settings.web_metrics_dir = directory
+    return directory
+
+
+def main(workers: Optional[int] = None, reload: Optional[bool] = None):
+    """
+    Run the web application.
+
+    Args:
+        workers: Worker processes (defaults to ``settings.web_workers``)
+        reload: Auto-reload on code changes (defaults to ``settings.web_reload``)
+    """
+    setup_logging(files=False)
+    reload = settings.web_reload if reload is None else reload
+    workers = 1 if reload else resolve_workers(settings.web_workers if workers is None else workers)
+    metrics_dir = prepare_metrics_dir(workers)
+    logger.info(
+        f"Starting web application on {settings.web_host}:{settings.web_port} "
+        f"(workers={workers}, reload={reload}, metrics_dir={metrics_dir or '-'})"
+    )
+    # The app is passed as an import string so every worker process imports
+    # it (and creates its own DB and Bot API pools) after forking.
     uvicorn.run(
         "app.webapp.main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info"
+        host=settings.web_host,
+        port=settings.web_port,
+        workers=workers,
+        reload=reload,
+        # "auto" picks uvloop and httptools when they are installed
+        loop="auto",
+        http="auto",
+        timeout_keep_alive=settings.web_keepalive,
+        backlog=settings.web_backlog,
+        timeout_graceful_shutdown=settings.web_graceful_timeout,
+        log_level="debug" if settings.debug else "info",
+        # uvicorn's own loggers propagate to the root queue handler set up above
+        # (and again by each worker's lifespan) instead of writing directly
+        log_config=None,
     )
 
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Compare the default aiogram session with the configured Bot API session.
+
+Starts the local fake Bot API server, then lets concurrent synthetic users
+walk the light vehicle flow through the real dispatcher, once with a stock
+``AiohttpSession`` and once with ``create_bot_session()`` (pooled keep-alive
+connections, DNS cache, orjson). Prints throughput and update latency, plus
+the raw sendMessage rate without the dispatcher and database.
+
+    python benchmarks/bench_bot_session.py [users] [latency_ms]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmp = tempfile.mkdtemp(prefix="ndstrbot-bench-")
+os.environ.setdefault("BOT_TOKEN", "42:BENCH")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_tmp}/bench.db"
+os.environ["DATABASE_TYPE"] = "sqlite"
+os.environ["BASE_DIR"] = _tmp
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+
+from app.bot import create_dispatcher
+from app.services.telegram_session import create_bot, install_uvloop
+from benchmarks.fake_bot_api import FakeBotAPI
+from benchmarks.fakes import callback_update, message_update
+from infra.config import settings
+from infra.db import engine, init_db
+
+
+def light_flow(user_id: int):
+    """Updates of one user registering a branded light vehicle."""
+    return [
+        message_update(user_id, "/start"),
+        callback_update(user_id, "light_vehicle"),
+        callback_update(user_id, "yes"),
+        *[message_update(user_id, photo=True) for _ in range(4)],
+    ]
+
+
+async def run_users(dp, bot: Bot, users: int, first_user_id: int):
+    latencies = []
+
+    async def walk(user_id: int):
+        for update in light_flow(user_id):
+            started = time.perf_counter()
+            await dp.feed_update(bot, update)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(walk(first_user_id + i) for i in range(users)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    last = len(latencies) - 1
+    return {
+        "updates/s": len(latencies) / elapsed,
+        "p50 ms": latencies[last // 2] * 1000,
+        "p95 ms": latencies[int(last * 0.95)] * 1000,
+    }
+
+
+async def run_raw_calls(bot: Bot, calls: int, concurrency: int = 50):
+    """Concurrent sendMessage calls without the dispatcher or the database."""
+    slots = asyncio.Semaphore(concurrency)
+
+    async def send(i: int):
+        async with slots:
+            await bot.send_message(chat_id=i, text="Получено фото 1/4")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(send(i) for i in range(calls)))
+    return calls / (time.perf_counter() - started)
+
+
+async def main(users: int, latency: float):
+    await init_db()
+    api = FakeBotAPI(latency=latency)
+    base = await api.start()
+    settings.telegram_api_base = base
+    dp = create_dispatcher()
+
+    bots = {
+        "default AiohttpSession": Bot(
+            token=settings.bot_token,
+            session=AiohttpSession(api=TelegramAPIServer.from_base(base)),
+        ),
+        "create_bot_session()": create_bot(),
+    }
+    print(f"{users} users x {len(light_flow(0))} updates, fake API latency {latency * 1000:.0f}ms")
+    for round_no, (name, bot) in enumerate(bots.items()):
+        # Warm up the connection pool, then measure
+        await run_users(dp, bot, users, first_user_id=1_000_000 * (round_no + 1))
+        result = await run_users(dp, bot, users, first_user_id=1_000_000 * (round_no + 1) + users)
+        result["raw calls/s"] = await run_raw_calls(bot, calls=users * 40)
+        print(f"{name:24s} " + "  ".join(f"{key}={value:.1f}" for key, value in result.items()))
+        await bot.session.close()
+
+    await api.stop()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    print(f"uvloop: {install_uvloop()}")
+    asyncio.run(main(users, latency_ms / 1000))
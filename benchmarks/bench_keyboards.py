@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: per-update CPU spent building and serializing keyboards.
+
+Compares the old path (build a fresh InlineKeyboardMarkup per call and let the
+session dump it) with the registry path (shared markup + cached JSON).
+
+    python benchmarks/bench_keyboards.py [--number 20000]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.methods import SendMessage
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+
+from app.keyboards.inline import get_main_menu, get_template_navigation
+from app.services.telegram_session import BotSession
+
+
+def legacy_main_menu() -> InlineKeyboardMarkup:
+    """Main menu built the way it was before the registry."""
+    return InlineKeyboardMarkup(
+        inline_keyboard=[
+            [
+                InlineKeyboardButton(text="Легковой", callback_data="light_vehicle"),
+                InlineKeyboardButton(text="Грузовой", callback_data="cargo_vehicle")
+            ],
+            [
+                InlineKeyboardButton(text="Акции", callback_data="promotions"),
+            ]
+        ]
+    )
+
+
+def legacy_template_navigation(current_index: int, total_templates: int) -> InlineKeyboardMarkup:
+    """Template navigation built the way it was before the registry."""
+    nav_row = []
+    if current_index > 0:
+        nav_row.append(InlineKeyboardButton(text="⬅️ Назад", callback_data=f"template_prev_{current_index}"))
+    nav_row.append(InlineKeyboardButton(text=f"{current_index + 1}/{total_templates}", callback_data="template_current"))
+    if current_index < total_templates - 1:
+        nav_row.append(InlineKeyboardButton(text="Вперед ➡️", callback_data=f"template_next_{current_index}"))
+    action_row = [
+        InlineKeyboardButton(text="Мой вариант", callback_data=f"template_select_{current_index}"),
+        InlineKeyboardButton(text="Отмена", callback_data="cancel")
+    ]
+    return InlineKeyboardMarkup(inline_keyboard=[nav_row, action_row])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    legacy_session = AiohttpSession()
+    registry_session = BotSession()
+    bot = Bot(token="42:BENCH", session=legacy_session)
+
+    def legacy_update():
+        for markup in (legacy_main_menu(), legacy_template_navigation(1, 5)):
+            legacy_session.build_form_data(bot, SendMessage(chat_id=1, text="x", reply_markup=markup))
+
+    def registry_update():
+        for markup in (get_main_menu(), get_template_navigation(1, 5)):
+            registry_session.build_form_data(bot, SendMessage(chat_id=1, text="x", reply_markup=markup))
+
+    cases = [
+        ("build only (legacy)", lambda: (legacy_main_menu(), legacy_template_navigation(1, 5))),
+        ("build only (registry)", lambda: (get_main_menu(), get_template_navigation(1, 5))),
+        ("build + serialize (legacy)", legacy_update),
+        ("build + serialize (registry)", registry_update),
+    ]
+    results = {}
+    for name, func in cases:
+        func()  # warm up
+        elapsed = min(timeit.repeat(func, number=args.number, repeat=3))
+        results[name] = elapsed / args.number * 1e6
+        print(f"{name:32s} {results[name]:8.2f} us/update")
+
+    saved = results["build + serialize (legacy)"] - results["build + serialize (registry)"]
+    print(f"{'CPU saved per update':32s} {saved:8.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Measure per-update logging overhead on the event loop thread.
+
+Drives the real dispatcher (fake Bot API, fresh SQLite) through the light
+flow with logging configured four ways and prints the mean time per update
+and the overhead relative to logging switched off:
+
+- off: root level WARNING, nothing emitted
+- sync handlers: file/console handlers on the root logger (the old setup)
+- queue: ``setup_logging()`` - QueueHandler, I/O in a listener thread
+- queue + sampling: as above with ``LOG_SAMPLE_RATE=1``
+
+Console output goes to /dev/null so terminal speed doesn't skew results.
+
+    python benchmarks/bench_logging.py [updates]
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmp = tempfile.mkdtemp(prefix="ndstrbot-bench-")
+os.environ.setdefault("BOT_TOKEN", "42:BENCH")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_tmp}/bench.db"
+os.environ["DATABASE_TYPE"] = "sqlite"
+os.environ["BASE_DIR"] = _tmp
+
+from aiogram import Bot
+
+from app.bot import create_dispatcher
+from benchmarks.fakes import FakeTelegramSession, callback_update, message_update
+from infra.config import settings
+from infra.db import engine, init_db
+from infra.logging import build_handlers, setup_logging, stop_logging
+
+
+ROUNDS = 7
+
+
+def light_flow(user_id: int):
+    """Updates of one user registering a branded light vehicle."""
+    return [
+        message_update(user_id, "/start"),
+        callback_update(user_id, "light_vehicle"),
+        callback_update(user_id, "yes"),
+        *[message_update(user_id, photo=True) for _ in range(4)],
+    ]
+
+
+def reset_root():
+    stop_logging()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+
+
+def configure(mode: str):
+    reset_root()
+    root = logging.getLogger()
+    settings.log_sample_rate = 0.0
+    if mode == "off":
+        root.setLevel(logging.WARNING)
+        logging.getLogger("app").setLevel(logging.WARNING)
+        logging.getLogger("infra").setLevel(logging.WARNING)
+        return
+    if mode == "sync handlers":
+        root.setLevel(logging.INFO)
+        logging.getLogger("app").setLevel(logging.INFO)
+        for handler in build_handlers(os.path.join(_tmp, "logs")):
+            root.addHandler(handler)
+        return
+    if mode == "queue + sampling":
+        settings.log_sample_rate = 1.0
+    setup_logging()
+
+
+async def measure(dp, bot, updates: int, first_user_id: int) -> float:
+    spent = 0.0
+    handled = 0
+    user_id = first_user_id
+    while handled < updates:
+        for update in light_flow(user_id):
+            started = time.perf_counter()
+            await dp.feed_update(bot, update)
+            spent += time.perf_counter() - started
+            handled += 1
+        user_id += 1
+    return spent / handled
+
+
+async def main(updates: int):
+    os.makedirs(os.path.join(_tmp, "logs"), exist_ok=True)
+    sys.stderr = open(os.devnull, "w")
+    await init_db()
+    bot = Bot(token=os.environ["BOT_TOKEN"], session=FakeTelegramSession())
+    dp = create_dispatcher()
+
+    # Modes are interleaved over several rounds (the database grows as the
+    # benchmark runs) and the median round is reported
+    modes = ["off", "sync handlers", "queue", "queue + sampling"]
+    samples = {mode: [] for mode in modes}
+    user_id = 1_000_000
+    for _ in range(ROUNDS):
+        for mode in modes:
+            configure(mode)
+            await measure(dp, bot, 50, first_user_id=user_id)  # warm-up
+            samples[mode].append(await measure(dp, bot, updates // ROUNDS, first_user_id=user_id + 100))
+            user_id += 10_000
+    results = {mode: sorted(values)[len(values) // 2] for mode, values in samples.items()}
+    reset_root()
+
+    print(f"{updates} updates per mode, median of {ROUNDS} interleaved rounds")
+    print(f"{'mode':18s} {'us/update':>10s} {'overhead us':>12s}")
+    for mode, per_update in results.items():
+        overhead = (per_update - results["off"]) * 1e6
+        print(f"{mode:18s} {per_update * 1e6:10.0f} {overhead:12.0f}")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000))
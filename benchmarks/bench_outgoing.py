@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Compare serial vs. critical-path time of outgoing Telegram calls per handler.
+
+Drives the real dispatcher against a fake Bot API with a fixed simulated
+round trip and prints, for each handler using ``OutgoingCalls``, the time the
+calls would take awaited one by one and the time actually spent.
+
+    python benchmarks/bench_outgoing.py [latency_ms]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmp = tempfile.mkdtemp(prefix="ndstrbot-bench-")
+os.environ.setdefault("BOT_TOKEN", "42:BENCH")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_tmp}/bench.db"
+os.environ["DATABASE_TYPE"] = "sqlite"
+os.environ["BASE_DIR"] = _tmp
+
+from aiogram import Bot
+
+from app.bot import create_dispatcher
+from app.utils.outgoing import outgoing_stats
+from benchmarks.fakes import FakeTelegramSession, callback_update, message_update
+from domain.models import Template
+from infra.db import engine, get_session, init_db
+
+
+async def main(latency: float):
+    await init_db()
+    async with get_session() as session:
+        for i in range(3):
+            session.add(Template(name=f"T{i}", path=f"templates/t{i}.png", file_id=f"file-{i}"))
+        await session.commit()
+
+    bot = Bot(token=os.environ["BOT_TOKEN"], session=FakeTelegramSession(latency=latency))
+    dp = create_dispatcher()
+
+    user = 100
+    steps = [
+        message_update(user, "/start"),
+        callback_update(user, "promotions"),
+        callback_update(user, "light_vehicle"),
+        callback_update(user, "no"),
+        message_update(user, "2020"),
+        callback_update(user, "license_yes"),
+        callback_update(user, "re_wrap"),
+        callback_update(user, "template_next_0"),
+        callback_update(user, "template_next_1"),
+        callback_update(user, "template_prev_2"),
+        callback_update(user, "template_select_1"),
+        callback_update(user + 1, "cargo_vehicle"),
+        callback_update(user + 1, "cancel"),
+    ]
+    for update in steps:
+        await dp.feed_update(bot, update)
+
+    print(f"simulated Bot API round trip: {latency * 1000:.0f}ms")
+    print(f"{'handler':30s} {'tracked':>8s} {'serial ms':>10s} {'critical ms':>12s}")
+    for name, stats in sorted(outgoing_stats.items()):
+        row = stats.as_dict()
+        print(
+            f"{name:30s} {row['calls_per_run']:8.1f} "
+            f"{row['serial_ms']:10.0f} {row['critical_path_ms']:12.0f}"
+        )
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    latency_ms = float(sys.argv[1]) if len(sys.argv) > 1 else 80.0
+    asyncio.run(main(latency_ms / 1000))
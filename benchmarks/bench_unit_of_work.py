@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Count SQL statements and commits per bot step (unit of work per update).
+
+Drives the real dispatcher with an in-process fake Bot API against a fresh
+SQLite database and prints statements/commits for each step of the light
+and cargo flows.
+
+    python benchmarks/bench_unit_of_work.py
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmp = tempfile.mkdtemp(prefix="ndstrbot-bench-")
+os.environ.setdefault("BOT_TOKEN", "42:BENCH")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_tmp}/bench.db"
+os.environ["DATABASE_TYPE"] = "sqlite"
+os.environ["BASE_DIR"] = _tmp
+
+from aiogram import Bot
+from sqlalchemy import event
+
+from app.bot import create_dispatcher
+from benchmarks.fakes import FakeTelegramSession, callback_update, message_update
+from infra.db import engine, init_db
+
+
+class QueryCounter:
+    """Counts statements and commits issued through the engine."""
+
+    def __init__(self):
+        self.statements = 0
+        self.commits = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self._on_execute)
+        event.listen(engine.sync_engine, "commit", self._on_commit)
+
+    def _on_execute(self, *args):
+        self.statements += 1
+
+    def _on_commit(self, *args):
+        self.commits += 1
+
+    def reset(self):
+        self.statements = 0
+        self.commits = 0
+
+
+async def main():
+    await init_db()
+    bot = Bot(token=os.environ["BOT_TOKEN"], session=FakeTelegramSession())
+    dp = create_dispatcher()
+    counter = QueryCounter()
+
+    light_user, cargo_user = 100, 200
+    steps = [
+        ("/start", message_update(light_user, "/start")),
+        ("light_vehicle", callback_update(light_user, "light_vehicle")),
+        ("brand yes", callback_update(light_user, "yes")),
+        *[(f"light photo {i}", message_update(light_user, photo=True)) for i in range(1, 5)],
+        ("cancel (DB-free)", callback_update(light_user, "cancel")),
+        ("cargo_vehicle", callback_update(cargo_user, "cargo_vehicle")),
+        *[(f"cargo auto photo {i}", message_update(cargo_user, photo=True)) for i in range(1, 5)],
+        *[(f"cargo sts photo {i}", message_update(cargo_user, photo=True)) for i in range(1, 3)],
+    ]
+
+    print(f"{'step':22s} {'statements':>10s} {'commits':>8s}")
+    total_statements = total_commits = 0
+    for name, update in steps:
+        counter.reset()
+        await dp.feed_update(bot, update)
+        total_statements += counter.statements
+        total_commits += counter.commits
+        print(f"{name:22s} {counter.statements:10d} {counter.commits:8d}")
+    print(f"{'total':22s} {total_statements:10d} {total_commits:8d}")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""Web API latency and memory benchmark against a seeded database.
+
+Seeds a fresh SQLite database (or the PostgreSQL database given with
+``--database-url``) with the requested number of users, requests, files and
+audit rows, then calls the admin API in-process through
+``httpx.ASGITransport`` (no network, no uvicorn) and measures per endpoint:
+p50/p95 latency, peak Python memory allocated while serving one request
+(tracemalloc, measured in a separate pass so it doesn't skew the timings),
+response size, rows and rows per second (list endpoints) and SQL statements.
+
+Results can be saved as a JSON baseline and compared with a later run:
+
+    python benchmarks/bench_webapp.py --requests 20000 --save baseline.json
+    python benchmarks/bench_webapp.py --requests 20000 --compare baseline.json
+
+List endpoints at 100k rows (``/requests/json``, ``/users/json``,
+``/audit/json``; ``/files/json`` gets about 5 files per request):
+
+    python benchmarks/bench_webapp.py --users 100000 --requests 100000 --audit 100000 --bulk-iterations 3
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+# Add the project root to the path
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+UPLOAD_NAME = "bench_webapp_upload.jpg"
+FAKE_JPEG = b"\xff\xd8\xff\xe0" + b"\0" * 200_000
+
+
+def git_revision() -> Optional[str]:
+    """Short commit hash of the working tree, if available."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def seed(users: int, requests: int, audit: int, base_dir: str) -> Dict[str, int]:
+    """
+    Fill the database with synthetic rows (see ``seed_data.py``).
+
+    Args:
+        users: Number of users
+        requests: Number of requests, spread over the users
+        audit: Number of audit rows
+        base_dir: BASE_DIR, where the template preview file is written
+
+    Returns:
+        Dict[str, int]: Rows written per table
+    """
+    from seed_data import generate
+
+    counts = await generate(users, requests, audit, templates=5, seed=42)
+    template_path = os.path.join(base_dir, "storage", "uploads", "template_1.jpg")
+    os.makedirs(os.path.dirname(template_path), exist_ok=True)
+    with open(template_path, "wb") as f:
+        f.write(FAKE_JPEG)
+    return counts
+
+
+async def measure(client, paths: List[str], iterations: int) -> Dict[str, Any]:
+    """
+    Time one endpoint, then measure one more call under tracemalloc.
+
+    Args:
+        client: httpx client bound to the ASGI app
+        paths: Concrete URLs to cycle through (e.g. different request ids)
+        iterations: Timed calls
+
+    Returns:
+        Dict[str, Any]: Latency percentiles, peak memory, size, rows and SQL statements
+    """
+    from infra.db import track_queries
+
+    response = await client.get(paths[0])  # warm-up
+    response.raise_for_status()
+    latencies = []
+    for i in range(iterations):
+        started = time.perf_counter()
+        response = await client.get(paths[i % len(paths)])
+        latencies.append(time.perf_counter() - started)
+        response.raise_for_status()
+
+    tracemalloc.start()
+    with track_queries() as queries:
+        response = await client.get(paths[0])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    p50 = statistics.median(latencies)
+    body = response.json() if response.headers.get("content-type", "").startswith("application/json") else None
+    rows = len(body) if isinstance(body, list) else 0
+    return {
+        "p50_ms": round(p50 * 1000, 2),
+        "p95_ms": round(latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))] * 1000, 2),
+        "peak_mb": round(peak / (1024 * 1024), 2),
+        "bytes": len(response.content),
+        "rows": rows,
+        "rows_per_s": round(rows / p50) if rows else 0,
+        "queries": queries.count,
+    }
+
+
+async def run(args) -> Dict[str, Any]:
+    import httpx
+
+    from app.webapp.main import app
+    from infra.config import settings
+    from infra.db import engine
+
+    started = time.perf_counter()
+    counts = {}
+    if not args.no_seed:
+        counts = await seed(args.users, args.requests, args.audit, settings.base_dir)
+    seed_seconds = time.perf_counter() - started
+
+    # /uploads serves from the project's storage/uploads directory
+    upload_dir = os.path.join(PROJECT_ROOT, "storage", "uploads")
+    os.makedirs(upload_dir, exist_ok=True)
+    upload_path = os.path.join(upload_dir, UPLOAD_NAME)
+    with open(upload_path, "wb") as f:
+        f.write(FAKE_JPEG)
+
+    rng = random.Random(7)
+    request_ids = [rng.randint(1, max(args.requests, 1)) for _ in range(50)]
+    endpoints = {
+        "/requests/json": ["/requests/json"],
+        "/users/json": ["/users/json"],
+        "/files/json": ["/files/json"],
+        "/audit/json": ["/audit/json"],
+        "/dashboard": ["/dashboard"],
+        "/requests/{id}": [f"/requests/{request_id}" for request_id in request_ids],
+        "/uploads/{filename}": [f"/uploads/{UPLOAD_NAME}"],
+        "/templates/{id}/preview": ["/templates/1/preview"],
+    }
+    results = {}
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name, paths in endpoints.items():
+                iterations = args.iterations if len(paths) > 1 or "{" in name else args.bulk_iterations
+                results[name] = await measure(client, paths, iterations)
+                print(f"  measured {name}", file=sys.stderr)
+    finally:
+        os.remove(upload_path)
+        await engine.dispose()
+
+    return {
+        "revision": git_revision(),
+        "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "database": settings.database_type,
+        "dataset": {
+            "users": args.users,
+            "requests": args.requests,
+            "files": counts.get("file", 0),
+            "audit": args.audit,
+        },
+        "seed_seconds": round(seed_seconds, 1),
+        "endpoints": results,
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    dataset = report["dataset"]
+    print(
+        f"revision={report['revision']} db={report['database']} users={dataset['users']} "
+        f"requests={dataset['requests']} files={dataset['files']} audit={dataset['audit']} "
+        f"(seeded in {report['seed_seconds']}s)"
+    )
+    print(
+        f"{'endpoint':26s} {'p50 ms':>9s} {'p95 ms':>9s} {'peak MB':>9s} {'bytes':>11s} "
+        f"{'rows':>8s} {'rows/s':>10s} {'queries':>8s}"
+    )
+    for name, result in report["endpoints"].items():
+        print(
+            f"{name:26s} {result['p50_ms']:9.2f} {result['p95_ms']:9.2f} {result['peak_mb']:9.2f} "
+            f"{result['bytes']:11d} {result.get('rows', 0):8d} {result.get('rows_per_s', 0):10d} "
+            f"{result['queries']:8d}"
+        )
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> int:
+    """
+    Print per-endpoint changes against a baseline.
+
+    Args:
+        report: Current results
+        baseline: Results loaded from a previous ``--save``
+        threshold: Relative increase (0.2 = 20%) of p50 or peak memory
+            counted as a regression
+
+    Returns:
+        int: Number of regressions
+    """
+    if baseline.get("dataset") != report["dataset"] or baseline.get("database") != report["database"]:
+        print("warning: baseline was recorded with a different dataset or database", file=sys.stderr)
+    print()
+    print(f"compared with {baseline.get('revision')} ({baseline.get('created_at')}):")
+    print(f"{'endpoint':26s} {'p50 ms':>19s} {'peak MB':>19s} {'queries':>9s}")
+    regressions = 0
+    for name, result in report["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(name)
+        if not before:
+            print(f"{name:26s} (not in baseline)")
+            continue
+        flags = []
+        cells = []
+        for key in ("p50_ms", "peak_mb"):
+            change = (result[key] - before[key]) / before[key] if before[key] else 0.0
+            cells.append(f"{before[key]:8.2f} -> {result[key]:8.2f}")
+            if change > threshold:
+                flags.append(f"{key} +{change:.0%}")
+        if result["queries"] > before["queries"]:
+            flags.append(f"queries {before['queries']} -> {result['queries']}")
+        regressions += bool(flags)
+        marker = f"  REGRESSION: {', '.join(flags)}" if flags else ""
+        print(f"{name:26s} {cells[0]:>19s} {cells[1]:>19s} {result['queries']:9d}{marker}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=2_000)
+    parser.add_argument("--requests", type=int, default=5_000)
+    parser.add_argument("--audit", type=int, default=20_000)
+    parser.add_argument("--iterations", type=int, default=200, help="timed calls of single-row endpoints")
+    parser.add_argument("--bulk-iterations", type=int, default=10, help="timed calls of list endpoints")
+    parser.add_argument("--database-url", help="an empty database; default: a fresh SQLite file in a temp directory")
+    parser.add_argument("--no-seed", action="store_true", help="use the existing data in --database-url")
+    parser.add_argument("--save", metavar="PATH", help="write the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="diff against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative increase counted as a regression")
+    args = parser.parse_args(argv)
+
+    tmp = tempfile.mkdtemp(prefix="ndstrbot-bench-web-")
+    os.environ.setdefault("BOT_TOKEN", "42:BENCH")
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite+aiosqlite:///{tmp}/bench.db"
+    os.environ["DATABASE_TYPE"] = "postgresql" if "postgresql" in os.environ["DATABASE_URL"] else "sqlite"
+    os.environ["BASE_DIR"] = tmp
+
+    report = asyncio.run(run(args))
+    print_report(report)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        return 1 if compare(report, baseline, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
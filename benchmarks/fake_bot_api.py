@@ -0,0 +1,131 @@
+"""Local fake Bot API server for benchmarks.
+
+Serves ``/bot{token}/{method}`` and file downloads over HTTP like
+api.telegram.org, answering with canned results after an optional simulated
+delay, so the real aiohttp session (connection pool, keep-alive, JSON
+decoding) is exercised without touching Telegram. Updates queued with
+``push_update`` are delivered through long-polled getUpdates.
+
+    python benchmarks/fake_bot_api.py --port 8081 --latency-ms 20
+"""
+
+import argparse
+import asyncio
+import itertools
+import time
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+
+_message_ids = itertools.count(10_000)
+
+BOT_USER = {"id": 1, "is_bot": True, "first_name": "Bot", "username": "ndstrbot"}
+FAKE_JPEG = b"\xff\xd8\xff\xe0" + b"\0" * 60_000  # about the size of a phone photo preview
+MESSAGE_METHODS = {"sendmessage", "sendphoto", "editmessagetext", "editmessagecaption"}
+
+
+def _message(chat_id: Any, text: Optional[str]) -> Dict[str, Any]:
+    try:
+        chat_id = int(chat_id)
+    except (TypeError, ValueError):
+        chat_id = 0
+    message: Dict[str, Any] = {
+        "message_id": next(_message_ids),
+        "date": int(time.time()),
+        "chat": {"id": chat_id, "type": "private"},
+        "from": BOT_USER,
+    }
+    if text:
+        message["text"] = text
+    return message
+
+
+class FakeBotAPI:
+    """aiohttp application answering Bot API methods, counting calls."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls: Dict[str, int] = {}
+        self.updates: asyncio.Queue = asyncio.Queue()
+        self.app = web.Application()
+        self.app.router.add_post("/bot{token}/{method}", self.handle)
+        self.app.router.add_get("/file/bot{token}/{path:.+}", self.download)
+        self._runner: Optional[web.AppRunner] = None
+
+    async def handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"].lower()
+        self.calls[method] = self.calls.get(method, 0) + 1
+        form = await request.post()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if method in MESSAGE_METHODS:
+            result: Any = _message(form.get("chat_id"), form.get("text"))
+            if method == "sendphoto":
+                file_id = f"photo-{result['message_id']}"
+                result["photo"] = [{"file_id": file_id, "file_unique_id": file_id, "width": 1280, "height": 960}]
+        elif method == "getfile":
+            file_id = form.get("file_id")
+            result = {"file_id": file_id, "file_unique_id": file_id, "file_path": f"photos/{file_id}.jpg"}
+        elif method == "getme":
+            result = BOT_USER
+        elif method == "getupdates":
+            result = await self._next_updates(float(form.get("timeout") or 0), int(form.get("limit") or 100))
+        else:
+            result = True
+        return web.json_response({"ok": True, "result": result})
+
+    def push_update(self, update: Dict[str, Any]):
+        """Queue an update (Bot API JSON) for the next getUpdates call."""
+        self.updates.put_nowait(update)
+
+    async def _next_updates(self, timeout: float, limit: int) -> List[Dict[str, Any]]:
+        # Long polling: wait up to ``timeout`` for the first update, then
+        # return whatever else is already queued
+        try:
+            first = await asyncio.wait_for(self.updates.get(), timeout) if timeout else self.updates.get_nowait()
+        except (asyncio.TimeoutError, asyncio.QueueEmpty):
+            return []
+        batch = [first]
+        while len(batch) < limit and not self.updates.empty():
+            batch.append(self.updates.get_nowait())
+        return batch
+
+    async def download(self, request: web.Request) -> web.Response:
+        """Serve any file path with a fake JPEG body."""
+        self.calls["download"] = self.calls.get("download", 0) + 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return web.Response(body=FAKE_JPEG, content_type="image/jpeg")
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving and return the base URL for ``TelegramAPIServer.from_base``."""
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_port = self._runner.addresses[0][1]
+        return f"http://{host}:{bound_port}"
+
+    async def stop(self):
+        """Stop the server."""
+        if self._runner:
+            await self._runner.cleanup()
+
+
+async def _serve(port: int, latency: float):
+    api = FakeBotAPI(latency=latency)
+    base = await api.start(port=port)
+    print(f"Fake Bot API listening on {base} (set TELEGRAM_API_BASE={base})")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await api.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local fake Telegram Bot API")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+    asyncio.run(_serve(args.port, args.latency_ms / 1000))
@@ -0,0 +1,95 @@
+"""Shared fakes for benchmarks: in-process Bot API session and update builders."""
+
+import asyncio
+import itertools
+from datetime import datetime, timezone
+from typing import Any, AsyncGenerator, Dict, Optional
+
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import TelegramMethod
+from aiogram.types import CallbackQuery, Chat, File, Message, PhotoSize, Update, User
+
+BOT_USER = User(id=1, is_bot=True, first_name="Bot", username="ndstrbot")
+
+_message_ids = itertools.count(1000)
+_update_ids = itertools.count(1)
+
+
+def make_message(chat_id: int, text: Optional[str] = None, **extra: Any) -> Message:
+    """Build a message sent by the bot to a private chat."""
+    return Message(
+        message_id=next(_message_ids),
+        date=datetime.now(timezone.utc),
+        chat=Chat(id=chat_id, type="private"),
+        from_user=BOT_USER,
+        text=text,
+        **extra,
+    )
+
+
+class FakeTelegramSession(BaseSession):
+    """Bot API session answering every method in-process, counting calls.
+
+    ``latency`` adds a simulated round trip (seconds) to every call.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        super().__init__()
+        self.latency = latency
+        self.calls: Dict[str, int] = {}
+
+    async def close(self):
+        pass
+
+    async def make_request(self, bot: Bot, method: TelegramMethod, timeout: Optional[int] = None) -> Any:
+        name = type(method).__name__
+        self.calls[name] = self.calls.get(name, 0) + 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if name in {"SendMessage", "SendPhoto", "EditMessageText", "EditMessageCaption"}:
+            return make_message(getattr(method, "chat_id", None) or 0, getattr(method, "text", None))
+        if name == "GetFile":
+            return File(file_id=method.file_id, file_unique_id=method.file_id, file_path="photos/file.jpg")
+        return True
+
+    async def stream_content(self, url: str, headers: Optional[Dict[str, Any]] = None, timeout: int = 30,
+                             chunk_size: int = 65536, raise_for_status: bool = True) -> AsyncGenerator[bytes, None]:
+        yield b"\xff\xd8\xff\xe0fake-jpeg"
+
+
+def tg_user(user_id: int) -> User:
+    """Build a Telegram user for a synthetic chat."""
+    return User(id=user_id, is_bot=False, first_name=f"User{user_id}", username=f"user{user_id}")
+
+
+def message_update(user_id: int, text: Optional[str] = None, photo: bool = False,
+                   media_group_id: Optional[str] = None) -> Update:
+    """Build an update with a user message (text or photo)."""
+    extra: Dict[str, Any] = {}
+    if photo:
+        file_id = f"photo-{user_id}-{next(_message_ids)}"
+        extra["photo"] = [PhotoSize(file_id=file_id, file_unique_id=file_id, width=1280, height=960)]
+    if media_group_id:
+        extra["media_group_id"] = media_group_id
+    message = Message(
+        message_id=next(_message_ids),
+        date=datetime.now(timezone.utc),
+        chat=Chat(id=user_id, type="private"),
+        from_user=tg_user(user_id),
+        text=text,
+        **extra,
+    )
+    return Update(update_id=next(_update_ids), message=message)
+
+
+def callback_update(user_id: int, data: str) -> Update:
+    """Build an update with an inline button press on a bot message."""
+    callback = CallbackQuery(
+        id=str(next(_update_ids)),
+        from_user=tg_user(user_id),
+        chat_instance=str(user_id),
+        message=make_message(user_id, "menu"),
+        data=data,
+    )
+    return Update(update_id=next(_update_ids), callback_query=callback)
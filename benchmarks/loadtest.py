@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""End-to-end load test of the bot against a local fake Bot API.
+
+Builds the real dispatcher and routers from ``app/bot.py``, points a Bot
+created by ``create_bot()`` at the fake Bot API server and runs the real
+polling loop. Synthetic users arrive at a fixed rate (Poisson arrivals) and
+walk one of the scenarios below, pausing a "think time" between steps:
+
+    light_brand     /start, light vehicle, brand yes, 4 photos
+    light_no_brand  light vehicle, brand no, year, license yes, free wrap
+    light_re_wrap   ... license yes, re_wrap, carousel next/next/prev, select
+    cargo           cargo vehicle, 4 auto photos, 2 STS photos one by one
+    cargo_album     cargo vehicle, 4 auto photos and 2 STS photos as albums
+
+Each update is timed from being queued at the fake API until the dispatcher
+is done with it (polling, lane scheduling and handling included). The
+report lists throughput, p50/p95/p99 latency and SQL statements per step,
+and process memory growth.
+
+    python benchmarks/loadtest.py --rate 20 --duration 60 --api-latency-ms 40
+    python benchmarks/loadtest.py --scenario cargo_album --json cargo.json
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SCENARIO_WEIGHTS = {
+    "light_brand": 0.35,
+    "light_no_brand": 0.2,
+    "light_re_wrap": 0.15,
+    "cargo": 0.2,
+    "cargo_album": 0.1,
+}
+
+# A step is a name and the updates it sends at once (several for an album)
+Step = Tuple[str, List[Any]]
+
+
+def build_scenario(name: str, user_id: int) -> List[Step]:
+    """
+    Steps of one synthetic user for a scenario.
+
+    Args:
+        name: Scenario name from SCENARIO_WEIGHTS
+        user_id: Telegram ID of the synthetic user
+
+    Returns:
+        List[Step]: (step name, updates) in order
+    """
+    from benchmarks.fakes import callback_update, message_update
+
+    def photos(prefix: str, count: int) -> List[Step]:
+        return [(f"{prefix} photo", [message_update(user_id, photo=True)]) for _ in range(count)]
+
+    def album(step: str, count: int) -> Step:
+        group = f"album-{user_id}-{step}"
+        return step, [message_update(user_id, photo=True, media_group_id=group) for _ in range(count)]
+
+    no_brand = [
+        ("light_vehicle", [callback_update(user_id, "light_vehicle")]),
+        ("brand no", [callback_update(user_id, "no")]),
+        ("year", [message_update(user_id, "2019")]),
+        ("license yes", [callback_update(user_id, "license_yes")]),
+    ]
+    if name == "light_brand":
+        return [
+            ("/start", [message_update(user_id, "/start")]),
+            ("light_vehicle", [callback_update(user_id, "light_vehicle")]),
+            ("brand yes", [callback_update(user_id, "yes")]),
+            *photos("light", 4),
+        ]
+    if name == "light_no_brand":
+        return [*no_brand, ("option wrap", [callback_update(user_id, "wrap")])]
+    if name == "light_re_wrap":
+        return [
+            *no_brand,
+            ("re_wrap", [callback_update(user_id, "re_wrap")]),
+            ("template next", [callback_update(user_id, "template_next_0")]),
+            ("template next", [callback_update(user_id, "template_next_1")]),
+            ("template prev", [callback_update(user_id, "template_prev_2")]),
+            ("template select", [callback_update(user_id, "template_select_1")]),
+        ]
+    if name == "cargo":
+        return [
+            ("cargo_vehicle", [callback_update(user_id, "cargo_vehicle")]),
+            *photos("cargo auto", 4),
+            *photos("cargo sts", 2),
+        ]
+    if name == "cargo_album":
+        return [
+            ("cargo_vehicle", [callback_update(user_id, "cargo_vehicle")]),
+            album("cargo auto album", 4),
+            album("cargo sts album", 2),
+        ]
+    raise ValueError(f"Unknown scenario: {name}")
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    """Nearest-rank percentile of a sorted list."""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def memory_usage() -> Tuple[float, int]:
+    """(RSS in MB, live Python objects) of this process after a GC pass."""
+    from app.supervisor import read_usage
+
+    gc.collect()
+    usage = read_usage(os.getpid())
+    rss = usage[0] / (1024 * 1024) if usage else 0.0
+    return rss, len(gc.get_objects())
+
+
+class StepStats:
+    """Latency and SQL statement samples for one step name."""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.queries: List[int] = []
+        self.failed = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        ordered = sorted(self.latencies)
+        return {
+            "updates": len(ordered),
+            "failed": self.failed,
+            "p50_ms": round(percentile(ordered, 0.50) * 1000, 2),
+            "p95_ms": round(percentile(ordered, 0.95) * 1000, 2),
+            "p99_ms": round(percentile(ordered, 0.99) * 1000, 2),
+            "max_ms": round((ordered[-1] if ordered else 0.0) * 1000, 2),
+            "queries_avg": round(sum(self.queries) / len(self.queries), 2) if self.queries else 0.0,
+        }
+
+
+class LoadTest:
+    """
+    Pushes synthetic users' updates to the fake API and times their handling.
+
+    An outer ``update`` middleware on the dispatcher resolves the future of
+    each pushed update when the dispatcher is done with it, and counts the
+    SQL statements issued while handling it.
+    """
+
+    def __init__(self, api, think_time: float, step_timeout: float):
+        self.api = api
+        self.think_time = think_time
+        self.step_timeout = step_timeout
+        self.steps: Dict[str, StepStats] = {}
+        self.users_started = 0
+        self.users_completed = 0
+        self.users_failed = 0
+        self._pending: Dict[int, Tuple[asyncio.Future, float]] = {}
+
+    async def probe(self, handler: Callable, event, data: Dict[str, Any]) -> Any:
+        """Outer update middleware: complete the waiting step when the update is handled."""
+        from infra.db import track_queries
+
+        with track_queries("loadtest") as queries:
+            try:
+                return await handler(event, data)
+            finally:
+                pending = self._pending.pop(event.update_id, None)
+                if pending is not None:
+                    future, pushed_at = pending
+                    if not future.done():
+                        future.set_result((time.perf_counter() - pushed_at, queries.count))
+
+    async def send(self, step: str, updates: List[Any]) -> bool:
+        """Push a step's updates and wait until all of them are handled."""
+        loop = asyncio.get_running_loop()
+        stats = self.steps.setdefault(step, StepStats())
+        futures = []
+        for update in updates:
+            future = loop.create_future()
+            self._pending[update.update_id] = (future, time.perf_counter())
+            futures.append(future)
+            self.api.push_update(update.model_dump(mode="json", exclude_none=True, by_alias=True))
+        try:
+            results = await asyncio.wait_for(asyncio.gather(*futures), self.step_timeout)
+        except asyncio.TimeoutError:
+            stats.failed += len(updates)
+            for update in updates:
+                self._pending.pop(update.update_id, None)
+            return False
+        for latency, queries in results:
+            stats.latencies.append(latency)
+            stats.queries.append(queries)
+        return True
+
+    async def user(self, scenario: str, user_id: int):
+        """Walk one scenario as one user."""
+        self.users_started += 1
+        for step, updates in build_scenario(scenario, user_id):
+            if not await self.send(step, updates):
+                self.users_failed += 1
+                return
+            await asyncio.sleep(self.think_time * random.uniform(0.5, 1.5))
+        self.users_completed += 1
+
+
+async def seed_templates(count: int = 5):
+    """Insert wrap templates for the re_wrap carousel."""
+    from domain.models import Template
+    from infra.db import session_factory
+
+    async with session_factory() as session:
+        for i in range(count):
+            session.add(Template(
+                name=f"Макет {i + 1}",
+                description="Синтетический макет для нагрузочного теста",
+                file_id=f"template-file-{i + 1}",
+                path=f"uploads/template_{i + 1}.jpg",
+            ))
+        await session.commit()
+
+
+async def run(args) -> Dict[str, Any]:
+    from aiogram import Dispatcher
+
+    from app.bot import create_dispatcher
+    from app.services.telegram_session import create_bot
+    from app.utils.polling import UpdatePoller
+    from benchmarks.fake_bot_api import FakeBotAPI
+    from infra.config import settings
+    from infra.db import engine, init_db
+
+    await init_db()
+    await seed_templates()
+
+    api = FakeBotAPI(latency=args.api_latency_ms / 1000)
+    settings.telegram_api_base = await api.start()
+    bot = create_bot()
+    dp: Dispatcher = create_dispatcher()
+    test = LoadTest(api, think_time=args.think_ms / 1000, step_timeout=args.step_timeout)
+    dp.update.outer_middleware(test.probe)
+
+    poller = UpdatePoller(
+        dp,
+        bot,
+        timeout=1,  # short long-poll so shutdown doesn't wait on an idle getUpdates
+        limit=settings.polling_limit,
+        max_inflight=settings.max_inflight_updates,
+        admin_inflight=settings.admin_inflight_updates,
+        queue_size=settings.polling_queue_size,
+        stats_interval=3600,
+        allowed_updates=dp.resolve_used_update_types(),
+    )
+    poll_task = asyncio.create_task(poller.run())
+
+    # Warm up: one pass of every scenario so imports and caches are in place
+    await asyncio.gather(*(test.user(name, 1_000 + i) for i, name in enumerate(SCENARIO_WEIGHTS)))
+    test.steps.clear()
+    test.users_started = test.users_completed = test.users_failed = 0
+    rss_before, objects_before = memory_usage()
+
+    scenarios = [args.scenario] if args.scenario else list(SCENARIO_WEIGHTS)
+    weights = [SCENARIO_WEIGHTS[name] for name in scenarios]
+    users: List[asyncio.Task] = []
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+    user_id = 10_000_000
+    while time.perf_counter() - started < args.duration:
+        user_id += 1
+        users.append(asyncio.create_task(test.user(rng.choices(scenarios, weights)[0], user_id)))
+        await asyncio.sleep(rng.expovariate(args.rate))
+    arrivals_done = time.perf_counter() - started
+    await asyncio.gather(*users)
+    elapsed = time.perf_counter() - started
+    rss_after, objects_after = memory_usage()
+
+    poller.stop()
+    await poll_task
+    await bot.session.close()
+    await api.stop()
+    await engine.dispose()
+
+    updates = sum(len(stats.latencies) for stats in test.steps.values())
+    return {
+        "config": {
+            "rate": args.rate,
+            "duration": args.duration,
+            "scenario": args.scenario or "mix",
+            "api_latency_ms": args.api_latency_ms,
+            "think_ms": args.think_ms,
+            "database": settings.database_type,
+        },
+        "elapsed_s": round(elapsed, 2),
+        "arrivals_s": round(arrivals_done, 2),
+        "users": {"started": test.users_started, "completed": test.users_completed, "failed": test.users_failed},
+        "updates": updates,
+        "throughput_updates_per_s": round(updates / elapsed, 1),
+        "bot_api_calls": sum(count for method, count in api.calls.items() if method != "getupdates"),
+        "memory": {
+            "rss_before_mb": round(rss_before, 1),
+            "rss_after_mb": round(rss_after, 1),
+            "rss_growth_kb_per_user": round((rss_after - rss_before) * 1024 / max(test.users_started, 1), 2),
+            "objects_growth": objects_after - objects_before,
+        },
+        "steps": {name: stats.as_dict() for name, stats in test.steps.items()},
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    config = report["config"]
+    users = report["users"]
+    memory = report["memory"]
+    print(
+        f"scenario={config['scenario']} rate={config['rate']}/s duration={config['duration']}s "
+        f"api_latency={config['api_latency_ms']}ms think={config['think_ms']}ms db={config['database']}"
+    )
+    print(
+        f"users started={users['started']} completed={users['completed']} failed={users['failed']}; "
+        f"{report['updates']} updates in {report['elapsed_s']}s = {report['throughput_updates_per_s']} updates/s; "
+        f"{report['bot_api_calls']} Bot API calls"
+    )
+    print(
+        f"RSS {memory['rss_before_mb']} -> {memory['rss_after_mb']} MB "
+        f"({memory['rss_growth_kb_per_user']} KB/user), "
+        f"{memory['objects_growth']:+d} live objects"
+    )
+    print()
+    print(f"{'step':20s} {'updates':>8s} {'failed':>7s} {'p50 ms':>8s} {'p95 ms':>8s} "
+          f"{'p99 ms':>8s} {'max ms':>8s} {'queries':>8s}")
+    for name, step in report["steps"].items():
+        print(
+            f"{name:20s} {step['updates']:8d} {step['failed']:7d} {step['p50_ms']:8.1f} {step['p95_ms']:8.1f} "
+            f"{step['p99_ms']:8.1f} {step['max_ms']:8.1f} {step['queries_avg']:8.2f}"
+        )
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rate", type=float, default=10.0, help="new users per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of user arrivals")
+    parser.add_argument("--scenario", choices=sorted(SCENARIO_WEIGHTS), help="run one scenario instead of the mix")
+    parser.add_argument("--api-latency-ms", type=float, default=30.0, help="simulated Bot API round trip")
+    parser.add_argument("--think-ms", type=float, default=300.0, help="mean pause between a user's steps")
+    parser.add_argument("--step-timeout", type=float, default=30.0, help="seconds before a step counts as failed")
+    parser.add_argument("--database-url", help="default: a fresh SQLite file in a temp directory")
+    parser.add_argument("--seed", type=int, default=1, help="random seed for arrivals and scenario choice")
+    parser.add_argument("--json", metavar="PATH", help="also write the report as JSON")
+    args = parser.parse_args(argv)
+
+    tmp = tempfile.mkdtemp(prefix="ndstrbot-loadtest-")
+    os.environ.setdefault("BOT_TOKEN", "42:LOADTEST")
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite+aiosqlite:///{tmp}/loadtest.db"
+    os.environ["DATABASE_TYPE"] = "postgresql" if "postgresql" in os.environ["DATABASE_URL"] else "sqlite"
+    os.environ["BASE_DIR"] = tmp
+
+    from app.services.telegram_session import install_uvloop
+
+    install_uvloop()
+    report = asyncio.run(run(args))
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -78,4 +78,4 @@ class Audit(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     event: str = Field()
     payload: str = Field()  # JSON string
-    created_at: datetime = Field(default_factory=datetime.utcnow)
\ No newline at end of file
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)  # retention cutoff
\ No newline at end of file
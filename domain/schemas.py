@@ -76,3 +76,26 @@ class FileResponse(BaseModel):
     class Config:
         """Pydantic config."""
         from_attributes = True
+
+
+class FileLink(BaseModel):
+    """Schema for a request file in the request detail view."""
+    id: int
+    kind: str
+    created_at: datetime
+    url: Optional[str] = None  # /uploads/<name> of the stored photo
+
+
+class TemplateBrief(BaseModel):
+    """Schema for the template selected in a request."""
+    id: int
+    name: str
+    description: Optional[str] = None
+    preview_url: str
+
+
+class RequestFullResponse(RequestResponse):
+    """Schema for a request with its user, files and selected template."""
+    user: Optional[UserResponse] = None
+    files: List[FileLink] = []
+    selected_template: Optional[TemplateBrief] = None
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { 
   getUsers, 
   getAdmins, 
@@ -9,7 +9,11 @@ import {
   getTemplates,
   getTemplateById,
   deleteTemplate,
-  uploadTemplate
+  uploadTemplate,
+  subscribeRequestEvents,
+  prefetchRequests,
+  forgetPrefetchedRequest,
+  bulkUpdateRequestStatus
 } from './services/api';
 import DataTable from './components/DataTable';
 import StatsCard from './components/StatsCard';
@@ -29,6 +33,13 @@ function App() {
   const [templateDescription, setTemplateDescription] = useState('');
   const [templateFile, setTemplateFile] = useState(null);
   const [uploadingTemplate, setUploadingTemplate] = useState(false);
+  const [moderationCategory, setModerationCategory] = useState('');
+  const [moderating, setModerating] = useState(false);
+  // Живая лента заявок: события, пришедшие во время загрузки списка, копятся здесь
+  const requestEventBuffer = useRef(null);
+  const feedOpen = useRef(false);
+  const requestsLoaded = useRef(false);
+  const requestsSynced = useRef(false);
 
   const formatShortDate = (value) => {
     if (!value) return '—';
@@ -83,6 +94,8 @@ function App() {
       await logout();
       setUser(null);
       setData({});
+      requestsLoaded.current = false;
+      requestsSynced.current = false;
       setActiveTab('dashboard');
     } catch (error) {
       console.error('Logout error:', error);
@@ -121,6 +134,29 @@ function App() {
     }
   };
 
+  // Одобрение/отклонение заявок: по ID или всех отправленных (с фильтром по категории)
+  const handleModeration = async (status, ids = null) => {
+    if (!ids) {
+      const action = status === 'approved' ? 'Одобрить' : 'Отклонить';
+      const scope = moderationCategory ? ` категории «${moderationCategory}»` : '';
+      if (!window.confirm(`${action} все отправленные заявки${scope}?`)) return;
+    }
+    setModerating(true);
+    try {
+      const filter = ids ? undefined : (moderationCategory ? { category: moderationCategory } : {});
+      const result = await bulkUpdateRequestStatus(status, { ids: ids || undefined, filter });
+      // Статусы в списке обновит /events; без него перезагружаем список
+      if (!feedOpen.current) await reloadRequests();
+      if (!ids) alert(`Обработано заявок: ${result.updated.length}`);
+      else if (result.skipped.length) alert('Заявка уже обработана');
+    } catch (error) {
+      console.error('Moderation error:', error);
+      alert('Не удалось изменить статус: ' + error.message);
+    } finally {
+      setModerating(false);
+    }
+  };
+
   // Функция для загрузки данных из API
   const loadData = async (loader, key) => {
     try {
@@ -135,6 +171,57 @@ function App() {
     }
   };
 
+  // Применение события ленты: новая заявка добавляется сверху, изменённая заменяется
+  const applyRequestEvent = (request) => {
+    forgetPrefetchedRequest(request.id);
+    if (requestEventBuffer.current) {
+      requestEventBuffer.current.push(request);
+      return;
+    }
+    setData(prev => {
+      if (!Array.isArray(prev.requests)) return prev;
+      const index = prev.requests.findIndex((item) => item.id === request.id);
+      const requests = index === -1
+        ? [request, ...prev.requests]
+        : prev.requests.map((item, i) => (i === index ? request : item));
+      return { ...prev, requests };
+    });
+  };
+
+  // Полная загрузка заявок; дальше список обновляется событиями
+  const reloadRequests = async () => {
+    requestEventBuffer.current = [];
+    const synced = feedOpen.current;
+    try {
+      await loadData(getRequests, 'requests');
+      requestsLoaded.current = true;
+      requestsSynced.current = synced;
+    } finally {
+      const buffered = requestEventBuffer.current;
+      requestEventBuffer.current = null;
+      buffered.forEach(applyRequestEvent);
+    }
+  };
+
+  const loadRequests = () => (requestsSynced.current ? Promise.resolve() : reloadRequests());
+
+  useEffect(() => {
+    if (!user) return undefined;
+    return subscribeRequestEvents({
+      onOpen: () => {
+        feedOpen.current = true;
+        // После переподключения события могли быть пропущены
+        if (requestsLoaded.current) reloadRequests();
+      },
+      onError: () => {
+        feedOpen.current = false;
+        requestsSynced.current = false;
+      },
+      onRequest: applyRequestEvent,
+      onReset: reloadRequests
+    });
+  }, [user]);
+
   // Загрузка данных для дашборда при монтировании
   useEffect(() => {
     const loadDashboardData = async () => {
@@ -143,7 +230,7 @@ function App() {
         await Promise.all([
           loadData(getUsers, 'users'),
           loadData(getAdmins, 'admins'),
-          loadData(getRequests, 'requests'),
+          loadRequests(),
           loadData(getTemplates, 'templates')
         ]);
       } finally {
@@ -165,7 +252,7 @@ function App() {
           loadData(getUsers, 'users');
           break;
         case 'requests':
-          loadData(getRequests, 'requests');
+          loadRequests();
           break;
         case 'templates':
           loadData(getTemplates, 'templates');
@@ -176,6 +263,12 @@ function App() {
     }
   }, [activeTab]);
 
+  // Детали верхних заявок списка загружаются заранее одним запросом
+  useEffect(() => {
+    if (activeTab !== 'requests' || selectedRequestId || !Array.isArray(data.requests)) return;
+    prefetchRequests(data.requests.slice(0, 20).map((request) => request.id));
+  }, [activeTab, selectedRequestId, data.requests]);
+
   // Определение колонок для разных таблиц
   const userColumns = [
     { header: 'ID', key: 'id' },
@@ -233,7 +326,35 @@ function App() {
       key: 'selected_template_id',
       render: (value) => value ? `#${value}` : '—'
     },
-    { header: 'Дата создания', key: 'created_at', render: (value) => formatShortDate(value) }
+    { header: 'Дата создания', key: 'created_at', render: (value) => formatShortDate(value) },
+    {
+      header: 'Действия',
+      key: 'moderation',
+      render: (_, item) => item.status === 'submitted' ? (
+        <div style={{ display: 'flex', gap: '0.25rem' }}>
+          <button
+            disabled={moderating}
+            style={{ padding: '0.25rem 0.5rem', backgroundColor: '#28a745', color: 'white', border: 'none', borderRadius: '4px', cursor: 'pointer' }}
+            onClick={(e) => {
+              e.stopPropagation();
+              handleModeration('approved', [item.id]);
+            }}
+          >
+            Одобрить
+          </button>
+          <button
+            disabled={moderating}
+            style={{ padding: '0.25rem 0.5rem', backgroundColor: '#dc3545', color: 'white', border: 'none', borderRadius: '4px', cursor: 'pointer' }}
+            onClick={(e) => {
+              e.stopPropagation();
+              handleModeration('rejected', [item.id]);
+            }}
+          >
+            Отклонить
+          </button>
+        </div>
+      ) : '—'
+    }
   ];
 
   const templateColumns = [
@@ -408,12 +529,26 @@ function App() {
               onBack={handleBackToRequests}
             />
           ) : (
-            <DataTable 
-              data={data.requests} 
-              columns={requestColumns} 
-              title="Заявки"
-              onRowClick={handleRequestClick}
-            />
+            <>
+              <div className="moderation-actions" style={{marginBottom: '1rem', display: 'flex', gap: '0.5rem', alignItems: 'center'}}>
+                <select 
+                  value={moderationCategory} 
+                  onChange={(e) => setModerationCategory(e.target.value)}
+                >
+                  <option value="">Все категории</option>
+                  <option value="легковой">Легковой</option>
+                  <option value="грузовой">Грузовой</option>
+                </select>
+                <button disabled={moderating} onClick={() => handleModeration('approved')}>Одобрить все отправленные</button>
+                <button disabled={moderating} onClick={() => handleModeration('rejected')}>Отклонить все отправленные</button>
+              </div>
+              <DataTable 
+                data={data.requests} 
+                columns={requestColumns} 
+                title="Заявки"
+                onRowClick={handleRequestClick}
+              />
+            </>
           )
         )}
 
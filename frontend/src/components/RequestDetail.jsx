@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from 'react';
-import { getRequestById, getFilesByRequestId, getTemplateById } from '../services/api';
+import { getRequestFull } from '../services/api';
 import './RequestDetail.css';
 
 function RequestDetail({ requestId, onBack }) {
@@ -8,33 +8,16 @@ function RequestDetail({ requestId, onBack }) {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const [selectedImage, setSelectedImage] = useState(null);
-  const [templateInfo, setTemplateInfo] = useState(null);
-  const [templateLoading, setTemplateLoading] = useState(false);
 
   useEffect(() => {
     const loadRequestDetails = async () => {
       setLoading(true);
       setError(null);
       try {
-        const requestData = await getRequestById(requestId);
-        const filesData = await getFilesByRequestId(requestId);
+        // Request, user, files and template in one response
+        const requestData = await getRequestFull(requestId);
         setRequest(requestData);
-        setFiles(filesData);
-        if (requestData.selected_template_id) {
-          setTemplateLoading(true);
-          try {
-            const template = await getTemplateById(requestData.selected_template_id);
-            setTemplateInfo(template);
-          } catch (templateErr) {
-            console.error('Error loading template info:', templateErr);
-            setTemplateInfo(null);
-          } finally {
-            setTemplateLoading(false);
-          }
-        } else {
-          setTemplateInfo(null);
-          setTemplateLoading(false);
-        }
+        setFiles(requestData.files);
       } catch (err) {
         console.error('Error loading request details:', err);
         setError('Failed to load request details');
@@ -100,6 +83,9 @@ function RequestDetail({ requestId, onBack }) {
     }
   };
 
+  const templateInfo = request.selected_template;
+  const photos = files.filter(f => (f.kind === 'auto_photo' || f.kind === 'sts_photo') && f.url);
+
   const formatDate = (dateString) => {
     if (!dateString) return 'Н/Д';
     return new Date(dateString).toLocaleString('ru-RU', {
@@ -179,20 +165,18 @@ function RequestDetail({ requestId, onBack }) {
             <div className="detail-item" style={{ flexDirection: 'column', alignItems: 'flex-start' }}>
               <label style={{ marginBottom: '0.5rem' }}>Выбранный макет:</label>
               {request.selected_template_id ? (
-                templateLoading ? (
-                  <span>Загрузка...</span>
-                ) : templateInfo ? (
+                templateInfo ? (
                   <div className="template-preview">
                     <div style={{ marginBottom: '0.25rem' }}>
                       #{templateInfo.id} — {templateInfo.name || 'Без названия'}
                     </div>
                     <a
-                      href={`/api/templates/${templateInfo.id}/preview`}
+                      href={`/api${templateInfo.preview_url}`}
                       target="_blank"
                       rel="noreferrer"
                     >
                       <img
-                        src={`/api/templates/${templateInfo.id}/preview`}
+                        src={`/api${templateInfo.preview_url}`}
                         alt={templateInfo.name || 'Макет'}
                         style={{
                           maxWidth: '220px',
@@ -242,17 +226,17 @@ function RequestDetail({ requestId, onBack }) {
         )}
 
         <div className="detail-section">
-          <h3>Фотографии ({files.filter(f => f.kind === 'auto_photo' || f.kind === 'sts_photo').length})</h3>
-          {files.filter(f => f.kind === 'auto_photo' || f.kind === 'sts_photo').length > 0 ? (
+          <h3>Фотографии ({photos.length})</h3>
+          {photos.length > 0 ? (
             <div className="photo-grid">
-              {files.filter(f => f.kind === 'auto_photo' || f.kind === 'sts_photo').map((file) => (
+              {photos.map((file) => (
                 <div 
                   key={file.id} 
                   className="photo-thumbnail"
-                  onClick={() => setSelectedImage(`/api/uploads/${file.path.split('/').pop()}`)}
+                  onClick={() => setSelectedImage(`/api${file.url}`)}
                 >
                   <img 
-                    src={`/api/uploads/${file.path.split('/').pop()}`} 
+                    src={`/api${file.url}`} 
                     alt="Фото"
                     onError={(e) => {
                       e.target.style.display = 'none';
@@ -53,6 +53,45 @@ export const getAuditLogs = () => fetchData('audit');
 export const getTemplates = () => fetchData('templates');
 export const getTemplateById = (id) => fetchData(`templates/${id}`);
 
+// Request details with user, files and template (/requests/{id}/full).
+// Details prefetched for the list are used once, then fetched fresh.
+const prefetchedRequests = new Map();
+
+export const getRequestFull = (id) => {
+  const prefetched = prefetchedRequests.get(id);
+  if (prefetched) {
+    prefetchedRequests.delete(id);
+    return Promise.resolve(prefetched);
+  }
+  return fetchData(`requests/${id}/full`);
+};
+
+export const prefetchRequests = async (ids) => {
+  const missing = ids.filter((id) => !prefetchedRequests.has(id)).slice(0, 100);
+  if (missing.length === 0) return;
+  try {
+    const details = await fetchData(`requests/batch?ids=${missing.join(',')}`);
+    details.forEach((detail) => prefetchedRequests.set(detail.id, detail));
+  } catch (error) {
+    console.error('Request prefetch error:', error);
+  }
+};
+
+export const forgetPrefetchedRequest = (id) => prefetchedRequests.delete(id);
+
+// Live request feed (Server-Sent Events). The browser reconnects by itself;
+// handlers: onOpen, onError, onRequest(request), onReset()
+export const subscribeRequestEvents = ({ onOpen, onError, onRequest, onReset }) => {
+  const source = new EventSource('/api/events', { withCredentials: true });
+  const handleRequest = (event) => onRequest(JSON.parse(event.data));
+  source.addEventListener('request_created', handleRequest);
+  source.addEventListener('request_status_changed', handleRequest);
+  source.addEventListener('reset', () => onReset());
+  source.onopen = () => onOpen();
+  source.onerror = () => onError();
+  return () => source.close();
+};
+
 export const deleteTemplate = async (templateId) => {
   try {
     const response = await api.delete(`/templates/${templateId}`);
@@ -62,6 +101,16 @@ export const deleteTemplate = async (templateId) => {
   }
 };
 
+// Bulk moderation: { ids: [...] } or { filter: { category } } ({} = all submitted)
+export const bulkUpdateRequestStatus = async (status, { ids, filter } = {}) => {
+  try {
+    const response = await api.post('/requests/bulk-status', { status, ids, filter });
+    return response.data;
+  } catch (error) {
+    throw new Error(`Failed to update requests: ${error.message}`);
+  }
+};
+
 // Template upload
 export const uploadTemplate = async (name, description, file) => {
   try {
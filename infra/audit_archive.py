@@ -0,0 +1,306 @@
+"""Audit log retention: archive old events into compressed NDJSON segments.
+
+Events older than ``audit_retention_days`` are moved in batches from the
+audit event store (:mod:`infra.event_store`) into segment files under
+``audit_archive_dir``. Each batch is appended to the current
+segment as its own compressed frame (gzip members and zstd frames can be
+concatenated), recorded in ``manifest.json`` and only then deleted from the
+store in a short transaction of its own. A crash at any point loses nothing
+and archives nothing twice: segments are truncated back to the size the
+manifest knows about, and the ids of a batch whose delete didn't finish are
+kept in the manifest and deleted on the next run.
+
+The manifest lists the id and time range and the event counts of each
+segment, so :func:`read_archive` only opens segments that can match a query.
+"""
+
+import asyncio
+import gzip
+import io
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional
+
+from infra.config import settings
+from infra.event_store import EventStore, event_store
+
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+SEGMENT_SUFFIXES = {"gzip": ".ndjson.gz", "zstd": ".ndjson.zst"}
+
+
+def archive_dir() -> str:
+    """Configured archive directory (relative paths are under BASE_DIR)."""
+    return os.path.join(settings.base_dir, settings.audit_archive_dir)
+
+
+def compress_frame(data: bytes, compression: str) -> bytes:
+    """Compress one self-contained frame that can be appended to a segment."""
+    if compression == "zstd":
+        import zstandard  # optional dependency, only needed for zstd archives
+
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def open_segment(path: str, size: int) -> io.TextIOBase:
+    """Open the first ``size`` (committed) bytes of a segment for reading lines across its frames."""
+    with open(path, "rb") as f:
+        committed = io.BytesIO(f.read(size))
+    if path.endswith(".zst"):
+        import zstandard
+
+        raw = zstandard.ZstdDecompressor().stream_reader(committed, read_across_frames=True)
+        return io.TextIOWrapper(raw, encoding="utf-8")
+    return gzip.open(committed, "rt", encoding="utf-8")
+
+
+def audit_record(row) -> Dict[str, Any]:
+    """Archive representation of an audit row; the payload is stored as JSON, not as a string."""
+    try:
+        payload = json.loads(row.payload)
+    except (TypeError, ValueError):
+        payload = row.payload
+    return {"id": row.id, "event": row.event, "created_at": row.created_at.isoformat(), "payload": payload}
+
+
+class ArchiveManifest:
+    """
+    Index of the archive segments, stored as ``manifest.json``.
+
+    Each segment entry holds ``file``, ``bytes`` (committed size), ``rows``,
+    ``first_id``/``last_id``, ``since``/``until`` (ISO timestamps) and
+    ``events`` (rows per event). ``pending`` lists the ids of archived rows
+    that may still be in the event store.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.path = os.path.join(directory, MANIFEST_NAME)
+        self.segments: List[Dict[str, Any]] = []
+        self.pending: List[int] = []
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.segments = data.get("segments", [])
+            self.pending = data.get("pending", [])
+
+    def save(self):
+        """Atomically replace the manifest file."""
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "segments": self.segments, "pending": self.pending}, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def matching(
+        self, event: Optional[str] = None, since: Optional[datetime] = None, until: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """Segments that may contain rows for the event and time range."""
+        segments = []
+        for segment in self.segments:
+            if event is not None and event not in segment["events"]:
+                continue
+            if since is not None and segment["until"] < since.isoformat():
+                continue
+            if until is not None and segment["since"] >= until.isoformat():
+                continue
+            segments.append(segment)
+        return segments
+
+
+class AuditArchiver:
+    """
+    Moves audit events older than the retention window into the archive.
+
+    Args:
+        store: Event store the events are moved out of
+        directory: Archive directory
+        retention_days: Days of audit events kept in the store
+        batch_size: Rows per archive frame and per delete transaction
+        segment_rows: Rows per segment file before rolling over to a new one
+        compression: ``gzip`` or ``zstd`` (needs the zstandard package)
+        pause: Seconds to sleep between batches, leaving the database to the bot
+    """
+
+    def __init__(
+        self,
+        store: EventStore,
+        directory: str,
+        retention_days: int,
+        batch_size: int = 1000,
+        segment_rows: int = 100_000,
+        compression: str = "gzip",
+        pause: float = 0.05,
+    ):
+        if compression not in SEGMENT_SUFFIXES:
+            raise ValueError(f"Unknown audit archive compression: {compression}")
+        self.store = store
+        self.directory = directory
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+        self.segment_rows = segment_rows
+        self.compression = compression
+        self.pause = pause
+
+    async def run_once(self, now: Optional[datetime] = None) -> int:
+        """
+        Archive everything older than the retention window.
+
+        Args:
+            now: Reference time (default: current UTC time)
+
+        Returns:
+            int: Rows archived
+        """
+        cutoff = (now or datetime.utcnow()) - timedelta(days=self.retention_days)
+        manifest = ArchiveManifest(self.directory)
+        if manifest.pending:
+            logger.info(f"Deleting {len(manifest.pending)} audit rows archived by an interrupted run")
+            await self.store.delete(manifest.pending)
+            manifest.pending = []
+            manifest.save()
+
+        started = time.perf_counter()
+        archived = 0
+        while True:
+            rows = await self.store.query(until=cutoff, limit=self.batch_size)
+            if not rows:
+                break
+            ids = [row.id for row in rows]
+            await asyncio.to_thread(self._append, manifest, [audit_record(row) for row in rows])
+            manifest.pending = ids
+            await asyncio.to_thread(manifest.save)
+            await self.store.delete(ids)
+            archived += len(rows)
+            if len(rows) < self.batch_size:
+                break
+            await asyncio.sleep(self.pause)
+
+        if manifest.pending:
+            manifest.pending = []
+            manifest.save()
+        if archived:
+            logger.info(
+                f"Archived {archived} audit rows older than {cutoff:%Y-%m-%d %H:%M} "
+                f"in {time.perf_counter() - started:.1f}s"
+            )
+        return archived
+
+    def _append(self, manifest: ArchiveManifest, records: List[Dict[str, Any]]):
+        """Append one frame to the current segment (or a new one) and update its entry."""
+        segment = manifest.segments[-1] if manifest.segments else None
+        if (
+            segment is None
+            or segment["rows"] >= self.segment_rows
+            or not segment["file"].endswith(SEGMENT_SUFFIXES[self.compression])
+        ):
+            first = records[0]
+            segment = {
+                "file": f"audit-{first['id']:012d}{SEGMENT_SUFFIXES[self.compression]}",
+                "bytes": 0, "rows": 0, "first_id": first["id"], "last_id": first["id"],
+                "since": first["created_at"], "until": first["created_at"], "events": {},
+            }
+            manifest.segments.append(segment)
+
+        data = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records).encode("utf-8")
+        frame = compress_frame(data, self.compression)
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, segment["file"])
+        with open(path, "r+b" if segment["bytes"] else "wb") as f:
+            # Drop a frame left half-written by an interrupted run
+            f.truncate(segment["bytes"])
+            f.seek(segment["bytes"])
+            f.write(frame)
+            f.flush()
+            os.fsync(f.fileno())
+
+        segment["bytes"] += len(frame)
+        segment["rows"] += len(records)
+        segment["first_id"] = min(segment["first_id"], records[0]["id"])
+        segment["last_id"] = max(segment["last_id"], records[-1]["id"])
+        for record in records:
+            segment["since"] = min(segment["since"], record["created_at"])
+            segment["until"] = max(segment["until"], record["created_at"])
+            segment["events"][record["event"]] = segment["events"].get(record["event"], 0) + 1
+
+
+def read_archive(
+    event: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    directory: Optional[str] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream archived audit records matching an event and time range.
+
+    Args:
+        event: Only this event
+        since: Only records created at or after this time
+        until: Only records created before this time
+        directory: Archive directory (default: the configured one)
+
+    Yields:
+        Dict[str, Any]: Records (``id``, ``event``, ``created_at``, ``payload``)
+        in archive order
+    """
+    manifest = ArchiveManifest(directory or archive_dir())
+    since_text = since.isoformat() if since else None
+    until_text = until.isoformat() if until else None
+    for segment in manifest.matching(event, since, until):
+        with open_segment(os.path.join(manifest.directory, segment["file"]), segment["bytes"]) as f:
+            for line in f:
+                record = json.loads(line)
+                if event is not None and record["event"] != event:
+                    continue
+                if since_text is not None and record["created_at"] < since_text:
+                    continue
+                if until_text is not None and record["created_at"] >= until_text:
+                    continue
+                yield record
+
+
+async def run_worker(archiver: AuditArchiver, interval: float):
+    """Archive on a fixed interval until cancelled."""
+    while True:
+        try:
+            await archiver.run_once()
+        except Exception as e:
+            logger.error(f"Audit archive run failed: {e}", exc_info=True)
+        await asyncio.sleep(interval)
+
+
+async def main(once: bool = False):
+    """Entry point of ``run.py audit``: archive once, or periodically as a worker."""
+    from infra.logging import setup_logging
+
+    setup_logging()
+    if settings.audit_retention_days <= 0:
+        logger.warning("AUDIT_RETENTION_DAYS is not set, nothing to archive")
+        return
+    archiver = AuditArchiver(
+        event_store,
+        archive_dir(),
+        settings.audit_retention_days,
+        batch_size=settings.audit_archive_batch,
+        segment_rows=settings.audit_segment_rows,
+        compression=settings.audit_archive_compression,
+    )
+    try:
+        if once:
+            await archiver.run_once()
+        else:
+            logger.info(
+                f"Archiving audit rows older than {settings.audit_retention_days} days "
+                f"every {settings.audit_archive_interval}s to {archiver.directory}"
+            )
+            await run_worker(archiver, settings.audit_archive_interval)
+    finally:
+        await event_store.close()
@@ -1,7 +1,7 @@
 """Configuration management using pydantic-settings."""
 
 import os
-from typing import List, Union
+from typing import List, Optional, Union
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import field_validator
 
@@ -20,12 +20,71 @@ class Settings(BaseSettings):
     bot_username: str = "ndstrbot"
     admin_ids: List[int] = []
     
+    # Polling settings
+    polling_timeout: int = 30  # getUpdates long polling timeout, seconds
+    polling_limit: int = 100  # max updates per getUpdates batch
+    max_inflight_updates: int = 64  # concurrent user handlers, the rest wait in the lane queue
+    admin_inflight_updates: int = 8  # separate budget for updates sent by admins
+    polling_queue_size: int = 1000  # fetched updates waiting per lane before fetching pauses
+    polling_drain_timeout: float = 30.0  # seconds on shutdown to handle fetched updates
+    polling_pending_file: str = "storage/pending_updates.json"  # unhandled updates kept over a restart, relative to base_dir
+    polling_stats_interval: int = 60  # seconds between polling stats log lines
+    
+    # Metrics listener of the bot process (web app serves /metrics itself)
+    bot_metrics_host: str = "127.0.0.1"  # 0.0.0.0 to let a Prometheus on another host scrape it
+    bot_metrics_port: int = 9101  # 0 disables the listener
+    
+    # Supervisor (run.py both): seconds between child RSS/CPU log lines
+    supervisor_stats_interval: int = 60
+    
+    # Bot API client settings
+    telegram_api_base: Optional[str] = None  # e.g. a local Bot API server; default api.telegram.org
+    telegram_connection_limit: int = 100  # pooled connections to the Bot API
+    telegram_keepalive_timeout: float = 60.0  # seconds an idle connection stays open
+    telegram_dns_cache_ttl: int = 3600  # seconds to cache DNS answers
+    telegram_request_timeout: float = 60.0  # default request timeout, seconds
+    
+    # Progress messages: min seconds between edits of one chat's message
+    progress_edit_interval: float = 0.5
+    
+    # Bulk moderation: user notifications sent per second (Telegram allows ~30)
+    notify_rate: float = 25.0
+    
     # Web app settings
     web_app_base_url: str = "http://localhost:8000"
+    web_host: str = "0.0.0.0"
+    web_port: int = 8000
+    web_workers: int = 1  # uvicorn worker processes; 0 = one per CPU core
+    web_reload: bool = False  # auto-reload on code changes (development only)
+    web_keepalive: int = 5  # seconds to keep idle HTTP connections open
+    web_backlog: int = 2048  # pending TCP connections queued by the kernel
+    web_graceful_timeout: int = 30  # seconds to finish in-flight requests on shutdown
+    request_feed_poll_interval: float = 1.0  # seconds between change checks of /events on SQLite
+    web_compress_min_size: int = 1024  # bytes; smaller responses are sent uncompressed, 0 = no compression
+    web_metrics_token: str = ""  # bearer token for the web app's /metrics; empty = loopback clients only
+    web_metrics_dir: str = ""  # shared by workers to sum their /metrics; set by run.py web when workers > 1
+    web_compress_level: int = 6  # gzip level 1-9 (brotli, when installed, uses quality 4)
     
     # Database settings
     database_url: str = "sqlite+aiosqlite:///./storage/app.db"
     database_type: str = "sqlite"  # sqlite or postgresql
+    db_slow_query_ms: float = 250.0  # log statements slower than this (params redacted); 0 = off
+    db_repeat_threshold: int = 5  # same statement shape this often per update/request = likely N+1; 0 = off
+    
+    # Audit event store: sqlite = separate WAL database file, database = audit table of the main DB
+    audit_store: str = "sqlite"
+    audit_store_path: str = "storage/audit.db"  # relative to base_dir
+    audit_write_batch: int = 500  # events per batch write
+    audit_flush_interval: float = 0.5  # seconds events are buffered before a batch write
+    audit_max_buffer: int = 100_000  # unwritten events kept while writes fail; more are dropped
+    
+    # Audit retention (run.py audit); 0 days = keep every event in the store
+    audit_retention_days: int = 0
+    audit_archive_dir: str = "storage/audit_archive"  # relative to base_dir
+    audit_archive_compression: str = "gzip"  # gzip or zstd (needs the zstandard package)
+    audit_archive_batch: int = 1000  # rows per archive frame and per delete transaction
+    audit_segment_rows: int = 100_000  # rows per archive file before rolling over
+    audit_archive_interval: int = 3600  # seconds between archive runs of the worker
     
     # Storage settings
     base_dir: str = os.getenv("BASE_DIR", "/app")  # Default to /app for Docker, can be overridden
@@ -37,6 +96,17 @@ class Settings(BaseSettings):
     # Debug mode
     debug: bool = False
     
+    # Logging
+    log_json: bool = False  # one JSON object per line with update_id/chat_id
+    log_sample_rate: float = 0.0  # max INFO lines/s per call site; 0 = no sampling
+    log_sample_burst: int = 20  # INFO lines per call site allowed in a burst
+    
+    # Tracing (bot updates); both 0 = off
+    trace_sample_rate: float = 0.0  # fraction of updates traced and exported
+    trace_slow_ms: float = 0.0  # record every update, dump/export those slower than this
+    trace_file: Optional[str] = "logs/traces.ndjson"  # NDJSON export, relative to base_dir; empty = off
+    trace_otlp_endpoint: Optional[str] = None  # e.g. http://localhost:4318/v1/traces
+    
     @field_validator("admin_ids", mode="before")
     @classmethod
     def parse_admin_ids(cls, v, info):
@@ -1,12 +1,22 @@
 """Database initialization and session management."""
 
+import contextvars
 import logging
-from typing import AsyncGenerator
-from contextlib import asynccontextmanager
+import re
+import time
+from functools import lru_cache
+from typing import AsyncGenerator, Dict, Iterator, List, Optional, Tuple
+from contextlib import asynccontextmanager, contextmanager
+from sqlalchemy import event
 from sqlmodel import SQLModel
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker, AsyncSession
 
 from infra.config import settings
+from infra.event_store import publish_pending_audit
+from infra.request_feed import install_request_feed
+from infra.search import install_search_index
+from infra.table_version import install_table_versions
+from infra.tracing import start_span
 from domain.models import User, Request, File, Audit, Admin, Template  # noqa: F401
 
 
@@ -19,6 +29,186 @@ engine = create_async_engine(
     future=True
 )
 
+# Sessions keep attributes loaded after commit: handlers reply with ids and
+# fields of freshly written rows without an extra SELECT per object.
+session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+
+# Statement shapes: quoted literals, numbers and bind placeholders become "?",
+# and placeholder lists (IN (...), multi-row VALUES) collapse to one entry
+_SHAPE_LITERALS = re.compile(r"'(?:[^']|'')*'|\$\d+|\b\d+(?:\.\d+)?\b")
+_SHAPE_PLACEHOLDER_LISTS = re.compile(r"\?(?:\s*,\s*\?)+")
+_SHAPE_ROW_LISTS = re.compile(r"\(\?(?:, \.\.\.)?\)(?:\s*,\s*\(\?(?:, \.\.\.)?\))+")
+
+# Longest statement text kept on a trace span or in a log line
+SPAN_STATEMENT_LIMIT = 200
+
+
+@lru_cache(maxsize=1024)
+def statement_shape(statement: str) -> str:
+    """
+    Normalize a statement so executions differing only in values compare equal.
+
+    Args:
+        statement: SQL as sent to the driver
+
+    Returns:
+        str: Single-line statement with values replaced by ``?``
+    """
+    shape = _SHAPE_LITERALS.sub("?", " ".join(statement.split()))
+    shape = _SHAPE_PLACEHOLDER_LISTS.sub("?, ...", shape)
+    return _SHAPE_ROW_LISTS.sub("(?, ...), ...", shape)
+
+
+def redact_parameters(parameters, executemany: bool = False) -> str:
+    """Describe bound parameters by type only, e.g. ``(<int>, <str>)``."""
+    if executemany:
+        return f"[{len(parameters)} rows]"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: <{type(value).__name__}>" for key, value in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(f"<{type(value).__name__}>" for value in parameters) + ")"
+    return "()"
+
+
+class QueryStats:
+    """Statements issued by one logical unit of work (an update or HTTP request)."""
+
+    def __init__(self, name: str = "", parent: Optional["QueryStats"] = None):
+        self.name = name
+        self.parent = parent
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes: Dict[str, int] = {}
+
+    def record(self, shape: str, elapsed: float):
+        """Count one statement here and in the enclosing units."""
+        stats = self
+        while stats is not None:
+            stats.count += 1
+            stats.seconds += elapsed
+            stats.shapes[shape] = stats.shapes.get(shape, 0) + 1
+            stats = stats.parent
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statement shapes executed at least ``threshold`` times, most frequent first."""
+        return sorted(
+            ((shape, count) for shape, count in self.shapes.items() if count >= threshold),
+            key=lambda item: -item[1],
+        )
+
+
+current_query_stats: contextvars.ContextVar[Optional[QueryStats]] = contextvars.ContextVar(
+    "current_query_stats", default=None
+)
+
+
+@contextmanager
+def track_queries(name: str = "") -> Iterator[QueryStats]:
+    """
+    Count and time the statements executed in this context.
+
+    Statements are also counted by an enclosing ``track_queries`` block.
+    On exit, statement shapes repeated ``DB_REPEAT_THRESHOLD`` times or more
+    are logged as a likely N+1 pattern.
+
+    Args:
+        name: Unit name for the log, e.g. "light.template_next"; can be set
+            later on the yielded stats
+    """
+    stats = QueryStats(name, current_query_stats.get())
+    token = current_query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        current_query_stats.reset(token)
+        if settings.db_repeat_threshold:
+            for shape, count in stats.repeated(settings.db_repeat_threshold):
+                logger.warning(
+                    "Possible N+1 in %s: %d executions of %s",
+                    stats.name or "unit", count, shape[:SPAN_STATEMENT_LIMIT],
+                )
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised by :func:`query_budget` when a block issues too many statements."""
+
+
+@contextmanager
+def query_budget(limit: int, name: str = "query budget") -> Iterator[QueryStats]:
+    """
+    Fail if the block executes more than ``limit`` statements (test helper).
+
+    Example::
+
+        with query_budget(3):
+            await dp.feed_update(bot, update)
+
+    Args:
+        limit: Maximum number of statements
+        name: Unit name used in the failure message
+
+    Raises:
+        QueryBudgetExceeded: Listing the executed statement shapes
+    """
+    with track_queries(name) as stats:
+        yield stats
+    if stats.count > limit:
+        executed = "\n".join(f"  {count}x {shape}" for shape, count in stats.repeated(1))
+        raise QueryBudgetExceeded(f"{name}: {stats.count} statements, budget {limit}\n{executed}")
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    sql_span = start_span("sql")
+    if sql_span is not None:
+        sql_span.set_attribute("statement", statement_shape(statement)[:SPAN_STATEMENT_LIMIT])
+    conn.info.setdefault("query_started", []).append((time.perf_counter(), sql_span, context))
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started, sql_span, _ = conn.info["query_started"].pop()
+    elapsed = time.perf_counter() - started
+    if sql_span is not None:
+        sql_span.finish()
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.record(statement_shape(statement), elapsed)
+    if settings.db_slow_query_ms and elapsed * 1000 >= settings.db_slow_query_ms:
+        logger.warning(
+            "Slow query (%.0fms) in %s: %s params=%s",
+            elapsed * 1000,
+            stats.name if stats is not None and stats.name else "untracked code",
+            statement_shape(statement)[:SPAN_STATEMENT_LIMIT * 5],
+            redact_parameters(parameters, executemany),
+        )
+
+
+def _handle_error(exception_context):
+    # after_cursor_execute doesn't run for a failed statement
+    conn = exception_context.connection
+    pending = conn.info.get("query_started") if conn is not None else None
+    if pending and pending[-1][2] is exception_context.execution_context:
+        _, sql_span, _ = pending.pop()
+        if sql_span is not None:
+            sql_span.finish(exception_context.original_exception)
+
+
+def instrument_engine(target: AsyncEngine):
+    """
+    Install the statement hooks on an engine.
+
+    Every statement is timed and counted into the current
+    :func:`track_queries` unit, statements slower than ``DB_SLOW_QUERY_MS``
+    are logged with redacted parameters, and traced updates get a span per
+    statement.
+    """
+    event.listen(target.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(target.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(target.sync_engine, "handle_error", _handle_error)
+
+
+instrument_engine(engine)
+
 
 async def init_db():
     """Initialize database tables."""
@@ -29,10 +219,17 @@ async def init_db():
         from sqlalchemy import create_engine as create_sync_engine
         sync_engine = create_sync_engine(settings.database_url.replace("+asyncpg", ""))
         SQLModel.metadata.create_all(sync_engine)
+        with sync_engine.begin() as conn:
+            install_search_index(conn)
+            install_request_feed(conn)
+            install_table_versions(conn)
         sync_engine.dispose()
     else:
         async with engine.begin() as conn:
             await conn.run_sync(SQLModel.metadata.create_all)
+            await conn.run_sync(install_search_index)
+            await conn.run_sync(install_request_feed)
+            await conn.run_sync(install_table_versions)
     logger.info("Database tables initialized successfully")
 
 
@@ -40,8 +237,58 @@ async def init_db():
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     """Get database session."""
     logger.debug("Creating async session")
-    async with AsyncSession(engine) as session:
+    async with session_factory() as session:
         logger.debug("Async session created successfully")
         yield session
         logger.debug("Async session yielded")
-    logger.debug("Async session context closed")
\ No newline at end of file
+    logger.debug("Async session context closed")
+
+
+class LazySession:
+    """
+    AsyncSession proxy that is only created on first use.
+
+    Attribute access opens the underlying session; the pooled connection is
+    checked out by SQLAlchemy on the first statement. Updates whose handlers
+    never touch the proxy don't open a session at all.
+
+    The proxy is the unit of work of one update: handlers ``add`` and
+    ``flush`` (INSERT ... RETURNING fills generated ids), and the owner calls
+    :meth:`commit_if_opened` once after the handler. Handlers that confirm a
+    write to the user (request submission, moderation) commit themselves
+    before sending the confirmation.
+    """
+
+    def __init__(self):
+        self._session: Optional[AsyncSession] = None
+
+    @property
+    def opened(self) -> bool:
+        """Whether the underlying session has been created."""
+        return self._session is not None
+
+    def _get(self) -> AsyncSession:
+        if self._session is None:
+            logger.debug("Opening lazy async session")
+            self._session = session_factory()
+        return self._session
+
+    def __getattr__(self, name):
+        return getattr(self._get(), name)
+
+    async def commit(self):
+        """Commit the unit of work and release its audit events."""
+        await self._get().commit()
+        publish_pending_audit()
+
+    async def commit_if_opened(self):
+        """Commit the unit of work if anything used the session, then release its audit events."""
+        if self._session is not None:
+            await self._session.commit()
+        publish_pending_audit()
+
+    async def close(self):
+        """Close the underlying session if it was opened."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
@@ -0,0 +1,483 @@
+"""Append-only event store for audit events.
+
+Audit writes don't go through the main database session: :func:`audit`
+only buffers the event, and a background task writes buffered events in
+batches. The default backend is a separate SQLite file in WAL mode, so
+audit writes never take the main database's write lock (on SQLite, the one
+request submissions and ``UserMiddleware`` need). ``AUDIT_STORE=database``
+keeps the ``audit`` table of the main database instead.
+
+Events recorded inside an :class:`AuditUnit` (each bot update, see
+``UserMiddleware``) are held back until the unit of work commits
+(``LazySession.commit``): an event of a rolled-back transaction is dropped,
+never written. Outside a unit :func:`audit` appends straight to the store.
+"""
+
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, func, literal, or_, select
+
+from domain.models import Audit
+from infra.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# (event, payload JSON, created_at)
+EventRow = Tuple[str, str, datetime]
+
+
+class AuditEvent(NamedTuple):
+    """A stored audit event; same fields as :class:`domain.models.Audit`, without ORM overhead."""
+
+    id: int
+    event: str
+    payload: str  # JSON
+    created_at: datetime
+
+
+SQLITE_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS audit (
+        id INTEGER PRIMARY KEY,
+        event TEXT NOT NULL,
+        payload TEXT NOT NULL CHECK (json_valid(payload)),
+        created_at TEXT NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_audit_event_created_at ON audit (event, created_at)",
+    "CREATE INDEX IF NOT EXISTS ix_audit_created_at ON audit (created_at)",
+    # Full-text index of event and payload, kept in sync by triggers
+    "CREATE VIRTUAL TABLE IF NOT EXISTS audit_fts USING fts5("
+    "event, payload, content = 'audit', content_rowid = 'id', tokenize = 'unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS audit_fts_insert AFTER INSERT ON audit BEGIN "
+    "INSERT INTO audit_fts (rowid, event, payload) VALUES (new.id, new.event, new.payload); END",
+    "CREATE TRIGGER IF NOT EXISTS audit_fts_delete AFTER DELETE ON audit BEGIN "
+    "INSERT INTO audit_fts (audit_fts, rowid, event, payload) VALUES ('delete', old.id, old.event, old.payload); END",
+)
+SQLITE_TIME_FORMAT = "%Y-%m-%d %H:%M:%S.%f"  # fixed width, so text order is time order
+
+
+class EventStore:
+    """
+    Base class of audit event stores: buffering and batched writes.
+
+    ``append`` never blocks: it buffers the event and makes sure the writer
+    task is running. The writer flushes every ``flush_interval`` seconds, or
+    as soon as ``batch_size`` events are waiting. Events that fail to write
+    stay buffered and are retried on the next flush; while the buffer holds
+    ``max_buffer`` events, new ones are dropped and counted.
+
+    Backends implement :meth:`write_batch`, :meth:`query`, :meth:`count`
+    and :meth:`delete`.
+
+    Args:
+        batch_size: Events per write
+        flush_interval: Seconds events may wait in the buffer
+        max_buffer: Most events kept while writes keep failing
+    """
+
+    def __init__(self, batch_size: int = 500, flush_interval: float = 0.5, max_buffer: int = 100_000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.dropped = 0
+        self._buffer: List[EventRow] = []
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flush_lock = asyncio.Lock()
+
+    def append(self, event: str, payload: Optional[Dict[str, Any]] = None, created_at: Optional[datetime] = None):
+        """Buffer an event for the next batch write."""
+        if len(self._buffer) >= self.max_buffer:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                logger.error(f"Audit buffer full ({self.max_buffer} events unwritten), {self.dropped} events dropped")
+            return
+        self._buffer.append((
+            event, json.dumps(payload or {}, ensure_ascii=False, default=str), created_at or datetime.utcnow()
+        ))
+        if self._task is None or self._task.done():
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                return  # no loop (scripts): written by the next flush()
+            self._wakeup = asyncio.Event()
+            self._task = loop.create_task(self._run())
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Audit event write failed, {len(self._buffer)} events kept for retry: {e}")
+
+    async def flush(self):
+        """Write all buffered events."""
+        async with self._flush_lock:
+            while self._buffer:
+                batch = self._buffer[:self.batch_size]
+                await self.write_batch(batch)
+                del self._buffer[:len(batch)]
+            if self.dropped:
+                logger.warning(f"Audit writes recovered; {self.dropped} events were dropped while the buffer was full")
+                self.dropped = 0
+
+    async def close(self):
+        """Stop the writer task, write what is buffered and release resources."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def write_batch(self, rows: Sequence[EventRow]):
+        """Insert events in one transaction."""
+        raise NotImplementedError
+
+    async def query(
+        self,
+        event: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: Optional[int] = None,
+    ) -> List[AuditEvent]:
+        """
+        Events in id order.
+
+        Args:
+            event: Only this event
+            since: Only events created at or after this time
+            until: Only events created before this time
+            limit: Max events returned
+
+        Returns:
+            List[AuditEvent]: Events
+        """
+        raise NotImplementedError
+
+    async def count(self) -> int:
+        """Number of stored events."""
+        raise NotImplementedError
+
+    async def version(self) -> str:
+        """Cheap token that changes when events are added or deleted (``<max id>-<count>``)."""
+        raise NotImplementedError
+
+    async def delete(self, ids: Sequence[int]):
+        """Delete events by id in one short transaction."""
+        raise NotImplementedError
+
+    async def search(self, terms: Sequence[str], limit: int) -> List[Tuple[AuditEvent, float]]:
+        """
+        Full-text search of event names and payloads.
+
+        Args:
+            terms: Words that must all match as prefixes (see :func:`infra.search.search_terms`)
+            limit: Max events returned
+
+        Returns:
+            List[Tuple[AuditEvent, float]]: Events with their rank, best first
+        """
+        raise NotImplementedError
+
+
+class SQLiteEventStore(EventStore):
+    """
+    Events in a separate SQLite database in WAL mode.
+
+    One connection writes (batches and deletes), another reads; both are
+    used from worker threads. WAL lets readers, including other processes
+    (bot, web workers), run alongside the writer.
+
+    Args:
+        path: Database file, created on first use
+    """
+
+    def __init__(self, path: str, batch_size: int = 500, flush_interval: float = 0.5, max_buffer: int = 100_000):
+        super().__init__(batch_size, flush_interval, max_buffer)
+        self.path = path
+        self._writer: Optional[sqlite3.Connection] = None
+        self._reader: Optional[sqlite3.Connection] = None
+        self._write_lock = threading.Lock()
+        self._read_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _get_writer(self) -> sqlite3.Connection:
+        if self._writer is None:
+            conn = self._connect()
+            indexed = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'audit_fts'").fetchone()
+            for statement in SQLITE_SCHEMA:
+                conn.execute(statement)
+            if not indexed:
+                # Store created before full-text search: index existing events
+                conn.execute("INSERT INTO audit_fts (audit_fts) VALUES ('rebuild')")
+            self._writer = conn
+        return self._writer
+
+    def _get_reader(self) -> sqlite3.Connection:
+        if self._reader is None:
+            self._get_writer()  # schema
+            self._reader = self._connect()
+        return self._reader
+
+    def _write(self, rows: Sequence[EventRow]):
+        with self._write_lock:
+            conn = self._get_writer()
+            with conn:
+                conn.execute("BEGIN")
+                conn.executemany(
+                    "INSERT INTO audit (event, payload, created_at) VALUES (?, ?, ?)",
+                    [(event, payload, created_at.strftime(SQLITE_TIME_FORMAT)) for event, payload, created_at in rows],
+                )
+
+    async def write_batch(self, rows: Sequence[EventRow]):
+        """Insert events in one transaction."""
+        await asyncio.to_thread(self._write, rows)
+
+    def _read(self, sql: str, params: Sequence[Any]) -> List[tuple]:
+        with self._read_lock:
+            return self._get_reader().execute(sql, params).fetchall()
+
+    async def query(
+        self,
+        event: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: Optional[int] = None,
+    ) -> List[AuditEvent]:
+        """Events in id order (see :meth:`EventStore.query`)."""
+        conditions = []
+        params: List[Any] = []
+        if event is not None:
+            conditions.append("event = ?")
+            params.append(event)
+        if since is not None:
+            conditions.append("created_at >= ?")
+            params.append(since.strftime(SQLITE_TIME_FORMAT))
+        if until is not None:
+            conditions.append("created_at < ?")
+            params.append(until.strftime(SQLITE_TIME_FORMAT))
+        sql = "SELECT id, event, payload, created_at FROM audit"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        rows = await asyncio.to_thread(self._read, sql, params)
+        return [AuditEvent(row[0], row[1], row[2], datetime.fromisoformat(row[3])) for row in rows]
+
+    async def count(self) -> int:
+        """Number of stored events."""
+        rows = await asyncio.to_thread(self._read, "SELECT COUNT(*) FROM audit", ())
+        return rows[0][0]
+
+    async def version(self) -> str:
+        """Cheap token that changes when events are added or deleted (``<max id>-<count>``)."""
+        rows = await asyncio.to_thread(self._read, "SELECT coalesce(MAX(id), 0), COUNT(*) FROM audit", ())
+        return f"{rows[0][0]}-{rows[0][1]}"
+
+    def _delete(self, ids: Sequence[int]):
+        with self._write_lock:
+            conn = self._get_writer()
+            with conn:
+                conn.execute("BEGIN")
+                conn.execute(f"DELETE FROM audit WHERE id IN ({','.join('?' * len(ids))})", list(ids))
+
+    async def delete(self, ids: Sequence[int]):
+        """Delete events by id in one short transaction."""
+        if ids:
+            await asyncio.to_thread(self._delete, ids)
+
+    async def search(self, terms: Sequence[str], limit: int) -> List[Tuple[AuditEvent, float]]:
+        """Full-text search of event names and payloads (see :meth:`EventStore.search`)."""
+        from infra.search import fts5_query
+
+        rows = await asyncio.to_thread(
+            self._read,
+            "SELECT audit.id, audit.event, audit.payload, audit.created_at, -bm25(audit_fts) AS rank "
+            "FROM audit_fts JOIN audit ON audit.id = audit_fts.rowid WHERE audit_fts MATCH ? "
+            "ORDER BY rank DESC, audit.id DESC LIMIT ?",
+            (fts5_query(terms), limit),
+        )
+        return [(AuditEvent(row[0], row[1], row[2], datetime.fromisoformat(row[3])), row[4]) for row in rows]
+
+    async def close(self):
+        """Write what is buffered and close the connections."""
+        await super().close()
+        for conn in (self._writer, self._reader):
+            if conn is not None:
+                conn.close()
+        self._writer = self._reader = None
+
+
+class DatabaseEventStore(EventStore):
+    """Events in the ``audit`` table of the main database (batched, outside the update's session)."""
+
+    async def write_batch(self, rows: Sequence[EventRow]):
+        """Insert events in one transaction."""
+        from infra.db import engine
+
+        async with engine.begin() as conn:
+            await conn.execute(Audit.__table__.insert(), [
+                {"event": event, "payload": payload, "created_at": created_at} for event, payload, created_at in rows
+            ])
+
+    async def query(
+        self,
+        event: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: Optional[int] = None,
+    ) -> List[AuditEvent]:
+        """Events in id order (see :meth:`EventStore.query`)."""
+        from infra.db import session_factory
+
+        statement = select(Audit.id, Audit.event, Audit.payload, Audit.created_at).order_by(Audit.id)
+        if event is not None:
+            statement = statement.where(Audit.event == event)
+        if since is not None:
+            statement = statement.where(Audit.created_at >= since)
+        if until is not None:
+            statement = statement.where(Audit.created_at < until)
+        if limit is not None:
+            statement = statement.limit(limit)
+        async with session_factory() as session:
+            result = await session.execute(statement)
+            return [AuditEvent(*row) for row in result]
+
+    async def count(self) -> int:
+        """Number of stored events."""
+        from infra.db import session_factory
+
+        async with session_factory() as session:
+            result = await session.execute(select(func.count()).select_from(Audit))
+            return result.scalar_one()
+
+    async def version(self) -> str:
+        """Cheap token that changes when events are added or deleted (``<max id>-<count>``)."""
+        from infra.db import session_factory
+
+        async with session_factory() as session:
+            result = await session.execute(select(func.coalesce(func.max(Audit.id), 0), func.count()).select_from(Audit))
+            max_id, count = result.one()
+            return f"{max_id}-{count}"
+
+    async def delete(self, ids: Sequence[int]):
+        """Delete events by id in one short transaction."""
+        from infra.db import session_factory
+
+        if ids:
+            async with session_factory() as session:
+                await session.execute(delete(Audit).where(Audit.id.in_(ids)))
+                await session.commit()
+
+    async def search(self, terms: Sequence[str], limit: int) -> List[Tuple[AuditEvent, float]]:
+        """
+        Full-text search of event names and payloads (see :meth:`EventStore.search`).
+
+        Uses the tsvector index on PostgreSQL; on SQLite it falls back to
+        unranked LIKE matching.
+        """
+        from infra.db import session_factory
+        from infra.search import tsquery
+
+        columns = (Audit.id, Audit.event, Audit.payload, Audit.created_at)
+        async with session_factory() as session:
+            if session.bind.dialect.name == "postgresql":
+                vector = func.to_tsvector("simple", Audit.event + " " + Audit.payload)
+                query = func.to_tsquery("simple", tsquery(terms))
+                rank = func.ts_rank(vector, query)
+                statement = select(*columns, rank).where(vector.op("@@")(query)).order_by(rank.desc(), Audit.id.desc())
+            else:
+                statement = select(*columns, literal(0.0)).order_by(Audit.id.desc())
+                for term in terms:
+                    statement = statement.where(or_(Audit.event.contains(term), Audit.payload.contains(term)))
+            result = await session.execute(statement.limit(limit))
+            return [(AuditEvent(*row[:4]), float(row[4])) for row in result]
+
+
+def build_event_store() -> EventStore:
+    """Event store selected by ``AUDIT_STORE``."""
+    if settings.audit_store == "database":
+        return DatabaseEventStore(settings.audit_write_batch, settings.audit_flush_interval, settings.audit_max_buffer)
+    if settings.audit_store != "sqlite":
+        raise ValueError(f"Unknown audit store: {settings.audit_store}")
+    return SQLiteEventStore(
+        os.path.join(settings.base_dir, settings.audit_store_path),
+        settings.audit_write_batch,
+        settings.audit_flush_interval,
+        settings.audit_max_buffer,
+    )
+
+
+# Events of the current unit of work, appended to the store once it commits
+_pending_events: contextvars.ContextVar[Optional[List[Tuple[str, Dict[str, Any], datetime]]]] = contextvars.ContextVar(
+    "pending_audit_events", default=None
+)
+
+
+class AuditUnit:
+    """
+    Holds back audit events of a unit of work until its commit.
+
+    ``audit()`` calls inside ``with AuditUnit():`` are only collected;
+    :func:`publish_pending_audit` (called by ``LazySession.commit``) hands
+    them to the event store. Events still pending when the block exits
+    belong to a transaction that never committed and are dropped.
+    """
+
+    def __enter__(self) -> "AuditUnit":
+        self.events: List[Tuple[str, Dict[str, Any], datetime]] = []
+        self._token = _pending_events.set(self.events)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _pending_events.reset(self._token)
+        if self.events:
+            logger.warning(f"Dropped {len(self.events)} audit events of an uncommitted unit of work")
+
+
+def publish_pending_audit():
+    """Append the current unit of work's audit events to the store (after its commit)."""
+    events = _pending_events.get()
+    if events:
+        for event, payload, created_at in events:
+            event_store.append(event, payload, created_at)
+        events.clear()
+
+
+def audit(event: str, **payload: Any):
+    """Record an audit event, e.g. ``audit("request_submitted", request_id=42)``; never blocks."""
+    events = _pending_events.get()
+    if events is not None:
+        events.append((event, payload, datetime.utcnow()))
+    else:
+        event_store.append(event, payload)
+
+
+# Global event store instance
+event_store = build_event_store()
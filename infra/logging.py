@@ -1,37 +1,183 @@
 """Logging configuration."""
 
+import atexit
+import contextvars
+import copy
+import json
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+import threading
+import time
+import traceback
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any, Dict, List, Optional, Tuple
 
 from infra.config import settings
 
 
-def setup_logging():
-    """Set up logging with rotation."""
-    # Create logs directory if it doesn't exist
-    logs_dir = os.path.join(settings.base_dir, "logs")
-    os.makedirs(logs_dir, exist_ok=True)
-    
-    # Configure root logger
-    logger = logging.getLogger()
-    logger.setLevel(logging.DEBUG if settings.debug else logging.INFO)
-    
-    # Create formatter
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    
+# Per-update context, set by the bot middleware and attached to every record
+update_id_var: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar("update_id", default=None)
+chat_id_var: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar("chat_id", default=None)
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_listener: Optional[QueueListener] = None
+
+# Message arguments of these types can't change after the logging call
+_IMMUTABLE_ARGS = (str, bytes, int, float, bool, type(None), date, Decimal)
+
+
+class ContextFilter(logging.Filter):
+    """Copy update_id/chat_id from the current context onto the record."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.update_id = update_id_var.get()
+        record.chat_id = chat_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Rate-limit INFO-and-below records per call site.
+
+    Each call site (file and line) may emit ``rate`` records per second with
+    bursts up to ``burst``; the rest are dropped and counted. The next record
+    let through from that call site reports how many were suppressed.
+    WARNING and above always pass.
+    """
+
+    def __init__(self, rate: float, burst: int = 10):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self._buckets: Dict[Tuple[str, int], List[float]] = {}  # site -> [tokens, updated_at, dropped]
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO:
+            return True
+        site = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(site)
+            if bucket is None:
+                bucket = self._buckets[site] = [float(self.burst), now, 0]
+            tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if tokens < 1:
+                bucket[0] = tokens
+                bucket[2] += 1
+                return False
+            bucket[0] = tokens - 1
+            dropped, bucket[2] = bucket[2], 0
+        if dropped:
+            record.sampled_out = dropped
+        return True
+
+
+def _format_deferred_exception(record: logging.LogRecord):
+    """Render the traceback captured by :class:`DeferredQueueHandler` into ``exc_text``."""
+    exception = getattr(record, "exception", None)
+    if exception is not None and not record.exc_text:
+        record.exc_text = "".join(exception.format()).rstrip("\n")
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with the update context fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in ("update_id", "chat_id", "sampled_out"):
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        _format_deferred_exception(record)
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """The classic text format, noting suppressed records when sampling."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        _format_deferred_exception(record)
+        text = super().format(record)
+        sampled_out = getattr(record, "sampled_out", None)
+        if sampled_out:
+            text += f" [{sampled_out} similar suppressed]"
+        return text
+
+
+def _immutable(value: Any) -> bool:
+    if isinstance(value, tuple):
+        return all(_immutable(item) for item in value)
+    return isinstance(value, _IMMUTABLE_ARGS)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener thread.
+
+    The stock ``prepare()`` formats the whole record on the calling thread.
+    Here the ``%`` merge runs in the listener as well, unless an argument
+    is mutable (a list, a model) and could change before then. A traceback
+    is captured as a ``TracebackException`` without reading source lines,
+    which releases the frames; the listener looks the lines up and renders
+    it.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        if record.args and not _immutable(record.args if isinstance(record.args, tuple) else (record.args,)):
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info and record.exc_info[0] is not None and not record.exc_text:
+            record.exception = traceback.TracebackException(*record.exc_info, lookup_lines=False)
+        record.exc_info = None
+        return record
+
+
+def build_handlers(logs_dir: str, files: bool = True) -> List[logging.Handler]:
+    """
+    Create the file and console handlers with the configured formatter.
+
+    Args:
+        logs_dir: Directory for app.log and error.log
+        files: Write the log files; False = console only
+
+    Returns:
+        List[logging.Handler]: Handlers that do the actual I/O
+    """
+    level = logging.DEBUG if settings.debug else logging.INFO
+    formatter = JsonFormatter() if settings.log_json else TextFormatter(TEXT_FORMAT)
+
+    # Create console handler
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(level)
+    console_handler.setFormatter(formatter)
+    if not files:
+        return [console_handler]
+
     # Create rotating file handler for general logs
     file_handler = RotatingFileHandler(
         os.path.join(logs_dir, "app.log"),
         maxBytes=10*1024*1024,  # 10MB
         backupCount=5
     )
-    file_handler.setLevel(logging.DEBUG if settings.debug else logging.INFO)
+    file_handler.setLevel(level)
     file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
-    
+
     # Create rotating file handler for error logs
     error_handler = RotatingFileHandler(
         os.path.join(logs_dir, "error.log"),
@@ -40,14 +186,58 @@ def setup_logging():
     )
     error_handler.setLevel(logging.ERROR)
     error_handler.setFormatter(formatter)
-    logger.addHandler(error_handler)
-    
-    # Create console handler
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.DEBUG if settings.debug else logging.INFO)
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-    
+    return [file_handler, error_handler, console_handler]
+
+
+def setup_logging(files: bool = True):
+    """
+    Set up logging with rotation.
+
+    The root logger only gets a queue handler; formatting and file/console
+    writes happen in a background listener thread, off the event loop.
+    Records carry the current update_id/chat_id, and INFO lines can be
+    rate-limited per call site with ``LOG_SAMPLE_RATE``.
+
+    Args:
+        files: Write logs/app.log and logs/error.log; processes that run
+            side by side (web workers) log to the console only, as they
+            can't share a rotating file
+    """
+    global _listener
+    logs_dir = os.path.join(settings.base_dir, "logs")
+    if files:
+        # Create logs directory if it doesn't exist
+        os.makedirs(logs_dir, exist_ok=True)
+
+    # Configure root logger
+    logger = logging.getLogger()
+    logger.setLevel(logging.DEBUG if settings.debug else logging.INFO)
+
+    # Replace handlers installed earlier (basicConfig, a previous call)
+    stop_logging()
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    # Context and sampling run on the calling thread, before the record is queued
+    queue_handler.addFilter(ContextFilter())
+    if settings.log_sample_rate > 0:
+        queue_handler.addFilter(SamplingFilter(settings.log_sample_rate, settings.log_sample_burst))
+    logger.addHandler(queue_handler)
+
+    _listener = QueueListener(log_queue, *build_handlers(logs_dir, files), respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
     # Set specific log levels for our modules
     logging.getLogger('app').setLevel(logging.DEBUG if settings.debug else logging.INFO)
-    logging.getLogger('infra').setLevel(logging.DEBUG if settings.debug else logging.INFO)
\ No newline at end of file
+    logging.getLogger('infra').setLevel(logging.DEBUG if settings.debug else logging.INFO)
+
+
+def stop_logging():
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,292 @@
+"""Lightweight in-process metrics in the Prometheus text format."""
+
+import bisect
+import glob
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def snapshot(self) -> List[list]:
+        """JSON-serializable copy of all series: ``[[labelvalues, ...state], ...]``."""
+        raise NotImplementedError
+
+    def merged(self, snapshots: Sequence[List[list]]) -> Dict[Tuple[str, ...], Any]:
+        """Series summed over the snapshots of several processes."""
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonic counter with optional labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labelvalues: str, amount: float = 1.0):
+        """Increase the counter for the given label values."""
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def value(self, *labelvalues: str) -> float:
+        """Current value for the given label values."""
+        return self._values.get(labelvalues, 0.0)
+
+    def snapshot(self) -> List[list]:
+        with self._lock:
+            return [[list(labelvalues), value] for labelvalues, value in self._values.items()]
+
+    def merged(self, snapshots: Sequence[List[list]]) -> Dict[Tuple[str, ...], float]:
+        values: Dict[Tuple[str, ...], float] = {}
+        for snapshot in snapshots:
+            for labelvalues, value in snapshot:
+                key = tuple(labelvalues)
+                values[key] = values.get(key, 0.0) + value
+        return values
+
+    def render(self, values: Optional[Dict[Tuple[str, ...], float]] = None) -> List[str]:
+        lines = self.header()
+        if values is None:
+            with self._lock:
+                values = dict(self._values)
+        for labelvalues, value in values.items():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labelvalues)} {value:g}")
+        return lines
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram with optional labels."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts..., +Inf count], sum
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labelvalues: str):
+        """Record one observation for the given label values."""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    def count(self, *labelvalues: str) -> int:
+        """Number of observations for the given label values."""
+        series = self._series.get(labelvalues)
+        return sum(series[0]) if series else 0
+
+    def snapshot(self) -> List[list]:
+        with self._lock:
+            return [[list(labels), list(counts), total[0]] for labels, (counts, total) in self._series.items()]
+
+    def merged(self, snapshots: Sequence[List[list]]) -> Dict[Tuple[str, ...], Tuple[List[int], float]]:
+        series: Dict[Tuple[str, ...], Tuple[List[int], float]] = {}
+        for snapshot in snapshots:
+            for labelvalues, counts, total in snapshot:
+                if len(counts) != len(self.buckets) + 1:
+                    continue  # written with other buckets by an older version
+                key = tuple(labelvalues)
+                previous = series.get(key)
+                if previous is not None:
+                    counts = [a + b for a, b in zip(previous[0], counts)]
+                    total += previous[1]
+                series[key] = (counts, total)
+        return series
+
+    def render(self, series: Optional[Dict[Tuple[str, ...], Tuple[List[int], float]]] = None) -> List[str]:
+        lines = self.header()
+        if series is None:
+            with self._lock:
+                series = {labels: (list(counts), total[0]) for labels, (counts, total) in self._series.items()}
+        for labelvalues, (counts, total) in series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = _format_labels(self.labelnames, labelvalues, f'le="{bound:g}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            cumulative += counts[-1]
+            le = _format_labels(self.labelnames, labelvalues, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{le} {cumulative}")
+            labels = _format_labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}_sum{labels} {total:g}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together for ``/metrics``."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Create and register a counter."""
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        """Create and register a histogram."""
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def write_snapshot(self, directory: str):
+        """
+        Save this process's series to ``<directory>/<pid>.json``.
+
+        Written to a temporary file and renamed, so a reader never sees a
+        half-written snapshot.
+        """
+        data = {name: metric.snapshot() for name, metric in self._metrics.items()}
+        path = os.path.join(directory, f"{os.getpid()}.json")
+        with open(f"{path}.tmp", "w") as file:
+            json.dump(data, file)
+        os.replace(f"{path}.tmp", path)
+
+    def render_directory(self, directory: str) -> str:
+        """
+        Render the series of all processes sharing ``directory``, summed.
+
+        This process's snapshot is refreshed first; the others are as recent
+        as their last :meth:`write_snapshot`. Snapshots of exited processes
+        are kept, so counters never go backwards when a worker restarts.
+        """
+        self.write_snapshot(directory)
+        snapshots = []
+        for path in glob.glob(os.path.join(directory, "*.json")):
+            try:
+                with open(path) as file:
+                    snapshots.append(json.load(file))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping metrics snapshot {path}: {e}")
+        lines: List[str] = []
+        for name, metric in self._metrics.items():
+            lines.extend(metric.render(metric.merged([snapshot.get(name, []) for snapshot in snapshots])))
+        return "\n".join(lines) + "\n"
+
+
+def clear_snapshots(directory: str):
+    """Create ``directory`` and remove snapshots left by a previous run."""
+    os.makedirs(directory, exist_ok=True)
+    for path in glob.glob(os.path.join(directory, "*.json")):
+        os.remove(path)
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Global registry instance
+metrics = MetricsRegistry()
+
+# Bot
+HANDLER_SECONDS = metrics.histogram(
+    "bot_handler_seconds", "Update handling time incl. middleware", ("router", "handler")
+)
+UPDATE_DB_QUERIES = metrics.histogram(
+    "bot_update_db_queries", "SQL statements per update", buckets=QUERY_COUNT_BUCKETS
+)
+UPDATE_DB_SECONDS = metrics.histogram("bot_update_db_seconds", "SQL time per update")
+FSM_TRANSITIONS = metrics.counter(
+    "bot_fsm_transitions_total", "FSM state changes", ("from_state", "to_state")
+)
+TELEGRAM_API_SECONDS = metrics.histogram(
+    "telegram_api_seconds", "Bot API call latency", ("method",)
+)
+TELEGRAM_API_ERRORS = metrics.counter(
+    "telegram_api_errors_total", "Failed Bot API calls", ("method", "error")
+)
+
+# Web
+WEB_REQUEST_SECONDS = metrics.histogram(
+    "web_request_seconds", "HTTP request latency", ("method", "route")
+)
+WEB_REQUESTS = metrics.counter(
+    "web_requests_total", "HTTP requests", ("method", "route", "status")
+)
+WEB_REQUEST_DB_QUERIES = metrics.histogram(
+    "web_request_db_queries", "SQL statements per HTTP request", buckets=QUERY_COUNT_BUCKETS
+)
+
+
+async def start_metrics_server(host: str, port: int):
+    """
+    Serve ``/metrics`` on a small aiohttp listener (bot process).
+
+    Args:
+        host: Interface to bind
+        port: TCP port
+
+    Returns:
+        aiohttp.web.AppRunner: Runner to clean up on shutdown
+    """
+    from aiohttp import web
+
+    async def handle(request: web.Request) -> web.Response:
+        return web.Response(body=metrics.render().encode(), headers={"Content-Type": CONTENT_TYPE})
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info(f"Metrics listener on http://{host}:{port}/metrics")
+    return runner
@@ -0,0 +1,59 @@
+"""Change capture for the live request feed (``GET /events``).
+
+A trigger on ``request`` records every new request and every status change,
+whoever makes it (bot, web app, scripts):
+
+- PostgreSQL: ``NOTIFY request_changes, '<id>:<kind>'``, delivered on commit
+  to every web worker that listens;
+- SQLite: a row in ``request_change``, which web workers poll by ``seq``.
+  Only the last ``KEEP_CHANGES`` rows are kept.
+
+``kind`` is ``created`` or ``status_changed``. Installed by
+:func:`infra.db.init_db` (``python create_db.py``).
+"""
+
+from typing import List
+
+
+CHANNEL = "request_changes"
+KEEP_CHANGES = 10_000
+
+_SQLITE_DDL = [
+    "CREATE TABLE IF NOT EXISTS request_change ("
+    "seq INTEGER PRIMARY KEY AUTOINCREMENT, request_id INTEGER NOT NULL, kind TEXT NOT NULL)",
+    # last_insert_rowid() is the request_change row inside the trigger
+    "CREATE TRIGGER IF NOT EXISTS request_feed_insert AFTER INSERT ON request BEGIN "
+    "INSERT INTO request_change (request_id, kind) VALUES (new.id, 'created'); "
+    f"DELETE FROM request_change WHERE seq <= last_insert_rowid() - {KEEP_CHANGES}; END",
+    "CREATE TRIGGER IF NOT EXISTS request_feed_status AFTER UPDATE OF status ON request "
+    "WHEN old.status IS NOT new.status BEGIN "
+    "INSERT INTO request_change (request_id, kind) VALUES (new.id, 'status_changed'); "
+    f"DELETE FROM request_change WHERE seq <= last_insert_rowid() - {KEEP_CHANGES}; END",
+]
+
+_POSTGRES_DDL = [
+    f"""CREATE OR REPLACE FUNCTION notify_request_change() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.status IS NOT DISTINCT FROM NEW.status THEN
+        RETURN NULL;
+    END IF;
+    PERFORM pg_notify('{CHANNEL}', NEW.id || ':' || CASE TG_OP WHEN 'INSERT' THEN 'created' ELSE 'status_changed' END);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql""",
+    "DROP TRIGGER IF EXISTS request_feed ON request",
+    "CREATE TRIGGER request_feed AFTER INSERT OR UPDATE OF status ON request "
+    "FOR EACH ROW EXECUTE FUNCTION notify_request_change()",
+]
+
+
+def install_request_feed(conn):
+    """
+    Create the change capture trigger (idempotent).
+
+    Args:
+        conn: Synchronous SQLAlchemy connection (``AsyncConnection.run_sync``)
+    """
+    statements: List[str] = _POSTGRES_DDL if conn.dialect.name == "postgresql" else _SQLITE_DDL
+    for statement in statements:
+        conn.exec_driver_sql(statement)
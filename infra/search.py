@@ -0,0 +1,216 @@
+"""Full-text search over users, requests, templates and audit events.
+
+SQLite keeps one FTS5 table, ``search_index``, maintained by triggers on
+``user``, ``request`` and ``template``; PostgreSQL uses GIN indexes on
+``to_tsvector`` expressions of the same columns, which need no syncing. Both
+are installed by :func:`infra.db.init_db` (``python create_db.py``) and see
+every write, including Core ``UPDATE`` statements and bulk loads.
+
+Audit events are searched in the audit event store (:mod:`infra.event_store`)
+and merged into the results by rank.
+
+Indexed text per document:
+
+- user: ``@username``, first and last name, Telegram ID
+- request: ``REQ-<id>``, category, status, year
+- template: name, description
+- audit: event and JSON payload
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+
+from infra.event_store import event_store
+
+
+SEARCH_KINDS = ("user", "request", "template", "audit")
+MAX_TERMS = 8
+
+# FTS5 rowid = id * 4 + code: one row per document, found without a scan
+_KIND_CODES = {"user": 1, "request": 2, "template": 3}
+_SQLITE_TABLES = {"user": '"user"', "request": "request", "template": "template"}
+# Columns whose updates change the document (user.last_seen changes on every update)
+_SQLITE_WATCHED = {"user": "username, first_name, last_name", "request": "category, status, year", "template": "name, description"}
+
+
+def _sqlite_document(kind: str, prefix: str = "") -> Tuple[str, str]:
+    """(title, body) SQL expressions of a document; ``prefix`` is ``new.`` in triggers."""
+    p = prefix
+    if kind == "user":
+        return (
+            f"trim(coalesce('@' || {p}username, '') || ' ' || coalesce({p}first_name, '') || ' ' || coalesce({p}last_name, ''))",
+            f"CAST({p}tg_id AS TEXT)",
+        )
+    if kind == "request":
+        return f"'REQ-' || {p}id", f"{p}category || ' ' || {p}status || coalesce(' ' || {p}year, '')"
+    return f"{p}name", f"coalesce({p}description, '')"
+
+
+def _sqlite_ddl() -> List[str]:
+    statements = [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+        "kind UNINDEXED, ref_id UNINDEXED, title, body, tokenize = 'unicode61 remove_diacritics 2')"
+    ]
+    for kind, table in _SQLITE_TABLES.items():
+        code = _KIND_CODES[kind]
+        title, body = _sqlite_document(kind, "new.")
+        insert = (
+            f"INSERT INTO search_index (rowid, kind, ref_id, title, body) "
+            f"VALUES (new.id * 4 + {code}, '{kind}', new.id, {title}, {body});"
+        )
+        delete = f"DELETE FROM search_index WHERE rowid = old.id * 4 + {code};"
+        statements += [
+            f"CREATE TRIGGER IF NOT EXISTS search_{kind}_insert AFTER INSERT ON {table} BEGIN {insert} END",
+            f"CREATE TRIGGER IF NOT EXISTS search_{kind}_update AFTER UPDATE OF {_SQLITE_WATCHED[kind]} ON {table} "
+            f"BEGIN {delete} {insert} END",
+            f"CREATE TRIGGER IF NOT EXISTS search_{kind}_delete AFTER DELETE ON {table} BEGIN {delete} END",
+        ]
+    return statements
+
+
+# PostgreSQL: the same expressions are used by the indexes and the queries
+_PG_VECTORS = {
+    "user": "to_tsvector('simple', coalesce(username, '') || ' ' || coalesce(first_name, '') || ' ' "
+            "|| coalesce(last_name, '') || ' ' || tg_id::text)",
+    "request": "to_tsvector('simple', 'REQ ' || id::text || ' ' || category || ' ' || status "
+               "|| ' ' || coalesce(year::text, ''))",
+    "template": "setweight(to_tsvector('simple', name), 'A') "
+                "|| setweight(to_tsvector('simple', coalesce(description, '')), 'B')",
+    "audit": "to_tsvector('simple', event || ' ' || payload)",
+}
+_PG_DOCUMENTS = {
+    "user": ("concat_ws(' ', '@' || username, first_name, last_name)", "tg_id::text"),
+    "request": ("'REQ-' || id", "concat_ws(' ', category, status, year)"),
+    "template": ("name", "coalesce(description, '')"),
+}
+_PG_TABLES = {"user": '"user"', "request": "request", "template": "template", "audit": "audit"}
+
+
+def _postgres_ddl() -> List[str]:
+    return [
+        f"CREATE INDEX IF NOT EXISTS ix_{kind}_search ON {_PG_TABLES[kind]} USING gin (({vector}))"
+        for kind, vector in _PG_VECTORS.items()
+    ]
+
+
+def install_search_index(conn):
+    """
+    Create the search index (idempotent) and fill it if it is new.
+
+    Args:
+        conn: Synchronous SQLAlchemy connection (``AsyncConnection.run_sync``)
+    """
+    if conn.dialect.name == "postgresql":
+        for statement in _postgres_ddl():
+            conn.exec_driver_sql(statement)
+        return
+    exists = conn.exec_driver_sql("SELECT 1 FROM sqlite_master WHERE name = 'search_index'").first()
+    for statement in _sqlite_ddl():
+        conn.exec_driver_sql(statement)
+    if not exists:
+        rebuild_search_index(conn)
+
+
+def rebuild_search_index(conn):
+    """Refill the SQLite search index from the tables (synchronous connection)."""
+    if conn.dialect.name == "postgresql":
+        return  # expression indexes are always up to date
+    conn.exec_driver_sql("DELETE FROM search_index")
+    for kind, table in _SQLITE_TABLES.items():
+        title, body = _sqlite_document(kind)
+        conn.exec_driver_sql(
+            f"INSERT INTO search_index (rowid, kind, ref_id, title, body) "
+            f"SELECT id * 4 + {_KIND_CODES[kind]}, '{kind}', id, {title}, {body} FROM {table}"
+        )
+
+
+def search_terms(query: str) -> List[str]:
+    """Words of a search query; only word characters, so terms are safe in FTS5 and tsquery syntax."""
+    return re.findall(r"\w+", query.lower())[:MAX_TERMS]
+
+
+def fts5_query(terms: Sequence[str]) -> str:
+    """FTS5 MATCH expression: every term, as a prefix."""
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def tsquery(terms: Sequence[str]) -> str:
+    """to_tsquery expression: every term, as a prefix."""
+    return " & ".join(f"{term}:*" for term in terms)
+
+
+async def _search_tables(session, terms: List[str], kinds: Sequence[str], limit: int) -> List[Dict[str, Any]]:
+    kinds = [kind for kind in kinds if kind in _KIND_CODES]
+    if not kinds:
+        return []
+    if session.bind.dialect.name == "postgresql":
+        selects = []
+        for kind in kinds:
+            title, body = _PG_DOCUMENTS[kind]
+            vector = _PG_VECTORS[kind]
+            selects.append(
+                f"SELECT '{kind}' AS kind, id AS ref_id, {title} AS title, {body} AS body, ts_rank({vector}, q) AS rank "
+                f"FROM {_PG_TABLES[kind]}, to_tsquery('simple', :q) AS q WHERE {vector} @@ q"
+            )
+        sql = (
+            f"SELECT kind, ref_id, title, body, rank FROM ({' UNION ALL '.join(selects)}) AS hits "
+            f"ORDER BY rank DESC, ref_id DESC LIMIT :limit"
+        )
+        params: Dict[str, Any] = {"q": tsquery(terms), "limit": limit}
+    else:
+        kind_filter = ""
+        if len(kinds) < len(_KIND_CODES):
+            kind_filter = " AND kind IN (" + ", ".join(f"'{kind}'" for kind in kinds) + ")"
+        sql = (
+            "SELECT kind, ref_id, title, body, -bm25(search_index, 0.0, 0.0, 2.0, 1.0) AS rank "
+            f"FROM search_index WHERE search_index MATCH :q{kind_filter} "
+            "ORDER BY rank DESC, ref_id DESC LIMIT :limit"
+        )
+        params = {"q": fts5_query(terms), "limit": limit}
+    result = await session.execute(text(sql), params)
+    return [
+        {"kind": row.kind, "id": int(row.ref_id), "title": row.title, "snippet": row.body, "rank": float(row.rank)}
+        for row in result
+    ]
+
+
+async def search(
+    session,
+    query: str,
+    kinds: Optional[Sequence[str]] = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    Ranked full-text search.
+
+    Every word must match, as a word prefix (``иван`` finds ``Иванов``).
+
+    Args:
+        session: Database session
+        query: Search text
+        kinds: Document kinds to search (default: all of ``SEARCH_KINDS``)
+        limit: Results per page
+        offset: Results to skip
+
+    Returns:
+        Tuple[List[Dict[str, Any]], bool]: Results (``kind``, ``id``,
+        ``title``, ``snippet``, ``rank``; higher rank is better) and whether
+        there are more
+    """
+    terms = search_terms(query)
+    if not terms:
+        return [], False
+    kinds = kinds or SEARCH_KINDS
+    wanted = offset + limit + 1
+    results = await _search_tables(session, terms, kinds, wanted)
+    if "audit" in kinds:
+        for audit_event, rank in await event_store.search(terms, wanted):
+            results.append({
+                "kind": "audit", "id": audit_event.id, "title": audit_event.event,
+                "snippet": audit_event.payload, "rank": rank,
+            })
+        results.sort(key=lambda result: (result["rank"], result["id"]), reverse=True)
+    return results[offset:offset + limit], len(results) > offset + limit
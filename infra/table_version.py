@@ -0,0 +1,113 @@
+"""Per-table change counters for conditional GETs of the web app.
+
+``table_version`` has one row per watched table, and triggers bump its
+``version`` on every insert, update and delete. Unlike ``max(id)`` and
+``count(*)`` this also changes when a row is updated, e.g. a request being
+approved, and reading it is a primary key lookup. The bump is part of the
+writing transaction, so the new version and the new rows become visible
+together. ``user.last_seen`` is left out: the bot writes it on every update,
+which would change the ``/users`` ETag all the time, so a cached ``/users``
+list may show an older ``last_seen``.
+
+On PostgreSQL the triggers are deferred to commit time and bump each table
+once per transaction, so a writer holds the counter row lock only while it
+commits instead of for its whole transaction. On SQLite, which has a single
+writer anyway, row triggers bump the counter directly.
+
+Installed by :func:`infra.db.init_db` (``python create_db.py``).
+"""
+
+from typing import Dict, List, Sequence
+
+from sqlalchemy import bindparam, text
+
+
+VERSIONED_TABLES = ("user", "admin", "request", "file", "template")
+# Columns whose updates change the version; None = any column
+_WATCHED = {"user": "tg_id, username, first_name, last_name, created_at"}
+
+_CREATE_TABLE = "CREATE TABLE IF NOT EXISTS table_version (name TEXT PRIMARY KEY, version BIGINT NOT NULL DEFAULT 0)"
+_SEED_ROWS = (
+    "INSERT INTO table_version (name, version) VALUES "
+    + ", ".join(f"('{table}', 0)" for table in VERSIONED_TABLES)
+    + " ON CONFLICT (name) DO NOTHING"
+)
+
+
+def _update_of(table: str) -> str:
+    columns = _WATCHED.get(table)
+    return f"UPDATE OF {columns}" if columns else "UPDATE"
+
+
+def _sqlite_ddl() -> List[str]:
+    statements = [_CREATE_TABLE, _SEED_ROWS]
+    for table in VERSIONED_TABLES:
+        for operation, event in (("insert", "INSERT"), ("update", _update_of(table)), ("delete", "DELETE")):
+            statements += [
+                f"DROP TRIGGER IF EXISTS version_{table}_{operation}",
+                f'CREATE TRIGGER version_{table}_{operation} AFTER {event} ON "{table}" '
+                f"BEGIN UPDATE table_version SET version = version + 1 WHERE name = '{table}'; END",
+            ]
+    return statements
+
+
+def _postgres_ddl() -> List[str]:
+    statements = [
+        _CREATE_TABLE,
+        _SEED_ROWS,
+        # The transaction-local setting makes the bump run once per table and transaction
+        """CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$
+BEGIN
+    IF coalesce(current_setting('table_version.' || TG_TABLE_NAME, true), '') <> '1' THEN
+        PERFORM set_config('table_version.' || TG_TABLE_NAME, '1', true);
+        UPDATE table_version SET version = version + 1 WHERE name = TG_TABLE_NAME;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql""",
+    ]
+    for table in VERSIONED_TABLES:
+        statements += [
+            f'DROP TRIGGER IF EXISTS table_version_bump ON "{table}"',
+            f'DROP TRIGGER IF EXISTS table_version_truncate ON "{table}"',
+            f"CREATE CONSTRAINT TRIGGER table_version_bump AFTER INSERT OR {_update_of(table)} OR DELETE "
+            f'ON "{table}" DEFERRABLE INITIALLY DEFERRED FOR EACH ROW EXECUTE FUNCTION bump_table_version()',
+            f'CREATE TRIGGER table_version_truncate AFTER TRUNCATE ON "{table}" '
+            "FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version()",
+            # Sequences of an earlier install; not transactional, so they could run ahead of the rows
+            f"DROP SEQUENCE IF EXISTS table_version_{table}",
+        ]
+    return statements
+
+
+def install_table_versions(conn):
+    """
+    Create the counters and their triggers (idempotent).
+
+    Args:
+        conn: Synchronous SQLAlchemy connection (``AsyncConnection.run_sync``)
+    """
+    statements = _postgres_ddl() if conn.dialect.name == "postgresql" else _sqlite_ddl()
+    for statement in statements:
+        conn.exec_driver_sql(statement)
+
+
+async def table_versions(session, tables: Sequence[str]) -> Dict[str, int]:
+    """
+    Current change counters of ``tables``.
+
+    Read them before the rows they describe: a write committed in between
+    then only makes the version older than the data, never newer.
+
+    Args:
+        session: Database session
+        tables: Table names from ``VERSIONED_TABLES``
+
+    Returns:
+        Dict[str, int]: Version per table
+    """
+    statement = text("SELECT name, version FROM table_version WHERE name IN :names").bindparams(
+        bindparam("names", expanding=True)
+    )
+    result = await session.execute(statement, {"names": list(tables)})
+    return {name: version for name, version in result}
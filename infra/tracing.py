@@ -0,0 +1,404 @@
+"""Lightweight per-update span tracing."""
+
+import atexit
+import contextvars
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import urllib.request
+from typing import Any, Dict, List, Optional, Sequence
+
+from infra.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Innermost open span of the current update, None outside a recorded trace
+current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+EXPORT_BATCH_SIZE = 64
+
+
+def _new_id(bits: int) -> str:
+    return format(random.getrandbits(bits), f"0{bits // 4}x")
+
+
+class Span:
+    """
+    One timed operation inside a trace.
+
+    Used as a context manager the span becomes the parent of spans opened
+    inside it (via :func:`span`). Spans whose start and end happen in
+    different callbacks (SQL hooks, streamed downloads) are created with
+    :func:`start_span` and closed with :meth:`finish`.
+    """
+
+    __slots__ = ("trace", "name", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "error", "_token")
+
+    def __init__(self, trace: "Trace", name: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.trace = trace
+        self.name = name
+        self.span_id = _new_id(64)
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = attributes
+        self.error: Optional[str] = None
+        self._token = None
+        trace.spans.append(self)
+
+    @property
+    def duration(self) -> float:
+        """Span duration in seconds (0 while the span is open)."""
+        return max(self.end_ns - self.start_ns, 0) / 1e9
+
+    def set_attribute(self, key: str, value: Any):
+        """Attach a key/value to the span."""
+        self.attributes[key] = value
+
+    def finish(self, error: Optional[BaseException] = None):
+        """Close the span, recording the exception type if it failed."""
+        self.end_ns = time.time_ns()
+        if error is not None:
+            self.error = type(error).__name__
+        if self.parent_id is None:
+            self.trace.tracer.end_trace(self.trace)
+
+    def __enter__(self) -> "Span":
+        self._token = current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        current_span.reset(self._token)
+        self.finish(exc)
+        return False
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Span fields for the exporters."""
+        entry = {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "duration_ms": round(self.duration * 1000, 3),
+            "attributes": self.attributes,
+        }
+        if self.error:
+            entry["error"] = self.error
+        return entry
+
+
+class _NoopSpan:
+    """Stand-in returned when the current update isn't being traced."""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def finish(self, error: Optional[BaseException] = None):
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    """All spans recorded for one update."""
+
+    __slots__ = ("tracer", "trace_id", "spans", "sampled")
+
+    def __init__(self, tracer: "Tracer", sampled: bool):
+        self.tracer = tracer
+        self.trace_id = _new_id(128)
+        self.spans: List[Span] = []
+        self.sampled = sampled
+
+    @property
+    def root(self) -> Span:
+        """The span that started the trace."""
+        return self.spans[0]
+
+    def as_dict(self) -> Dict[str, Any]:
+        """One NDJSON line: the trace and its spans."""
+        return {
+            "trace_id": self.trace_id,
+            "name": self.root.name,
+            "duration_ms": round(self.root.duration * 1000, 3),
+            "spans": [span.as_dict() for span in self.spans],
+        }
+
+
+def format_trace(trace: Trace) -> str:
+    """
+    Render a trace as an indented tree with offsets from the trace start.
+
+    Args:
+        trace: Finished trace
+
+    Returns:
+        str: One line per span, children indented under their parent
+    """
+    children: Dict[Optional[str], List[Span]] = {}
+    for item in trace.spans:
+        children.setdefault(item.parent_id, []).append(item)
+    started = trace.root.start_ns
+    lines = []
+
+    def render(item: Span, depth: int):
+        attrs = " ".join(f"{key}={value}" for key, value in item.attributes.items())
+        error = f" error={item.error}" if item.error else ""
+        duration = f"{item.duration * 1000:.1f}ms" if item.end_ns else "unfinished"
+        lines.append(
+            f"{(item.start_ns - started) / 1e6:9.1f}ms {'  ' * depth}{item.name} {duration}"
+            f"{' ' + attrs if attrs else ''}{error}"
+        )
+        for child in sorted(children.get(item.span_id, ()), key=lambda s: s.start_ns):
+            render(child, depth + 1)
+
+    render(trace.root, 0)
+    return "\n".join(lines)
+
+
+class BatchExporter:
+    """
+    Base exporter: traces are queued and written in batches by a thread.
+
+    Subclasses implement :meth:`export`; it runs off the event loop.
+    """
+
+    def __init__(self):
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name=type(self).__name__, daemon=True)
+        self._thread.start()
+
+    def submit(self, trace: Trace):
+        """Queue a finished trace for export."""
+        self._queue.put(trace)
+
+    def export(self, traces: List[Trace]):
+        raise NotImplementedError
+
+    def shutdown(self):
+        """Export what is queued and stop the thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            while len(batch) < EXPORT_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if None in batch:
+                stopping = True
+                batch = [trace for trace in batch if trace is not None]
+            if not batch:
+                continue
+            try:
+                self.export(batch)
+            except Exception as e:
+                logger.warning(f"{type(self).__name__} failed to export {len(batch)} traces: {e}")
+
+
+class FileExporter(BatchExporter):
+    """Appends one JSON object per trace to a local file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        super().__init__()
+
+    def export(self, traces: List[Trace]):
+        with open(self.path, "a", encoding="utf-8") as f:
+            for trace in traces:
+                f.write(json.dumps(trace.as_dict(), ensure_ascii=False, default=str) + "\n")
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+class OTLPExporter(BatchExporter):
+    """Posts traces to an OpenTelemetry collector (OTLP/HTTP with JSON encoding)."""
+
+    def __init__(self, endpoint: str, service_name: str, timeout: float = 5.0):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.timeout = timeout
+        super().__init__()
+
+    def payload(self, traces: List[Trace]) -> Dict[str, Any]:
+        """Build an ``ExportTraceServiceRequest`` body for the traces."""
+        spans = []
+        for trace in traces:
+            for item in trace.spans:
+                otlp_span = {
+                    "traceId": trace.trace_id,
+                    "spanId": item.span_id,
+                    "name": item.name,
+                    "kind": 2 if item.parent_id is None else 1,  # SERVER for the update, else INTERNAL
+                    "startTimeUnixNano": str(item.start_ns),
+                    "endTimeUnixNano": str(item.end_ns or item.start_ns),
+                    "attributes": _otlp_attributes(item.attributes),
+                    "status": {"code": 2, "message": item.error} if item.error else {"code": 1},
+                }
+                if item.parent_id:
+                    otlp_span["parentSpanId"] = item.parent_id
+                spans.append(otlp_span)
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({"service.name": self.service_name})},
+                "scopeSpans": [{"scope": {"name": "ndstrbot"}, "spans": spans}],
+            }]
+        }
+
+    def export(self, traces: List[Trace]):
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(self.payload(traces), default=str).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class Tracer:
+    """
+    Decides which updates are traced and hands finished traces to exporters.
+
+    A trace is started for ``sample_rate`` of the updates. When a
+    ``slow_threshold`` is set every update is recorded, and those slower
+    than the threshold are exported and dumped to the log as a span tree
+    even if they weren't sampled. With both at 0 tracing is off and spans
+    cost a context variable lookup.
+    """
+
+    def __init__(self, sample_rate: float = 0.0, slow_threshold: float = 0.0, exporters: Sequence[BatchExporter] = ()):
+        self.configure(sample_rate, slow_threshold, exporters)
+
+    def configure(self, sample_rate: float, slow_threshold: float, exporters: Sequence[BatchExporter]):
+        """Replace the sampling settings and exporters."""
+        self.sample_rate = sample_rate
+        self.slow_threshold = slow_threshold
+        self.exporters = list(exporters)
+
+    @property
+    def enabled(self) -> bool:
+        """Whether any update can end up recorded."""
+        return self.sample_rate > 0 or self.slow_threshold > 0
+
+    def start_trace(self, name: str, **attributes: Any):
+        """
+        Start the root span of a new trace, or return a no-op span.
+
+        Args:
+            name: Root span name
+            **attributes: Root span attributes (update_id, chat_id, ...)
+
+        Returns:
+            Span or a no-op stand-in, to be used as a context manager
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+        sampled = self.sample_rate >= 1 or random.random() < self.sample_rate
+        if not sampled and self.slow_threshold <= 0:
+            return NOOP_SPAN
+        return Span(Trace(self, sampled), name, None, attributes)
+
+    def end_trace(self, trace: Trace):
+        """Export a finished trace if it was sampled or is slow."""
+        slow = 0 < self.slow_threshold <= trace.root.duration
+        if slow:
+            logger.warning(
+                "Slow trace %s (%.0fms):\n%s", trace.trace_id, trace.root.duration * 1000, format_trace(trace)
+            )
+        if trace.sampled or slow:
+            for exporter in self.exporters:
+                exporter.submit(trace)
+
+
+def span(name: str, **attributes: Any):
+    """
+    Open a child span of the current span.
+
+    Args:
+        name: Span name, e.g. "handler light.template_next"
+        **attributes: Span attributes
+
+    Returns:
+        Span, or a no-op stand-in when the update isn't traced
+    """
+    parent = current_span.get()
+    if parent is None:
+        return NOOP_SPAN
+    return Span(parent.trace, name, parent.span_id, attributes)
+
+
+def start_span(name: str, **attributes: Any) -> Optional[Span]:
+    """
+    Start a child span without making it current; close it with ``finish()``.
+
+    Returns:
+        Optional[Span]: The span, or None when the update isn't traced
+    """
+    parent = current_span.get()
+    if parent is None:
+        return None
+    return Span(parent.trace, name, parent.span_id, attributes)
+
+
+def setup_tracing(service_name: str):
+    """
+    Configure the global tracer from settings.
+
+    Args:
+        service_name: Reported to the OTLP collector, e.g. "ndstrbot-bot"
+    """
+    stop_tracing()
+    exporters: List[BatchExporter] = []
+    if settings.trace_sample_rate > 0 or settings.trace_slow_ms > 0:
+        if settings.trace_file:
+            path = settings.trace_file
+            if not os.path.isabs(path):
+                path = os.path.join(settings.base_dir, path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            exporters.append(FileExporter(path))
+        if settings.trace_otlp_endpoint:
+            exporters.append(OTLPExporter(settings.trace_otlp_endpoint, service_name))
+        atexit.register(stop_tracing)
+    tracer.configure(settings.trace_sample_rate, settings.trace_slow_ms / 1000, exporters)
+
+
+def stop_tracing():
+    """Flush queued traces and stop the exporter threads."""
+    exporters, tracer.exporters = tracer.exporters, []
+    for exporter in exporters:
+        exporter.shutdown()
+
+
+# Global tracer instance; disabled until setup_tracing() is called
+tracer = Tracer()
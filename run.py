@@ -16,17 +16,20 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Yandex GO Car Registration Bot")
     parser.add_argument(
         "mode", 
-        choices=["bot", "web", "both"], 
+        choices=["bot", "web", "both", "audit"], 
         default="bot", 
         nargs="?",
-        help="Run mode: bot (default), web, or both"
+        help="Run mode: bot (default), web, both, or audit (archive old audit rows)"
     )
+    parser.add_argument("--once", action="store_true", help="audit: archive once and exit")
     
     args = parser.parse_args()
     
     if args.mode == "bot":
         print("Starting bot...")
         from app.bot import main as run_bot
+        from app.services.telegram_session import install_uvloop
+        install_uvloop()
         asyncio.run(run_bot())
     elif args.mode == "web":
         print("Starting web app...")
@@ -34,15 +37,10 @@ if __name__ == "__main__":
         run_webapp()
     elif args.mode == "both":
         print("Starting both bot and web app...")
-        # Note: This is a simplified approach. In production, you might want to use separate processes
-        from app.bot import main as run_bot
-        from app.webapp.run import main as run_webapp
-        import threading
-        
-        # Start the web app in a separate thread
-        web_thread = threading.Thread(target=run_webapp)
-        web_thread.daemon = True
-        web_thread.start()
-        
-        # Start the bot in the main thread
-        asyncio.run(run_bot())
\ No newline at end of file
+        # Bot and web app run as separate supervised processes
+        from app.supervisor import main as run_supervisor
+        from infra.config import settings
+        sys.exit(run_supervisor(extra=["audit"] if settings.audit_retention_days > 0 else []))
+    elif args.mode == "audit":
+        from infra.audit_archive import main as run_audit_archive
+        asyncio.run(run_audit_archive(once=args.once))
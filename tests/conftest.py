@@ -2,6 +2,51 @@
 
 import sys
 import os
+from contextlib import asynccontextmanager
+from datetime import datetime
+from unittest.mock import patch
+
+import httpx
+import pytest_asyncio
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlmodel import SQLModel
 
 # Add project root to path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
\ No newline at end of file
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+@pytest_asyncio.fixture
+async def webapp_client(tmp_path):
+    """Web app client on a SQLite database with two requests."""
+    from app.webapp.main import app
+    from domain.models import File, Request, Template, User
+    from infra.db import instrument_engine
+    from infra.table_version import install_table_versions
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'bot.db'}")
+    instrument_engine(engine)
+    created = datetime(2025, 6, 1)
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+        await conn.run_sync(install_table_versions)
+        await conn.execute(insert(User.__table__).values(id=1, tg_id=555, username="petrov_k", created_at=created, last_seen=created))
+        await conn.execute(insert(Template.__table__).values(id=3, name="Бренд", file_id="t", path="storage/uploads/template_3.jpg", created_at=created))
+        await conn.execute(insert(Request.__table__), [
+            {"id": 1, "user_id": 1, "category": "легковой", "status": "submitted", "selected_template_id": 3, "created_at": created},
+            {"id": 2, "user_id": 1, "category": "грузовой", "status": "approved", "selected_template_id": None, "created_at": created},
+        ])
+        await conn.execute(insert(File.__table__), [
+            {"request_id": 1, "kind": "auto_photo", "file_id": f"f{i}", "path": f"storage/uploads/auto_{i}.jpg", "created_at": created}
+            for i in range(3)
+        ])
+
+    @asynccontextmanager
+    async def get_session():
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            yield session
+
+    with patch("app.webapp.main.get_session", get_session):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+            yield http
+    await engine.dispose()
@@ -0,0 +1,118 @@
+"""Tests for compressed and conditional list responses."""
+
+import gzip
+import zlib
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import text
+
+from app.webapp import main
+from app.webapp.compression import CompressionMiddleware
+from infra.db import query_budget
+
+
+async def _call(app, accept_encoding="gzip"):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": [(b"accept-encoding", accept_encoding.encode())]}
+    await app(scope, receive, send)
+    headers = dict(messages[0]["headers"])
+    return headers, [message.get("body", b"") for message in messages[1:]]
+
+
+def _app(content_type, *chunks):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", content_type)]})
+        for index, chunk in enumerate(chunks):
+            await send({"type": "http.response.body", "body": chunk, "more_body": index < len(chunks) - 1})
+    return app
+
+
+@pytest.mark.asyncio
+async def test_compression_by_type_size_and_stream():
+    """Test large JSON is gzipped, small bodies, images and SSE aren't, and streamed chunks decode as they arrive."""
+    body = b'[{"id": 1, "status": "approved"}]' * 200
+    headers, chunks = await _call(CompressionMiddleware(_app(b"application/json", body), minimum_size=1024))
+    assert (headers[b"content-encoding"], headers[b"vary"]) == (b"gzip", b"Accept-Encoding")
+    assert gzip.decompress(chunks[0]) == body and int(headers[b"content-length"]) == len(chunks[0])
+
+    for content_type, payload in [(b"application/json", b"[]"), (b"image/jpeg", body), (b"text/event-stream", body)]:
+        headers, chunks = await _call(CompressionMiddleware(_app(content_type, payload), minimum_size=1024))
+        assert b"content-encoding" not in headers and chunks == [payload]
+    headers, chunks = await _call(CompressionMiddleware(_app(b"application/json", body), minimum_size=1024), "identity")
+    assert b"content-encoding" not in headers
+
+    headers, chunks = await _call(CompressionMiddleware(_app(b"text/html", b"<tr>" * 10, b"</table>"), minimum_size=1))
+    decoder = zlib.decompressobj(31)
+    assert decoder.decompress(chunks[0]) == b"<tr>" * 10
+    assert decoder.decompress(chunks[1]) == b"</table>" and b"content-length" not in headers
+
+
+@pytest.mark.asyncio
+async def test_unchanged_list_is_304_until_a_row_changes(webapp_client):
+    """Test a repeated refresh costs only the version lookup, and a status update changes the ETag."""
+    first = await webapp_client.get("/requests/json")
+    etag = first.headers["etag"]
+    assert etag.startswith('W/"') and first.headers["cache-control"] == "private, no-cache"
+
+    with query_budget(1):
+        repeat = await webapp_client.get("/requests/json", headers={"If-None-Match": etag})
+    assert (repeat.status_code, repeat.content, repeat.headers["etag"]) == (304, b"", etag)
+
+    async with main.get_session() as session:
+        await session.execute(text("UPDATE request SET status = 'approved' WHERE id = 1"))
+        await session.commit()
+    changed = await webapp_client.get("/requests/json", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+    assert changed.json()[0]["status"] == "approved"
+    assert (await webapp_client.get("/users", headers={"If-None-Match": etag})).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_last_seen_updates_keep_the_users_etag(webapp_client):
+    """Test the bot's last_seen writes don't change the /users ETag, a name change does."""
+    etag = (await webapp_client.get("/users")).headers["etag"]
+
+    async with main.get_session() as session:
+        await session.execute(text("UPDATE \"user\" SET last_seen = '2030-01-01 00:00:00' WHERE id = 1"))
+        await session.commit()
+    assert (await webapp_client.get("/users", headers={"If-None-Match": etag})).status_code == 304
+
+    async with main.get_session() as session:
+        await session.execute(text("UPDATE \"user\" SET first_name = 'Renamed' WHERE id = 1"))
+        await session.commit()
+    assert (await webapp_client.get("/users", headers={"If-None-Match": etag})).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_concurrent_writer_never_leaves_a_stale_etag(webapp_client):
+    """Test a write pending during a list read, or committed between its version and row reads, changes the ETag once committed."""
+    async with main.get_session() as writer:
+        await writer.execute(text("UPDATE request SET status = 'rejected' WHERE id = 1"))
+        pending = await webapp_client.get("/requests/json")
+        assert pending.json()[0]["status"] == "submitted"
+        await writer.commit()
+    committed = await webapp_client.get("/requests/json", headers={"If-None-Match": pending.headers["etag"]})
+    assert committed.status_code == 200 and committed.json()[0]["status"] == "rejected"
+
+    read_versions = main.table_versions
+
+    async def versions_then_write(session, tables):
+        versions = await read_versions(session, tables)
+        async with main.get_session() as writer:
+            await writer.execute(text("UPDATE request SET status = 'approved' WHERE id = 1"))
+            await writer.commit()
+        return versions
+
+    with patch("app.webapp.main.table_versions", versions_then_write):
+        racing = await webapp_client.get("/requests/json")
+    assert racing.json()[0]["status"] == "approved"
+    after = await webapp_client.get("/requests/json", headers={"If-None-Match": racing.headers["etag"]})
+    assert after.status_code == 200 and after.headers["etag"] != racing.headers["etag"]
@@ -0,0 +1,70 @@
+"""Tests for the audit event store."""
+
+import asyncio
+import json
+import sqlite3
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+from infra.event_store import SQLiteEventStore
+
+
+@pytest.mark.asyncio
+async def test_appended_events_are_written_in_batches(tmp_path):
+    """Test append doesn't write, the writer task batches events and queries filter by event and time."""
+    store = SQLiteEventStore(str(tmp_path / "audit.db"), batch_size=3, flush_interval=0.05)
+    try:
+        with patch.object(store, "write_batch", wraps=store.write_batch) as write_batch:
+            for day in range(1, 6):
+                store.append("request_submitted", {"request_id": day, "category": "легковой"}, datetime(2025, 6, day))
+            store.append("admin_login", {"admin_tg_id": 1}, datetime(2025, 6, 3, 12))
+            assert write_batch.call_count == 0
+            await asyncio.sleep(0.2)
+        assert [len(call.args[0]) for call in write_batch.call_args_list] == [3, 3]
+
+        assert await store.count() == 6
+        events = await store.query("request_submitted", since=datetime(2025, 6, 2), until=datetime(2025, 6, 4))
+        assert [json.loads(event.payload)["request_id"] for event in events] == [2, 3]
+        assert events[0].created_at == datetime(2025, 6, 2)
+        assert [event.event for event in await store.query(limit=2)] == ["request_submitted"] * 2
+    finally:
+        await store.close()
+
+    with sqlite3.connect(tmp_path / "audit.db") as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        indexes = {row[1] for row in conn.execute("PRAGMA index_list(audit)")}
+    assert "ix_audit_event_created_at" in indexes
+
+
+@pytest.mark.asyncio
+async def test_failed_write_keeps_events_for_retry(tmp_path):
+    """Test events survive a failed batch write and are written by the next flush."""
+    store = SQLiteEventStore(str(tmp_path / "audit.db"))
+    store.append("request_approved", {"request_id": 7})
+    with patch.object(store, "write_batch", side_effect=sqlite3.OperationalError("database is locked")):
+        with pytest.raises(sqlite3.OperationalError):
+            await store.flush()
+    await store.close()
+
+    reopened = SQLiteEventStore(str(tmp_path / "audit.db"))
+    try:
+        events = await reopened.query()
+        assert [(event.event, json.loads(event.payload)) for event in events] == [("request_approved", {"request_id": 7})]
+    finally:
+        await reopened.close()
+
+
+@pytest.mark.asyncio
+async def test_full_buffer_drops_and_counts_events(tmp_path):
+    """Test the buffer stops growing while writes fail, and recovers once they succeed."""
+    store = SQLiteEventStore(str(tmp_path / "audit.db"), max_buffer=2)
+    try:
+        for request_id in range(5):
+            store.append("request_approved", {"request_id": request_id})
+        assert store.dropped == 3
+        await store.flush()
+        assert (store.dropped, await store.count()) == (0, 2)
+    finally:
+        await store.close()
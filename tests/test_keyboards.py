@@ -0,0 +1,88 @@
+"""Tests for the keyboard registry."""
+
+import json
+
+import pytest
+from aiogram import Bot
+from aiogram.methods import SendMessage
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+
+from app.keyboards.inline import get_cancel_menu, get_main_menu, get_template_navigation
+from app.keyboards.registry import KeyboardRegistry, registry
+from app.services.telegram_session import BotSession
+
+
+def test_static_keyboards_are_shared():
+    """Test static keyboards are built once."""
+    assert get_main_menu() is get_main_menu()
+    assert registry.serialized(get_cancel_menu()) is not None
+
+
+def test_serialized_matches_model_dump():
+    """Test pre-serialized JSON matches the markup content."""
+    markup = get_main_menu()
+    assert json.loads(registry.serialized(markup)) == markup.model_dump(exclude_none=True)
+
+
+def test_template_navigation_memoized():
+    """Test navigation keyboards are memoized by (index, total)."""
+    first = get_template_navigation(1, 3)
+    assert get_template_navigation(1, 3) is first
+    assert get_template_navigation(2, 3) is not first
+    assert registry.serialized(first) is not None
+
+
+def test_unregistered_markup_not_served():
+    """Test equal but unregistered markups are serialized normally."""
+    markup = InlineKeyboardMarkup(
+        inline_keyboard=[[InlineKeyboardButton(text="Отмена", callback_data="cancel")]]
+    )
+    assert registry.serialized(markup) is None
+
+
+def test_memoize_eviction():
+    """Test evicted keyboards are dropped from the registry."""
+    local = KeyboardRegistry()
+
+    @local.memoize(maxsize=1)
+    def build(value: int) -> InlineKeyboardMarkup:
+        return InlineKeyboardMarkup(
+            inline_keyboard=[[InlineKeyboardButton(text=str(value), callback_data="x")]]
+        )
+
+    first = build(1)
+    build(2)
+    assert local.serialized(first) is None
+    assert len(local) == 1
+
+
+def test_bot_session_uses_prepared_markup():
+    """Test the session sends the cached reply_markup string."""
+    session = BotSession()
+    method = SendMessage(chat_id=1, text="hi", reply_markup=get_main_menu())
+    form = session.build_form_data(Bot(token="42:TEST", session=session), method)
+    fields = {options["name"]: value for options, _, value in form._fields}
+    assert fields["reply_markup"] == registry.serialized(get_main_menu())
+    assert fields["text"] == "hi"
+
+
+@pytest.mark.asyncio
+async def test_create_bot_session_applies_settings(monkeypatch):
+    """Test the configured session uses settings and the JSON helpers."""
+    from app.services import telegram_session
+    from infra.config import settings
+
+    monkeypatch.setattr(settings, "telegram_api_base", "http://127.0.0.1:8081")
+    monkeypatch.setattr(settings, "telegram_connection_limit", 7)
+    session = telegram_session.create_bot_session()
+
+    assert session.api.api_url("42:TEST", "getMe") == "http://127.0.0.1:8081/bot42:TEST/getMe"
+    assert session.json_loads(session.json_dumps({"text": "Привет"})) == {"text": "Привет"}
+    assert session.dns_cache_ttl == settings.telegram_dns_cache_ttl
+    assert session.keepalive_timeout == settings.telegram_keepalive_timeout
+
+    client = await session.create_session()
+    assert client.connector.limit == 7
+    assert await session.create_session() is client
+    await session.close()
+    assert client.closed
@@ -0,0 +1,75 @@
+"""Tests for the logging pipeline."""
+
+import json
+import logging
+import queue
+import sys
+
+from infra.logging import (
+    TEXT_FORMAT,
+    ContextFilter,
+    DeferredQueueHandler,
+    JsonFormatter,
+    SamplingFilter,
+    TextFormatter,
+    update_id_var,
+)
+
+
+def make_record(level: int = logging.INFO, lineno: int = 10) -> logging.LogRecord:
+    """Record as created by a logger call at the given line."""
+    return logging.LogRecord("app.test", level, "handlers.py", lineno, "Photo %s", (1,), None)
+
+
+def test_sampling_filter_limits_info_per_call_site():
+    """Test INFO records beyond the burst are dropped and counted, warnings pass."""
+    sampler = SamplingFilter(rate=0.0001, burst=2)
+
+    assert [sampler.filter(make_record()) for _ in range(5)] == [True, True, False, False, False]
+    assert sampler.filter(make_record(lineno=11))
+    assert sampler.filter(make_record(logging.WARNING))
+
+    sampler._buckets[("handlers.py", 10)][0] = 1.0
+    record = make_record()
+    assert sampler.filter(record)
+    assert record.sampled_out == 3
+
+
+def test_json_formatter_includes_update_context():
+    """Test the update_id set for the current update ends up in the JSON line."""
+    token = update_id_var.set(4242)
+    try:
+        record = make_record()
+        ContextFilter().filter(record)
+    finally:
+        update_id_var.reset(token)
+
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["message"] == "Photo 1"
+    assert entry["update_id"] == 4242
+    assert "chat_id" not in entry
+
+
+def test_queue_handler_defers_formatting_to_the_listener():
+    """Test immutable arguments and tracebacks are rendered by the listener's formatter, mutable arguments right away."""
+    handler = DeferredQueueHandler(queue.SimpleQueue())
+
+    prepared = handler.prepare(make_record())
+    assert (prepared.msg, prepared.args) == ("Photo %s", (1,))
+    assert JsonFormatter().format(prepared).count("Photo 1") == 1
+
+    files = ["a.jpg"]
+    record = logging.LogRecord("app.test", logging.INFO, "handlers.py", 10, "Files %s", (files,), None)
+    prepared = handler.prepare(record)
+    files.append("b.jpg")
+    assert (prepared.msg, prepared.args) == ("Files ['a.jpg']", None)
+
+    try:
+        raise ValueError("bad year")
+    except ValueError:
+        record = logging.LogRecord("app.test", logging.ERROR, "handlers.py", 10, "Failed", (), sys.exc_info())
+    prepared = handler.prepare(record)
+    assert prepared.exc_info is None
+    text = TextFormatter(TEXT_FORMAT).format(prepared)
+    assert "Traceback" in text and 'raise ValueError("bad year")' in text
+    assert json.loads(JsonFormatter().format(handler.prepare(record)))["exc"].endswith("ValueError: bad year")
@@ -0,0 +1,76 @@
+"""Tests for the metrics module."""
+
+import json
+import os
+from unittest.mock import AsyncMock, Mock, patch
+
+import httpx
+import pytest
+from aiogram.methods import SendMessage
+
+from app.services.telegram_session import RequestMetricsMiddleware
+from app.webapp.main import app
+from infra.metrics import TELEGRAM_API_ERRORS, TELEGRAM_API_SECONDS, MetricsRegistry
+
+
+def test_histogram_renders_cumulative_buckets():
+    """Test observations land in cumulative buckets with sum and count."""
+    registry = MetricsRegistry()
+    histogram = registry.histogram("test_seconds", "Test latency", ("handler",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, "a")
+    histogram.observe(0.5, "a")
+    histogram.observe(5.0, "a")
+
+    text = registry.render()
+    assert 'test_seconds_bucket{handler="a",le="0.1"} 1' in text
+    assert 'test_seconds_bucket{handler="a",le="1"} 2' in text
+    assert 'test_seconds_bucket{handler="a",le="+Inf"} 3' in text
+    assert 'test_seconds_count{handler="a"} 3' in text
+    assert "# TYPE test_seconds histogram" in text
+
+
+def test_worker_snapshots_are_summed(tmp_path):
+    """Test a scrape sums the counters and histograms of every worker's snapshot, exited ones included."""
+    registry = MetricsRegistry()
+    requests = registry.counter("test_requests_total", "Test requests", ("route",))
+    seconds = registry.histogram("test_seconds", "Test latency", buckets=(0.1, 1.0))
+    requests.inc("/a", amount=2)
+    seconds.observe(0.05)
+    (tmp_path / "1.json").write_text(json.dumps({
+        "test_requests_total": [[["/a"], 3], [["/b"], 1]],
+        "test_seconds": [[[], [0, 1, 0], 0.5]],
+    }))
+
+    text = registry.render_directory(str(tmp_path))
+    assert 'test_requests_total{route="/a"} 5' in text
+    assert 'test_requests_total{route="/b"} 1' in text
+    assert 'test_seconds_bucket{le="1"} 2' in text and "test_seconds_sum 0.55" in text
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(["1.json", f"{os.getpid()}.json"])
+
+
+@pytest.mark.asyncio
+async def test_bot_api_calls_are_recorded_by_method():
+    """Test the session middleware times calls and counts failures per API method."""
+    middleware = RequestMetricsMiddleware()
+    method = SendMessage(chat_id=1, text="hi")
+    before = TELEGRAM_API_SECONDS.count("sendMessage")
+
+    await middleware(AsyncMock(return_value=True), Mock(), method)
+    with pytest.raises(RuntimeError):
+        await middleware(AsyncMock(side_effect=RuntimeError("boom")), Mock(), method)
+
+    assert TELEGRAM_API_SECONDS.count("sendMessage") == before + 2
+    assert TELEGRAM_API_ERRORS.value("sendMessage", "RuntimeError") >= 1
+
+
+@pytest.mark.asyncio
+async def test_web_metrics_are_not_public(webapp_client):
+    """Test /metrics is served to loopback clients, and to others only with the token."""
+    assert (await webapp_client.get("/metrics")).status_code == 200
+    remote = httpx.ASGITransport(app=app, client=("203.0.113.7", 4000))
+    async with httpx.AsyncClient(transport=remote, base_url="http://test") as client:
+        assert (await client.get("/metrics")).status_code == 403
+        with patch("app.webapp.main.settings.web_metrics_token", "s3cret"):
+            assert (await client.get("/metrics")).status_code == 401
+            response = await client.get("/metrics", headers={"Authorization": "Bearer s3cret"})
+            assert response.status_code == 200 and "web_requests" in response.text
@@ -0,0 +1,71 @@
+"""Tests for UserMiddleware."""
+
+from datetime import datetime
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from aiogram.types import Chat, Message
+from aiogram.types import User as TgUser
+
+from app.utils.middleware import UserMiddleware
+from infra.event_store import audit
+
+
+def make_message() -> Message:
+    """Build a minimal private message."""
+    return Message(
+        message_id=1,
+        date=datetime.utcnow(),
+        chat=Chat(id=10, type="private"),
+        from_user=TgUser(id=10, is_bot=False, first_name="Test"),
+        text="2015",
+    )
+
+
+@pytest.mark.asyncio
+async def test_db_free_handler_skips_session():
+    """Test handlers without session/user never open a DB session."""
+    handler_obj = Mock(params={"message", "state"}, varkw=False)
+    handler = AsyncMock(return_value="ok")
+
+    with patch("app.utils.middleware.load_user", new=AsyncMock()) as load_user:
+        result = await UserMiddleware()(handler, make_message(), {"handler": handler_obj})
+
+    assert result == "ok"
+    load_user.assert_not_called()
+    session = handler.call_args.args[1]["session"]
+    assert session.opened is False
+
+
+@pytest.mark.asyncio
+async def test_user_loaded_when_requested():
+    """Test the user is resolved for handlers that declare it."""
+    handler_obj = Mock(params={"message", "user"}, varkw=False)
+    handler = AsyncMock()
+    db_user = Mock(id=5)
+
+    with patch("app.utils.middleware.load_user", new=AsyncMock(return_value=db_user)):
+        await UserMiddleware()(handler, make_message(), {"handler": handler_obj})
+
+    assert handler.call_args.args[1]["user"] is db_user
+
+
+@pytest.mark.asyncio
+async def test_audit_events_wait_for_the_commit():
+    """Test a handler's audit events reach the store after its commit, and are dropped if it fails."""
+    handler_obj = Mock(params={"message", "session"}, varkw=False)
+
+    async def submit(event, data):
+        audit("request_submitted", request_id=1)
+        assert store.append.call_count == 0
+
+    async def fail(event, data):
+        audit("request_submitted", request_id=2)
+        raise RuntimeError("commit failed")
+
+    with patch("infra.event_store.event_store") as store:
+        await UserMiddleware()(submit, make_message(), {"handler": handler_obj})
+        assert store.append.call_args.args[:2] == ("request_submitted", {"request_id": 1})
+        with pytest.raises(RuntimeError):
+            await UserMiddleware()(fail, make_message(), {"handler": handler_obj})
+    assert store.append.call_count == 1
@@ -0,0 +1,94 @@
+"""Tests for bulk moderation and batched user notifications."""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from aiogram.exceptions import TelegramForbiddenError, TelegramRetryAfter
+from aiogram.methods import SendMessage
+
+from app.handlers.admin import add_admin_handler, del_admin_handler, parse_moderation_args
+from app.services.admin_registry import AdminRegistry
+from app.services.notifier import BatchNotifier
+from infra.db import query_budget
+
+
+@pytest.mark.asyncio
+async def test_bulk_status_updates_submitted_requests_once(webapp_client):
+    """Test one UPDATE moderates only submitted requests, reports the rest and queues owner notifications."""
+    notifier = MagicMock()
+    webapp_client.cookies.set("tg_user_id", "777")
+    with patch("app.webapp.main.settings.admin_ids", [777]), \
+            patch("app.webapp.main.batch_notifier", notifier), \
+            patch("app.webapp.main.get_shared_bot", return_value="bot"):
+        with query_budget(1):
+            response = await webapp_client.post("/requests/bulk-status", json={"status": "approved", "ids": [2, 1, 99]})
+        assert response.json() == {"status": "approved", "updated": [1], "skipped": [2, 99]}
+        notifier.enqueue.assert_called_once_with("bot", [(555, "✅ Ваша заявка #1 одобрена")])
+
+        everything = await webapp_client.post("/requests/bulk-status", json={"status": "rejected", "filter": {}})
+        assert everything.json()["updated"] == []
+        assert (await webapp_client.post("/requests/bulk-status", json={"status": "approved"})).status_code == 400
+
+    statuses = {item["id"]: item["status"] for item in (await webapp_client.get("/requests/json")).json()}
+    assert statuses == {1: "approved", 2: "approved"}
+
+
+@pytest.mark.asyncio
+async def test_batch_notifier_paces_and_retries():
+    """Test messages are rate limited, a flood error is retried and blocked users are skipped."""
+    bot = MagicMock()
+    method = SendMessage(chat_id=1, text="x")
+    bot.send_message = AsyncMock(side_effect=[
+        TelegramRetryAfter(method=method, message="Too Many Requests", retry_after=0),
+        None,
+        TelegramForbiddenError(method=method, message="Forbidden: bot was blocked by the user"),
+        None,
+        None,
+    ])
+    notifier = BatchNotifier(rate=50)
+    started = time.perf_counter()
+    assert notifier.enqueue(bot, [(chat_id, f"msg {chat_id}") for chat_id in (1, 2, 3, 4)]) == 4
+    await asyncio.wait_for(notifier.drain(), 2)
+    assert time.perf_counter() - started >= 4 / 50
+    sent = [call.kwargs["chat_id"] for call in bot.send_message.await_args_list]
+    assert sorted(sent) == [1, 1, 2, 3, 4]
+
+    assert parse_moderation_args(["12", "13,14", "12"]) == ([12, 13, 14], None)
+    assert parse_moderation_args(["all", "Грузовой"]) == (None, "грузовой")
+    for args in ([], ["12", "x"], ["all", "мото"]):
+        with pytest.raises(ValueError):
+            parse_moderation_args(args)
+
+
+@pytest.mark.asyncio
+async def test_admin_registry_follows_only_committed_changes():
+    """Test /addadmin and /deladmin change the in-memory admins only once the commit succeeded."""
+    registry = AdminRegistry()
+    message = MagicMock(text="/addadmin 4242", from_user=MagicMock(id=1), answer=AsyncMock())
+    found = MagicMock()
+    found.scalar_one_or_none.return_value = None
+    session = MagicMock(
+        execute=AsyncMock(return_value=found), flush=AsyncMock(), commit=AsyncMock(side_effect=RuntimeError("db is locked")),
+    )
+
+    with patch("app.handlers.admin.admin_registry", registry), \
+            patch("app.handlers.admin.is_admin_combined", AsyncMock(return_value=True)):
+        await add_admin_handler(message, session)
+        assert not registry.is_admin(4242)
+
+        session.commit = AsyncMock()
+        await add_admin_handler(message, session)
+        assert registry.is_admin(4242)
+
+        found.scalar_one_or_none.return_value = MagicMock(tg_id=4242)
+        session.delete = AsyncMock()
+        session.commit = AsyncMock(side_effect=RuntimeError("db is locked"))
+        message.text = "/deladmin 4242"
+        await del_admin_handler(message, session)
+        assert registry.is_admin(4242)
+
+        session.commit = AsyncMock()
+        await del_admin_handler(message, session)
+        assert not registry.is_admin(4242)
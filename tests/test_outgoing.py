@@ -0,0 +1,51 @@
+"""Tests for the outgoing call helper."""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from app.utils.outgoing import OutgoingCalls, outgoing_stats
+
+
+async def slow(result=None, delay: float = 0.05):
+    """Simulated Bot API call."""
+    await asyncio.sleep(delay)
+    return result
+
+
+@pytest.mark.asyncio
+async def test_spawned_calls_run_concurrently():
+    """Test the callback is answered once and independent calls overlap."""
+    callback = Mock()
+    callback.answer = AsyncMock()
+
+    started = time.perf_counter()
+    async with OutgoingCalls(callback, "test_concurrent") as out:
+        out.answer()
+        out.answer("ignored")
+        out.spawn(slow(), "deleteMessage")
+        sent = await out.call(slow("sent"), "sendPhoto")
+    elapsed = time.perf_counter() - started
+
+    assert sent == "sent"
+    callback.answer.assert_awaited_once_with(None)
+    assert elapsed < 0.09
+    stats = outgoing_stats["test_concurrent"].as_dict()
+    assert stats["serial_ms"] > stats["critical_path_ms"]
+
+
+@pytest.mark.asyncio
+async def test_spawned_failure_is_logged_not_raised():
+    """Test a failing background call doesn't break the handler, an awaited one does."""
+
+    async def fail():
+        raise RuntimeError("message to delete not found")
+
+    async with OutgoingCalls(name="test_failures") as out:
+        out.spawn(fail(), "deleteMessage")
+
+    with pytest.raises(RuntimeError):
+        async with OutgoingCalls(name="test_failures") as out:
+            await out.call(fail(), "sendPhoto")
@@ -0,0 +1,135 @@
+"""Tests for the bounded update poller."""
+
+import asyncio
+from unittest.mock import Mock
+
+import pytest
+from aiogram.types import Update
+
+from app.utils.polling import UpdatePoller
+
+
+class FakeBot:
+    """Bot returning the given batches of updates, then blocking like long polling."""
+
+    def __init__(self, *batches):
+        self.batches = list(batches)
+        self.fetches = 0
+
+    async def get_updates(self, **kwargs):
+        self.fetches += 1
+        if self.batches:
+            return self.batches.pop(0)
+        await asyncio.sleep(3600)
+
+
+@pytest.mark.asyncio
+async def test_inflight_cap_queues_until_the_lane_queue_is_full():
+    """Test handlers are capped, fetching goes on into the queue and pauses only when it is full."""
+    release = asyncio.Event()
+    running = []
+
+    async def feed_update(bot, update, **kwargs):
+        running.append(update.update_id)
+        await release.wait()
+
+    dp = Mock(feed_update=feed_update)
+    bot = FakeBot([Update(update_id=i) for i in range(1, 4)], [Update(update_id=i) for i in range(4, 7)])
+    poller = UpdatePoller(dp, bot, timeout=1, limit=100, max_inflight=2, queue_size=3, stats_interval=3600)
+
+    run_task = asyncio.create_task(poller.run())
+    await asyncio.sleep(0.05)
+    assert running == [1, 2]
+    assert poller.inflight == 2
+    assert (poller.lanes["user"].queued, poller.queued) == (3, 4)
+    assert bot.fetches == 2
+
+    release.set()
+    await asyncio.sleep(0.05)
+    assert running == [1, 2, 3, 4, 5, 6]
+    assert bot.fetches == 3
+
+    poller.stop()
+    await run_task
+
+
+@pytest.mark.asyncio
+async def test_admin_updates_bypass_saturated_user_lane():
+    """Test admin updates, even from a later batch, run while the user lane is saturated."""
+    release = asyncio.Event()
+    running = []
+
+    async def feed_update(bot, update, **kwargs):
+        running.append(update.update_id)
+        await release.wait()
+
+    def message(update_id: int, sender_id: int) -> Update:
+        return Update.model_validate({
+            "update_id": update_id,
+            "message": {
+                "message_id": update_id,
+                "date": 0,
+                "chat": {"id": sender_id, "type": "private"},
+                "from": {"id": sender_id, "is_bot": False, "first_name": "U"},
+                "text": "x",
+            },
+        })
+
+    dp = Mock(feed_update=feed_update)
+    bot = FakeBot([message(1, 10), message(2, 11), message(3, 12)], [message(4, 99)])
+    poller = UpdatePoller(
+        dp, bot, timeout=1, limit=100, max_inflight=1, admin_inflight=1,
+        stats_interval=3600, is_admin=lambda tg_id: tg_id == 99,
+    )
+
+    run_task = asyncio.create_task(poller.run())
+    await asyncio.sleep(0.05)
+    assert running == [1, 4]
+    assert poller.lanes["user"].queued == 2
+
+    release.set()
+    await asyncio.sleep(0.05)
+    assert running == [1, 4, 2, 3]
+    assert poller.lanes["admin"].percentiles()["p50"] >= 0
+
+    poller.stop()
+    await run_task
+
+
+@pytest.mark.asyncio
+async def test_updates_left_after_drain_timeout_are_handled_next_start(tmp_path):
+    """Test queued updates a slow shutdown couldn't handle are saved and handled first on the next run."""
+    pending_file = str(tmp_path / "pending_updates.json")
+    running = []
+
+    async def stuck(bot, update, **kwargs):
+        running.append(update.update_id)
+        await asyncio.sleep(3600)
+
+    bot = FakeBot([Update(update_id=i) for i in range(1, 4)])
+    poller = UpdatePoller(
+        Mock(feed_update=stuck), bot, timeout=1, limit=100, max_inflight=1,
+        stats_interval=3600, drain_timeout=0.05, pending_file=pending_file,
+    )
+    run_task = asyncio.create_task(poller.run())
+    await asyncio.sleep(0.05)
+    poller.stop()
+    await run_task
+    assert running == [1]
+
+    handled = []
+
+    async def feed_update(bot, update, **kwargs):
+        handled.append(update.update_id)
+
+    poller = UpdatePoller(
+        Mock(feed_update=feed_update), FakeBot(), timeout=1, limit=100, max_inflight=1,
+        stats_interval=3600, pending_file=pending_file,
+    )
+    run_task = asyncio.create_task(poller.run())
+    await asyncio.sleep(0.05)
+    assert handled == [2, 3]
+    assert not (tmp_path / "pending_updates.json").exists()
+
+    poller.stop()
+    await run_task
@@ -0,0 +1,83 @@
+"""Tests for the progress tracker."""
+
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from app.services.progress import ProgressTracker
+
+
+def make_bot() -> Mock:
+    """Bot mock recording sends and edits."""
+    bot = Mock()
+    bot.send_message = AsyncMock(return_value=Mock(message_id=77))
+    bot.edit_message_text = AsyncMock()
+    return bot
+
+
+@pytest.mark.asyncio
+async def test_first_report_sends_then_coalesces_edits():
+    """Test rapid reports result in one send and one edit with the latest text."""
+    tracker = ProgressTracker(interval=0.05)
+    bot = make_bot()
+
+    for count in range(1, 5):
+        await tracker.report(bot, 1, f"{count}/4")
+
+    bot.send_message.assert_awaited_once()
+    bot.edit_message_text.assert_not_awaited()
+
+    await asyncio.sleep(0.1)
+    bot.edit_message_text.assert_awaited_once()
+    assert bot.edit_message_text.await_args.kwargs["text"] == "4/4"
+    assert bot.edit_message_text.await_args.kwargs["message_id"] == 77
+
+
+@pytest.mark.asyncio
+async def test_existing_message_is_edited():
+    """Test a message sent by the flow is edited instead of sending a new one."""
+    tracker = ProgressTracker(interval=0.05)
+    bot = make_bot()
+
+    await tracker.report(bot, 1, "1/4", message_id=5)
+
+    bot.send_message.assert_not_awaited()
+    assert bot.edit_message_text.await_args.kwargs["message_id"] == 5
+
+
+@pytest.mark.asyncio
+async def test_finish_writes_pending_edit_at_once():
+    """Test finishing a step writes the coalesced last report right away instead of dropping it."""
+    tracker = ProgressTracker(interval=10)
+    bot = make_bot()
+
+    await tracker.report(bot, 1, "1/4")
+    await tracker.report(bot, 1, "2/4")
+    await tracker.report(bot, 1, "4/4")
+    tracker.finish(1)
+
+    await asyncio.sleep(0.01)
+    bot.edit_message_text.assert_awaited_once()
+    assert bot.edit_message_text.await_args.kwargs["text"] == "4/4"
+    assert not tracker._entries
+
+
+@pytest.mark.asyncio
+async def test_restarted_flow_gets_a_fresh_message():
+    """Test an abandoned flow's message is neither edited by the next flow nor kept around."""
+    tracker = ProgressTracker(interval=0)
+    bot = make_bot()
+
+    # Cargo flow abandoned after one photo, then restarted with a new progress message
+    await tracker.report(bot, 1, "1/4", key="auto", message_id=5)
+    await tracker.report(bot, 1, "1/4", key="auto", message_id=9)
+    assert bot.edit_message_text.await_args.kwargs["message_id"] == 9
+
+    # Light flow abandoned, then /start: the next flow sends a new message
+    await tracker.report(bot, 1, "1/4")
+    tracker.forget_chat(1)
+    assert not tracker._entries
+    bot.send_message.return_value = Mock(message_id=78)
+    await tracker.report(bot, 1, "1/4")
+    assert bot.send_message.await_count == 2 and tracker._entries[(1, "photos")].message_id == 78
@@ -0,0 +1,45 @@
+"""Tests for per-unit SQL statement tracking."""
+
+import logging
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from infra.db import QueryBudgetExceeded, instrument_engine, query_budget, redact_parameters, track_queries
+
+
+@pytest_asyncio.fixture
+async def memory_engine():
+    """In-memory SQLite engine with the statement hooks installed."""
+    engine = create_async_engine("sqlite+aiosqlite://")
+    instrument_engine(engine)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_repeated_statement_shapes_are_flagged(memory_engine, caplog):
+    """Test a statement run once per row is logged as a likely N+1 for the unit."""
+    with caplog.at_level(logging.WARNING, logger="infra.db"):
+        with track_queries("light.template_next") as stats:
+            async with memory_engine.connect() as conn:
+                for template_id in range(6):
+                    await conn.execute(text("SELECT :id AS id"), {"id": template_id})
+
+    assert stats.count == 6
+    assert stats.repeated(5) == [("SELECT ? AS id", 6)]
+    assert "Possible N+1 in light.template_next: 6 executions of SELECT ? AS id" in caplog.text
+    assert redact_parameters((1, "secret")) == "(<int>, <str>)"
+
+
+@pytest.mark.asyncio
+async def test_query_budget_counts_nested_units(memory_engine):
+    """Test the budget sees statements counted by an inner unit and fails when exceeded."""
+    with pytest.raises(QueryBudgetExceeded, match="3 statements, budget 2"):
+        with query_budget(2, "cargo flow"):
+            with track_queries("cargo.handle_auto_photo"):
+                async with memory_engine.connect() as conn:
+                    for _ in range(3):
+                        await conn.execute(text("SELECT 1"))
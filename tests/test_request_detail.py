@@ -0,0 +1,31 @@
+"""Tests for the composite request detail endpoints."""
+
+import pytest
+
+from infra.db import query_budget
+
+
+@pytest.mark.asyncio
+async def test_full_request_in_one_response(webapp_client):
+    """Test the detail view gets user, file URLs and template from two statements."""
+    with query_budget(2):
+        response = await webapp_client.get("/requests/1/full")
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["username"], data["user"]["tg_id"]) == ("petrov_k", 555)
+    assert [file["url"] for file in data["files"]] == [f"/uploads/auto_{i}.jpg" for i in range(3)]
+    assert data["selected_template"] == {"id": 3, "name": "Бренд", "description": None, "preview_url": "/templates/3/preview"}
+    assert (await webapp_client.get("/requests/99/full")).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_batch_keeps_order_and_skips_unknown_ids(webapp_client):
+    """Test the batch route isn't taken for /requests/{request_id} and costs the same statements for any size."""
+    with query_budget(2):
+        response = await webapp_client.get("/requests/batch", params={"ids": "2,1,99,2"})
+    assert response.status_code == 200
+    assert [(item["id"], len(item["files"]), item["selected_template"] is None) for item in response.json()] == [
+        (2, 0, True), (1, 3, False),
+    ]
+    assert (await webapp_client.get("/requests/batch", params={"ids": "1,x"})).status_code == 400
+    assert (await webapp_client.get("/requests/batch", params={"ids": ",".join(map(str, range(101)))})).status_code == 400
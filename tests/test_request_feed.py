@@ -0,0 +1,85 @@
+"""Tests for the live request feed."""
+
+import asyncio
+import json
+from unittest.mock import patch
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import insert, update
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel
+
+from app.webapp.events import RESET, RequestFeed
+from domain.models import Request, User
+from infra.request_feed import install_request_feed
+
+
+@pytest_asyncio.fixture
+async def feed_engine(tmp_path):
+    """SQLite engine with the tables and the change capture triggers."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'bot.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+        await conn.run_sync(install_request_feed)
+        await conn.execute(insert(User.__table__).values(id=1, tg_id=555, username="petrov_k"))
+    yield engine
+    await engine.dispose()
+
+
+def _parse(message: str):
+    event, data = message.strip().split("\n")
+    return event.removeprefix("event: "), json.loads(data.removeprefix("data: "))
+
+
+@pytest.mark.asyncio
+async def test_new_requests_and_status_changes_are_pushed(feed_engine):
+    """Test clients get created and status events with the row, but not other edits."""
+    feed = RequestFeed(feed_engine, poll_interval=0.02)
+    first, second = feed.stream(), feed.stream()
+    assert await anext(first) == "retry: 5000\n\n"
+    await anext(second)
+    await asyncio.sleep(0.05)  # feed picks its starting cursor
+
+    async with feed_engine.begin() as conn:
+        await conn.execute(insert(Request.__table__).values(id=7, user_id=1, category="легковой", status="draft"))
+    event, data = _parse(await asyncio.wait_for(anext(first), 1))
+    assert event == "request_created"
+    assert (data["id"], data["status"], data["username"]) == (7, "draft", "petrov_k")
+
+    async with feed_engine.begin() as conn:
+        await conn.execute(update(Request.__table__).where(Request.id == 7).values(year=2020))
+        await conn.execute(update(Request.__table__).where(Request.id == 7).values(status="submitted"))
+    event, data = _parse(await asyncio.wait_for(anext(first), 1))
+    assert (event, data["status"], data["year"]) == ("request_status_changed", "submitted", 2020)
+    assert [_parse(await anext(second))[0] for _ in range(2)] == ["request_created", "request_status_changed"]
+
+    await first.aclose()
+    assert feed._task is not None
+    await second.aclose()
+    assert feed._task is None  # no clients, no polling
+
+
+@pytest.mark.asyncio
+async def test_bursts_and_slow_clients_get_reset(feed_engine):
+    """Test a bulk load and a client that stopped reading are told to reload instead."""
+    feed = RequestFeed(feed_engine, poll_interval=0.02, queue_size=2)
+    stream = feed.stream()
+    await anext(stream)
+    await asyncio.sleep(0.05)
+
+    with patch("app.webapp.events.BATCH_LIMIT", 3):
+        async with feed_engine.begin() as conn:
+            await conn.execute(
+                insert(Request.__table__),
+                [{"id": i, "user_id": 1, "category": "грузовой", "status": "submitted"} for i in range(1, 6)],
+            )
+        assert await asyncio.wait_for(anext(stream), 1) == RESET
+
+    for _ in range(3):
+        feed.publish("event: request_created\ndata: {}\n\n")
+    assert await anext(stream) == RESET
+
+    await feed.close()
+    with pytest.raises(StopAsyncIteration):
+        await anext(stream)
@@ -0,0 +1,86 @@
+"""Tests for full-text search."""
+
+from unittest.mock import patch
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlmodel import SQLModel
+
+from app.keyboards.inline import get_find_pagination
+from app.webapp.main import MAX_SEARCH_PAGE
+from domain.models import Request, Template, User
+from infra.db import query_budget
+from infra.event_store import SQLiteEventStore
+from infra.search import install_search_index, search
+
+
+@pytest_asyncio.fixture
+async def search_session(tmp_path):
+    """SQLite session with the tables and search index, plus a file-backed audit store."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'bot.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    store = SQLiteEventStore(str(tmp_path / "audit.db"))
+    with patch("infra.search.event_store", store):
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            yield session, store
+    await store.close()
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_search_follows_writes_and_merges_audit(search_session):
+    """Test rows written before and after the index exists are found by prefix, including audit events."""
+    session, store = search_session
+    session.add(User(tg_id=555, username="petrov_k", first_name="Иван", last_name="Иванов"))
+    await session.commit()
+    async with session.bind.begin() as conn:
+        await conn.run_sync(install_search_index)  # backfills the existing user
+
+    session.add(Template(name="Бренд на двери", description="Наклейка Ивановского парка", file_id="f", path="t.jpg"))
+    session.add(Request(user_id=1, category="легковой", status="submitted", year=2020))
+    await session.commit()
+    store.append("request_approved", {"request_id": 1, "admin": "ivanov_admin"})
+    await store.flush()
+
+    results, has_more = await search(session, "иван")
+    assert {(result["kind"], result["id"]) for result in results} == {("user", 1), ("template", 1)}
+    assert not has_more
+    assert [result["title"] for result in (await search(session, "ivanov"))[0]] == ["request_approved"]
+
+    await session.execute(update(Request).where(Request.id == 1).values(status="approved"))
+    await session.commit()
+    assert (await search(session, "submitted", kinds=["request"]))[0] == []
+    assert [result["title"] for result in (await search(session, "req 1 approved", kinds=["request"]))[0]] == ["REQ-1"]
+
+
+@pytest.mark.asyncio
+async def test_search_pages(search_session):
+    """Test pages don't overlap and the /find keyboard only offers existing pages."""
+    session, _ = search_session
+    async with session.bind.begin() as conn:
+        await conn.run_sync(install_search_index)
+    session.add_all(User(tg_id=1000 + i, first_name="Пётр", last_name=f"Курьер{i}") for i in range(5))
+    await session.commit()
+
+    first, more = await search(session, "пётр", limit=3)
+    second, last_more = await search(session, "пётр", limit=3, offset=3)
+    assert (len(first), more, len(second), last_more) == (3, True, 2, False)
+    assert not {result["id"] for result in first} & {result["id"] for result in second}
+    assert await search(session, "  !!  ") == ([], False)
+
+    buttons = get_find_pagination("пётр", 2, has_more=False).inline_keyboard[0]
+    assert [button.callback_data for button in buttons] == ["find:1:пётр"]
+    assert get_find_pagination("пётр", 1, has_more=False) is None
+    assert get_find_pagination("я" * 40, 1, has_more=True) is None  # callback data over 64 bytes
+
+
+@pytest.mark.asyncio
+async def test_search_endpoint_bounds_the_page(webapp_client):
+    """Test /search rejects pages past MAX_SEARCH_PAGE and below 1 before running a query."""
+    with query_budget(0):
+        for page in (0, MAX_SEARCH_PAGE + 1, 10**9):
+            response = await webapp_client.get("/search", params={"q": "petrov", "page": page})
+            assert response.status_code == 422
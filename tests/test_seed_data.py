@@ -0,0 +1,45 @@
+"""Tests for the synthetic data generator."""
+
+from datetime import datetime
+
+from seed_data import COLUMNS, DataGenerator
+
+
+def _generate(seed: int, batch: int = 64):
+    generator = DataGenerator(seed, datetime(2025, 6, 30), 6, dict.fromkeys(COLUMNS, 0), 100_000_000)
+    templates = generator.templates(3)
+    users = [row for rows in generator.users(200, batch) for row in rows]
+    requests, files = [], []
+    for request_rows, file_rows in generator.requests(500, batch):
+        requests.extend(request_rows)
+        files.extend(file_rows)
+    audit = [row for rows in generator.audit(100, batch) for row in rows]
+    return templates, users, requests, files, audit
+
+
+def test_same_seed_gives_same_rows():
+    """Test generated rows depend only on the seed, not on batching or time."""
+    assert _generate(7) == _generate(7)
+    assert _generate(7)[2] != _generate(8)[2]
+    assert _generate(7, batch=64) == _generate(7, batch=500)
+
+
+def test_generated_rows_are_consistent():
+    """Test references, timestamps and photo counts match what the bot produces."""
+    _, users, requests, files, _ = _generate(1)
+    users_by_id = {row[0]: row for row in users}
+    assert len({row[1] for row in users}) == len(users)  # unique tg_id
+    assert all(len(row) == len(COLUMNS["request"]) for row in requests)
+
+    kinds_by_request = {}
+    for row in files:
+        kinds_by_request.setdefault(row[1], []).append(row[2])
+    for request_id, user_id, category, status, *_, created_at, submitted_at in requests:
+        assert category in ("легковой", "грузовой")
+        assert created_at >= users_by_id[user_id][5]
+        kinds = kinds_by_request.get(request_id, [])
+        if status == "draft":
+            assert submitted_at is None and len(kinds) <= 3
+        else:
+            assert 4 <= len(kinds) <= 6
+            assert kinds.count("sts_photo") == (2 if category == "грузовой" else 0)
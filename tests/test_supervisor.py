@@ -0,0 +1,34 @@
+"""Tests for the process supervisor."""
+
+import os
+import sys
+import time
+
+from app.supervisor import Child, Supervisor, read_usage
+
+
+def test_crashed_child_is_restarted_with_backoff():
+    """Test a child exiting on its own is started again after the backoff delay."""
+    child = Child("crashy", [sys.executable, "-c", "import sys; sys.exit(3)"])
+    supervisor = Supervisor([child], stats_interval=0)
+
+    supervisor.step()
+    child.process.wait()
+    supervisor.step()
+    assert child.restart_at is not None
+    assert child.restarts == 0
+
+    child.restart_at = time.monotonic()
+    supervisor.step()
+    assert child.restarts == 1
+    child.process.wait()
+
+
+def test_read_usage_of_current_process():
+    """Test RSS and CPU time are read from /proc."""
+    usage = read_usage(os.getpid())
+    if usage is None:
+        return  # no /proc on this platform
+    rss, cpu = usage
+    assert rss > 0
+    assert cpu >= 0
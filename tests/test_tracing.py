@@ -0,0 +1,53 @@
+"""Tests for span tracing."""
+
+import json
+import time
+from unittest.mock import Mock
+
+from infra.tracing import FileExporter, OTLPExporter, Tracer, current_span, span
+
+
+def test_slow_traces_are_exported_without_sampling():
+    """Test every update is recorded with a slow threshold but only slow ones are exported."""
+    exporter = Mock()
+    tracer = Tracer(sample_rate=0.0, slow_threshold=0.01, exporters=[exporter])
+
+    with tracer.start_trace("update", update_id=1):
+        with span("handler light.template_next"):
+            with span("sql", statement="SELECT 1"):
+                pass
+    exporter.submit.assert_not_called()
+
+    with tracer.start_trace("update", update_id=2):
+        with span("telegram.sendMessage"):
+            time.sleep(0.02)
+    trace = exporter.submit.call_args.args[0]
+    assert [item.name for item in trace.spans] == ["update", "telegram.sendMessage"]
+    assert trace.spans[1].parent_id == trace.root.span_id
+    assert current_span.get() is None
+
+
+def test_exporters_write_ndjson_and_otlp_payload(tmp_path):
+    """Test the file exporter writes one line per trace and the OTLP body links spans."""
+    tracer = Tracer(sample_rate=1.0)
+    with tracer.start_trace("update", update_id=7) as root:
+        try:
+            with span("sql"):
+                raise ValueError("boom")
+        except ValueError:
+            pass
+    trace = root.trace
+
+    exporter = FileExporter(str(tmp_path / "traces.ndjson"))
+    exporter.submit(trace)
+    exporter.shutdown()
+    entry = json.loads((tmp_path / "traces.ndjson").read_text())
+    assert entry["trace_id"] == trace.trace_id
+    assert entry["spans"][1]["error"] == "ValueError"
+
+    otlp = OTLPExporter("http://localhost:4318/v1/traces", "ndstrbot-bot")
+    otlp.shutdown()
+    spans = otlp.payload([trace])["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert spans[1]["parentSpanId"] == spans[0]["spanId"]
+    assert spans[1]["status"]["code"] == 2
+    assert spans[0]["attributes"] == [{"key": "update_id", "value": {"intValue": "7"}}]
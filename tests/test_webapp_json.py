@@ -0,0 +1,48 @@
+"""Tests for the JSON list endpoints."""
+
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+from app.webapp.responses import FastJSONResponse
+from domain.models import File, User
+from domain.schemas import RequestResponse
+from infra.db import query_budget
+from infra.event_store import SQLiteEventStore
+
+
+@pytest.mark.asyncio
+async def test_list_endpoints_match_response_models(webapp_client):
+    """Test rows selected as dicts serialize like the response models did, in one statement plus the version lookup."""
+    with query_budget(2):
+        requests = (await webapp_client.get("/requests/json")).json()
+    assert requests[0] == RequestResponse(
+        id=1, user_id=1, username="petrov_k", category="легковой", status="submitted",
+        selected_template_id=3, created_at=datetime(2025, 6, 1),
+    ).model_dump(mode="json")
+    assert list(requests[0]) == list(RequestResponse.model_fields)
+
+    users = (await webapp_client.get("/users")).json()
+    assert users == [User(id=1, tg_id=555, username="petrov_k", created_at=datetime(2025, 6, 1), last_seen=datetime(2025, 6, 1)).model_dump(mode="json")]
+    files = (await webapp_client.get("/files/json")).json()
+    assert files[0] == File(id=1, request_id=1, kind="auto_photo", file_id="f0", path="storage/uploads/auto_0.jpg", created_at=datetime(2025, 6, 1)).model_dump(mode="json")
+
+
+@pytest.mark.asyncio
+async def test_audit_list_and_stdlib_fallback(webapp_client, tmp_path):
+    """Test audit events come back as objects, and the output is the same without orjson."""
+    store = SQLiteEventStore(str(tmp_path / "audit.db"))
+    store.append("request_approved", {"request_id": 1}, datetime(2025, 6, 2, 10, 30, 0, 123456))
+    await store.flush()
+    try:
+        with patch("app.webapp.main.event_store", store):
+            audit = (await webapp_client.get("/audit/json")).json()
+    finally:
+        await store.close()
+    assert audit == [{"id": 1, "event": "request_approved", "payload": '{"request_id": 1}', "created_at": "2025-06-02T10:30:00.123456"}]
+
+    rows = [{"id": 1, "name": "Бренд", "created_at": datetime(2025, 6, 1, 12), "flag": None}]
+    with_orjson = FastJSONResponse(rows).body
+    with patch("app.webapp.responses.orjson", None):
+        assert FastJSONResponse(rows).body == with_orjson
@@ -0,0 +1,49 @@
+"""Tests for the web app launcher."""
+
+from unittest.mock import patch
+
+from app.webapp import run
+
+
+def test_production_mode_uses_settings(monkeypatch):
+    """Test workers, keep-alive and backlog come from settings without reload, logging goes through the queue."""
+    monkeypatch.setattr(run.settings, "web_workers", 0)
+    monkeypatch.setattr(run.settings, "web_reload", False)
+    monkeypatch.setattr(run.settings, "web_backlog", 512)
+    monkeypatch.setattr(run.settings, "web_metrics_dir", "")
+    monkeypatch.delenv("WEB_METRICS_DIR", raising=False)
+
+    with patch.object(run.uvicorn, "run") as uvicorn_run, patch.object(run, "setup_logging") as setup_logging:
+        run.main()
+
+    kwargs = uvicorn_run.call_args.kwargs
+    assert uvicorn_run.call_args.args == ("app.webapp.main:app",)
+    assert kwargs["workers"] == run.resolve_workers(0) >= 1
+    assert kwargs["reload"] is False
+    assert kwargs["backlog"] == 512
+    assert kwargs["log_config"] is None
+    setup_logging.assert_called_once_with(files=False)
+
+
+def test_reload_forces_single_worker(monkeypatch):
+    """Test the reloader always runs one process."""
+    monkeypatch.setattr(run.settings, "web_workers", 4)
+    monkeypatch.setattr(run.settings, "web_metrics_dir", "")
+
+    with patch.object(run.uvicorn, "run") as uvicorn_run, patch.object(run, "setup_logging"):
+        run.main(reload=True)
+
+    assert uvicorn_run.call_args.kwargs["workers"] == 1
+
+
+def test_workers_share_a_metrics_dir(monkeypatch, tmp_path):
+    """Test several workers get a cleared metrics dir exported to them, a single one none."""
+    monkeypatch.setattr(run.settings, "web_metrics_dir", "")
+    monkeypatch.delenv("WEB_METRICS_DIR", raising=False)
+    assert run.prepare_metrics_dir(1) == ""
+
+    monkeypatch.setattr(run.settings, "web_metrics_dir", str(tmp_path))
+    (tmp_path / "123.json").write_text("{}")
+    assert run.prepare_metrics_dir(4) == str(tmp_path)
+    assert run.os.environ["WEB_METRICS_DIR"] == str(tmp_path)
+    assert list(tmp_path.iterdir()) == []